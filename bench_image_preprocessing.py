@@ -0,0 +1,123 @@
+"""
+Benchmark for the photo preprocessing used before Gemini vision calls.
+
+For every setting (max side x grayscale x JPEG quality) and every photo, reports:
+  * preprocessing time and payload size
+  * model latency (unless --dry-run)
+  * accuracy: title similarity and ingredient recall, against --truth if given,
+    otherwise against the result for the photo at its original size
+
+Secrets are read from .streamlit/secrets.toml, as for the app. Results bypass the
+extraction cache, so every call is a real model call.
+
+Usage: python bench_image_preprocessing.py PHOTO [PHOTO ...] [--truth truth.json] [--dry-run]
+         [--sizes 768,1024,1536,2048,0] [--qualities 70,85] [--grayscale both|on|off]
+
+truth.json maps photo file names to {"title": "...", "ingredients": ["...", ...]}.
+"""
+import argparse
+import difflib
+import json
+import os
+import statistics
+import time
+
+from PIL import Image
+
+# Calls are sequential; keep the app's Gemini rate limiter from inflating the measured latency
+os.environ["GEMINI_RPM"] = "0"
+
+import streamlit_app as app  # noqa: E402
+
+
+def similarity(a, b) -> float:
+    return difflib.SequenceMatcher(None, app._normalise_text(a), app._normalise_text(b)).ratio()
+
+
+def ingredient_recall(expected: list, extracted: list, threshold: float = 0.8) -> float:
+    """Share of expected ingredients that closely match some extracted ingredient."""
+    if not expected:
+        return 1.0
+    found = sum(1 for item in expected if any(similarity(item, other) >= threshold for other in extracted or []))
+    return found / len(expected)
+
+
+def run_setting(paths, settings, dry_run: bool, model_name: str) -> dict:
+    results = {}
+    for path in paths:
+        with Image.open(path) as image:
+            start = time.perf_counter()
+            page = app.prepare_image_for_model(image, settings)
+            prep_seconds = time.perf_counter() - start
+        row = {"bytes": len(page["data"]), "prep_s": prep_seconds, "model_s": None, "recipe": None, "error": None}
+        if not dry_run:
+            start = time.perf_counter()
+            try:
+                row["recipe"] = app.call_image_model([page], models=(model_name,))
+            except Exception as e:
+                row["error"] = str(e)
+            row["model_s"] = time.perf_counter() - start
+        results[os.path.basename(path)] = row
+    return results
+
+
+def score(results: dict, reference: dict) -> tuple:
+    titles, recalls = [], []
+    for name, row in results.items():
+        expected = reference.get(name)
+        if not expected or not row["recipe"]:
+            continue
+        titles.append(similarity(expected.get("title"), row["recipe"].get("title")))
+        recalls.append(ingredient_recall(expected.get("ingredients"), row["recipe"].get("ingredients")))
+    return (statistics.mean(titles) if titles else None, statistics.mean(recalls) if recalls else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("photos", nargs="+")
+    parser.add_argument("--truth", help="JSON file with the expected title/ingredients per photo")
+    parser.add_argument("--sizes", default="768,1024,1536,2048,0", help="max sides to try (0 = original size)")
+    parser.add_argument("--qualities", default="70,85", help="JPEG qualities to try")
+    parser.add_argument("--grayscale", choices=("both", "on", "off"), default="both")
+    parser.add_argument("--model", default=app.IMAGE_EXTRACTION_MODELS[0],
+                        help="single model to call (no tier escalation, so latencies are comparable)")
+    parser.add_argument("--dry-run", action="store_true", help="only measure preprocessing (no model calls)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    qualities = [int(q) for q in args.qualities.split(",")]
+    grayscale_options = {"both": [False, True], "on": [True], "off": [False]}[args.grayscale]
+    settings_list = [
+        app.ImagePreprocessing(max_side=size, jpeg_quality=quality, grayscale=grayscale)
+        for size in sizes for quality in qualities for grayscale in grayscale_options
+    ]
+
+    all_results = [(settings, run_setting(args.photos, settings, args.dry_run, args.model)) for settings in settings_list]
+
+    if args.truth:
+        with open(args.truth, encoding="utf-8") as f:
+            reference = json.load(f)
+    else:
+        # Without ground truth, agreement with the largest (ideally original-size) setting is the score
+        largest = max(all_results, key=lambda item: (item[0].max_side == 0, item[0].max_side, item[0].jpeg_quality))
+        reference = {name: row["recipe"] for name, row in largest[1].items() if row["recipe"]}
+
+    print(f"{'max_side':>8} {'quality':>7} {'gray':>5} {'avg KB':>8} {'prep ms':>8} {'model s':>8} "
+          f"{'title':>6} {'ingr.':>6} {'errors':>6}")
+    for settings, results in all_results:
+        rows = list(results.values())
+        model_times = [r["model_s"] for r in rows if r["model_s"] is not None]
+        title_score, recall = score(results, reference)
+        print(
+            f"{settings.max_side or 'orig':>8} {settings.jpeg_quality:>7} {'yes' if settings.grayscale else 'no':>5} "
+            f"{statistics.mean(r['bytes'] for r in rows) / 1024:8.0f} "
+            f"{statistics.mean(r['prep_s'] for r in rows) * 1000:8.1f} "
+            f"{statistics.mean(model_times) if model_times else float('nan'):8.2f} "
+            f"{title_score if title_score is not None else float('nan'):6.2f} "
+            f"{recall if recall is not None else float('nan'):6.2f} "
+            f"{sum(1 for r in rows if r['error']):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
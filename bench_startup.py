@@ -0,0 +1,77 @@
+"""
+Startup benchmark for the recipe app.
+
+Reports, each in a fresh interpreter so nothing is already cached:
+  * import time of every heavy dependency on its own
+  * time to execute streamlit_app.py up to the first rendered screen (the password form),
+    and which heavy dependencies that first render actually loaded
+
+Usage: python bench_startup.py [--runs N]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ["streamlit", "google.generativeai", "pymongo", "bs4", "PIL.Image", "requests"]
+
+FIRST_RENDER_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file("streamlit_app.py", default_timeout=60)
+at.secrets["GEMINI_API_KEY"] = "benchmark"
+at.secrets["MONGODB_URI"] = "mongodb://localhost:27017"
+at.secrets["APP_PASSWORD"] = "benchmark"
+at.run()
+rendered = time.perf_counter()
+modules = %r
+loaded = [m for m in modules if m in sys.modules]
+print(json.dumps({
+    "streamlit_import_s": imported - start,
+    "first_render_s": rendered - imported,
+    "errors": [e.value for e in at.exception],
+    "loaded": loaded,
+}))
+"""
+
+
+def time_import(module: str) -> float:
+    """Seconds to import module in a fresh interpreter."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def time_first_render() -> dict:
+    code = FIRST_RENDER_SNIPPET % (HEAVY_MODULES,)
+    result = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="repetitions per measurement (median is reported)")
+    args = parser.parse_args()
+
+    print("Import time per dependency (median, fresh interpreter):")
+    for module in HEAVY_MODULES:
+        samples = [time_import(module) for _ in range(args.runs)]
+        print(f"  {module:<22} {statistics.median(samples) * 1000:8.1f} ms")
+
+    renders = [time_first_render() for _ in range(args.runs)]
+    print("\nFirst render (password screen):")
+    print(f"  streamlit import       {statistics.median(r['streamlit_import_s'] for r in renders) * 1000:8.1f} ms")
+    print(f"  script to first render {statistics.median(r['first_render_s'] for r in renders) * 1000:8.1f} ms")
+    print(f"  heavy modules loaded   {', '.join(renders[-1]['loaded']) or 'none'}")
+    if renders[-1]["errors"]:
+        print(f"  script errors          {renders[-1]['errors']}")
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"\nTotal benchmark time: {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,54 @@
+"""
+Bulk recipe import from the command line.
+
+Reads recipe URLs from text/CSV files (or stdin), extracts and saves each one with
+the same pipeline as the app's bulk import (bounded concurrency, Gemini rate limit,
+retries of transient failures) and prints a per-item log and a final report.
+Secrets are read from .streamlit/secrets.toml, as for the app.
+
+Usage: python bulk_import.py [FILE ...] [--workers N] [--report report.csv]
+"""
+import argparse
+import csv
+import sys
+import time
+
+import streamlit_app as app
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="text/CSV files containing URLs (default: stdin)")
+    parser.add_argument("--workers", type=int, default=app.BULK_IMPORT_WORKERS, help="concurrent imports")
+    parser.add_argument("--report", help="write the per-URL report to this CSV file")
+    args = parser.parse_args()
+
+    if args.files:
+        text = "\n".join(open(path, encoding="utf-8", errors="replace").read() for path in args.files)
+    else:
+        text = sys.stdin.read()
+    urls = app.parse_url_list(text)
+    if not urls:
+        print("No URLs found.")
+        return 1
+
+    def on_result(row, done, total):
+        detail = row["error"] if row["error"] else row["title"] or ""
+        print(f"[{done}/{total}] {row['status']:<7} {row['url']}  {detail}", flush=True)
+
+    start = time.perf_counter()
+    rows = app.bulk_import_urls(urls, max_workers=args.workers, on_result=on_result)
+    summary = app.summarize_import(rows)
+    print(f"\n{summary['saved']} saved, {summary['updated']} updated, {summary['failed']} failed "
+          f"of {summary['total']} in {time.perf_counter() - start:.1f} s")
+
+    if args.report:
+        with open(args.report, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+One-off cleanup of duplicate recipes saved before save-time deduplication existed.
+
+Groups recipes by canonical source URL, then by content fingerprint (title plus
+ingredients), keeps the most complete (then most recently saved) copy of each group
+and lists the rest. Nothing is changed unless --apply is given; with --apply, the
+recipes to delete are first written to a JSON backup, then deleted together with
+their thumbnails, and the dedupe keys and unique indexes are brought up to date.
+Secrets are read from .streamlit/secrets.toml, as for the app.
+
+Usage: python dedupe_recipes.py [--apply] [--backup backup.json]
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from bson import json_util
+
+import streamlit_app as app
+
+
+def describe(doc: dict) -> str:
+    return f"{doc['_id']}  {doc.get('title') or '-'}  ({doc.get('source_url') or 'no URL'})"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="delete the duplicates (default: report only)")
+    parser.add_argument("--backup", default=f"recipes-dedupe-backup-{datetime.now():%Y%m%d-%H%M%S}.json",
+                        help="where --apply writes the deleted recipes first")
+    args = parser.parse_args()
+
+    plan = app.plan_recipe_dedupe()
+    for group in plan:
+        print(f"{group['field']} {group['key']}")
+        print(f"  keep    {describe(group['keep'])}")
+        for doc in group["remove"]:
+            print(f"  delete  {describe(doc)}")
+    doomed = [doc for group in plan for doc in group["remove"]]
+    print(f"\n{len(doomed)} duplicate recipes in {len(plan)} groups")
+
+    if not args.apply:
+        if doomed:
+            print("Dry run; nothing was changed. Re-run with --apply to delete them.")
+        return 0
+
+    if doomed:
+        # Full documents, including legacy inline images and stored thumbnails
+        ids = [doc["_id"] for doc in doomed]
+        backup = {
+            "recipes": list(app.get_recipes_collection().find({"_id": {"$in": ids}})),
+            "recipe_images": list(app.get_recipe_images_collection().find({"_id": {"$in": ids}})),
+        }
+        with open(args.backup, "w", encoding="utf-8") as f:
+            f.write(json_util.dumps(backup, ensure_ascii=False, indent=2))
+        print(f"Backed up to {args.backup}")
+    removed = app.apply_recipe_dedupe(plan)
+    print(f"Removed {removed} duplicate recipes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,58 @@
+from __future__ import annotations
+
 import streamlit as st
-import pymongo
-import google.generativeai as genai
 import os
-import requests
-import io
-from PIL import Image
 # from dotenv import load_dotenv
 import base64
+import codecs
+import copy
+import hashlib
+import importlib
 import json
 import re
-from datetime import datetime
-import streamlit.components.v1 as components
-from urllib.parse import urljoin
-from bson import ObjectId # Needed for deleting by ID
-
-from PIL import Image, UnidentifiedImageError
-from io import BytesIO
-import hashlib
+import tempfile
+import threading
 import time
-import json
-from bs4 import BeautifulSoup  # You'll need to install this: pip install beautifulsoup4
-from typing import Union, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import partial
+from datetime import datetime, timezone
+from html import unescape
+from io import BytesIO
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from typing import Optional, Tuple
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+    Keeps heavy dependencies off the startup path (e.g. the password screen needs none of them).
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+pymongo = lazy_import("pymongo")
+bson = lazy_import("bson")  # ObjectId needed for deleting by ID
+genai = lazy_import("google.generativeai")
+google_exceptions = lazy_import("google.api_core.exceptions")
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")  # You'll need to install this: pip install beautifulsoup4
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
+features = lazy_import("PIL.features")
 
 # Configure API keys using st.secrets
 try:
@@ -44,50 +76,123 @@ if not MONGODB_URI:
     st.stop()
 
 
-# Configure Gemini
-try:
+# --- Shared Resources ---
+# Created once per server process (st.cache_resource) and reused by every rerun and
+# session, so a rerun costs no network round trips for setup.
+
+MONGO_DB_NAME = "recipe_keeper"
+MONGO_MAX_POOL_SIZE = 50
+MONGO_MIN_POOL_SIZE = 2  # Keep a couple of warm connections for the first query after idle
+MONGO_SERVER_SELECTION_TIMEOUT_MS = 5000
+MONGO_CONNECT_TIMEOUT_MS = 5000
+MONGO_SOCKET_TIMEOUT_MS = 20000
+MONGO_MAX_IDLE_TIME_MS = 5 * 60 * 1000
+
+
+@st.cache_resource
+def configure_gemini() -> bool:
+    """Configure the Gemini client once per process."""
     genai.configure(api_key=GEMINI_API_KEY)
-except Exception as e:
-    st.error(f"❌ Error configuring Gemini: {e}")
-    st.stop()
+    return True
 
-# --- MongoDB Connection ---
-try:
-    client = pymongo.MongoClient(MONGODB_URI)
-    db = client["recipe_keeper"]
-    recipes_collection = db["recipes"]
+
+def ensure_indexes(collection) -> None:
+    """Create the search and listing indexes (create_index is a no-op when they exist)."""
+    # --- MongoDB Text Index ---
+    # Create text index for natural language search
+    try:
+        collection.create_index(
+            [
+                ("title", "text"),
+                ("ingredients", "text"),
+                ("instructions", "text"),
+                ("cuisine", "text"),
+                ("meal_type", "text"),
+                ("description", "text"),
+                ("keywords", "text"),
+            ],
+            name="recipe_text_index" # Give the index a name
+        )
+    except Exception as e:
+        # It's okay if index already exists, but log other errors
+        if "index already exists" not in str(e):
+             print(f"Warning: Could not ensure text index: {e}")
+
+    # Indexes for filtered/sorted listing. get_all_recipes sorts by (field, _id), so _id must
+    # end each index or the keyset pages fall back to an in-memory sort
+    try:
+        collection.create_index([("cuisine", 1), ("added_on", -1), ("_id", -1)], name="cuisine_added_on_id")
+        collection.create_index([("meal_type", 1), ("added_on", -1), ("_id", -1)], name="meal_type_added_on_id")
+        collection.create_index([("title", 1), ("_id", 1)], name="title_id")
+        collection.create_index([("added_on", -1), ("_id", -1)], name="added_on_id")
+    except Exception as e:
+        print(f"Warning: Could not ensure list indexes: {e}")
+    # Superseded by the indexes above
+    for name in ("cuisine_added_on", "meal_type_added_on", "title"):
+        try:
+            collection.drop_index(name)
+        except pymongo.errors.OperationFailure:
+            pass  # Already gone
+        except Exception as e:
+            print(f"Warning: Could not drop old index {name}: {e}")
+
+
+@st.cache_resource
+def get_mongo_client() -> pymongo.MongoClient:
+    """Process-wide MongoDB client with a tuned connection pool; indexes are ensured once."""
+    client = pymongo.MongoClient(
+        MONGODB_URI,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        retryWrites=True,
+        retryReads=True,
+    )
     # Test connection
     client.admin.command('ping')
-    # print("Successfully connected to MongoDB!") # Optional: for debugging
-except pymongo.errors.ConnectionFailure as e:
-    st.error(f"❌ Could not connect to MongoDB: {e}")
-    st.stop()
-except Exception as e:
-    st.error(f"❌ An unexpected error occurred during MongoDB setup: {e}")
-    st.stop()
+    ensure_indexes(client[MONGO_DB_NAME]["recipes"])
+    ensure_unique_recipe_indexes(client[MONGO_DB_NAME]["recipes"])
+    return client
 
 
-# --- MongoDB Text Index ---
-# Create text index for natural language search (run once)
-try:
-    recipes_collection.create_index(
-        [
-            ("title", "text"),
-            ("ingredients", "text"),
-            ("instructions", "text"),
-            ("cuisine", "text"),
-            ("meal_type", "text"),
-            ("description", "text"),
-            ("keywords", "text"),
-        ],
-        name="recipe_text_index" # Give the index a name
-    )
-    # print("Text index ensured.") # Optional: for debugging
-except Exception as e:
-    # It's okay if index already exists, but log other errors
-    if "index already exists" not in str(e):
-         print(f"Warning: Could not ensure text index: {e}")
-    pass # Silently handle index existence
+def get_database():
+    """The recipe_keeper database; stops the script with an error if MongoDB is unreachable."""
+    try:
+        return get_mongo_client()[MONGO_DB_NAME]
+    except pymongo.errors.ConnectionFailure as e:
+        st.error(f"❌ Could not connect to MongoDB: {e}")
+        st.stop()
+    except Exception as e:
+        st.error(f"❌ An unexpected error occurred during MongoDB setup: {e}")
+        st.stop()
+
+
+def get_recipes_collection():
+    return get_database()["recipes"]
+
+
+def get_recipe_images_collection():
+    """Card thumbnails stored at save time, keyed by the recipe's _id."""
+    return get_database()["recipe_images"]
+
+
+def get_app_meta_collection():
+    """Small bookkeeping documents (e.g. the recipes version counter used for cache invalidation)."""
+    return get_database()["app_meta"]
+
+
+def get_jobs_collection():
+    """Background extraction jobs (status, result or error), polled by the UI."""
+    return get_database()["jobs"]
+
+
+def get_extraction_cache_collection():
+    """Extraction results keyed by canonical URL / image hash and prompt+model version."""
+    return get_database()["extraction_cache"]
+
 
 # --- Hebrew Translations ---
 TRANSLATIONS = {
@@ -129,8 +234,9 @@ TRANSLATIONS = {
     "view_original": "🔗 צפי במתכון המקורי",
     "processing": "⏳ מעבדת...",
     "recipe_extracted": "👍 המתכון חולץ בהצלחה! בדקי את התצוגה המקדימה ולחצי 'שמרי'.",
+    "recipe_partial": "⚠️ המתכון חולץ באופן חלקי (חסר: {fields}). השלימי את החסר לפני השמירה או נסי שוב.",
+    "recipe_title": "שם המתכון",
     "error_extract_url": "❌ שגיאה בחילוץ המתכון מהקישור",
-    "error_extract_image": "❌ שגיאה בחילוץ המתכון מהתמונה",
     "error_save": "❌ שגיאה בשמירת המתכון",
     "error_search": "❌ שגיאה בחיפוש",
     "error_fetch": "❌ שגיאה בטעינת המתכונים",
@@ -151,6 +257,39 @@ TRANSLATIONS = {
     "img_upload_success": "התמונה הועלתה בהצלחה!",
     "yes_delete": "כן, מחקי",
     "cancel": "ביטול",
+    "diagnostics": "📊 נתוני ביצועים",
+    "http_pool": "חיבורי HTTP",
+    "image_cache": "מטמון תמונות",
+    "disk_image_cache": "מטמון תמונות בדיסק",
+    "load_more": "⬇️ טעני עוד מתכונים",
+    "query_cache": "מטמון שאילתות",
+    "image_discovery": "איתור תמונות",
+    "cache_watcher": "מעקב שינויים",
+    "page_cache": "מטמון דפים",
+    "extraction_cache": "מטמון חילוץ מתכונים",
+    "gemini_rate_limiter": "הגבלת קצב Gemini",
+    "model_router": "מודלים (זמני תגובה והצלחה)",
+    "recipe_duplicate_updated": "ℹ️ המתכון כבר היה שמור, ולכן עודכן במקום ליצור עותק נוסף.",
+    "add_bulk_urls": "ייבוא מרובה מקישורים",
+    "bulk_urls_label": "הדביקי קישורים למתכונים (קישור בכל שורה)",
+    "bulk_urls_file": "או העלי קובץ טקסט / CSV עם קישורים",
+    "bulk_urls_found": "נמצאו {count} קישורים",
+    "bulk_import_start": "📥 ייבוא כל המתכונים",
+    "bulk_import_progress": "מייבאת {done} מתוך {total}...",
+    "bulk_import_summary": "הייבוא הסתיים: {saved} נשמרו, {updated} עודכנו, {failed} נכשלו (מתוך {total}).",
+    "bulk_status_saved": "נשמר",
+    "bulk_status_updated": "עודכן",
+    "bulk_status_failed": "נכשל",
+    "job_queue": "תור חילוץ ברקע",
+    "job_queued": "ממתין בתור:",
+    "job_running": "מחלצת מתכון מ-",
+    "add_from_images_batch": "מספר תמונות (ספר מתכונים)",
+    "upload_images_batch": "העלי תמונות של עמודי מתכונים, לפי הסדר",
+    "batch_continues_hint": "סמני עמוד שממשיך את המתכון מהעמוד הקודם, כדי שיחולצו יחד.",
+    "batch_continues_previous": "המשך של העמוד הקודם",
+    "batch_extract_start": "🔍 חלצי את כל המתכונים",
+    "batch_review": "בדקי את המתכונים שחולצו:",
+    "batch_save_selected": "💾 שמרי {count} מתכונים מסומנים",
 }
 
 def get_translation(key, **kwargs):
@@ -163,22 +302,400 @@ def get_translation(key, **kwargs):
             pass # Ignore if placeholder not in translation
     return translation
 
-import re
-import requests
-from urllib.parse import urljoin, urlparse
-from io import BytesIO
-from PIL import Image, UnidentifiedImageError
-import json
-from bs4 import BeautifulSoup
-import base64
-import streamlit as st
-import time
-from typing import Union, Optional, Tuple
-import hashlib
+# --- Shared HTTP Client ---
+
+HTTP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+HTTP_DEFAULT_TIMEOUT = 5  # Seconds, used when a caller doesn't pass its own timeout
+HTTP_MAX_RETRIES = 2  # Retries for connection errors and transient 429/5xx responses
+HTTP_POOL_CONNECTIONS = 20  # Number of distinct hosts kept in the pool
+HTTP_POOL_MAXSIZE = 16  # Keep-alive connections per host (>= IMAGE_PROBE_WORKERS)
+
+
+class PooledSession:
+    """Shared requests session with a common User-Agent, default timeout and pool statistics."""
+
+    def __init__(self, timeout: float = HTTP_DEFAULT_TIMEOUT, max_retries: int = HTTP_MAX_RETRIES):
+        self.default_timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = HTTP_USER_AGENT
+
+        # Retry connects and transient statuses, but not read timeouts (they would multiply latency)
+        retry = requests.adapters.Retry(
+            total=max_retries,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("HEAD", "GET"),
+            raise_on_status=False,
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def pool_stats(self) -> dict:
+        """Per-host request/connection counts, so connection reuse can be monitored."""
+        hosts = {}
+        seen = set()
+        for adapter in self.session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{key.key_scheme}://{key.key_host}"
+                stats = hosts.setdefault(host, {"requests": 0, "connections": 0})
+                stats["requests"] += pool.num_requests
+                stats["connections"] += pool.num_connections
+
+        total_requests = sum(s["requests"] for s in hosts.values())
+        total_connections = sum(s["connections"] for s in hosts.values())
+        return {
+            "hosts": hosts,
+            "requests": total_requests,
+            "connections": total_connections,
+            "reuse_rate": (1 - total_connections / total_requests) if total_requests else 0.0,
+        }
+
+
+@st.cache_resource
+def get_http_session() -> PooledSession:
+    """Process-wide HTTP session shared by every outbound fetch (keep-alive pool per host)."""
+    return PooledSession()
+
+
+def get_http_pool_stats() -> dict:
+    """Connection pool statistics for the shared HTTP session."""
+    return get_http_session().pool_stats()
+
+
+# --- Page Fetching ---
+
+HEAD_FETCH_MAX_BYTES = 256 * 1024  # Give up looking for </head> after this much HTML
+PAGE_FETCH_MAX_BYTES = 5 * 1024 * 1024  # Hard cap on any full body read
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+META_CHARSET_SNIFF_BYTES = 4096  # <meta charset> must appear this early (HTML spec: within 1024 bytes)
+META_CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
+
+
+def _known_codec(name) -> Optional[str]:
+    if isinstance(name, bytes):
+        name = name.decode("ascii", errors="ignore")
+    try:
+        return codecs.lookup(name.strip()).name if name and name.strip() else None
+    except LookupError:
+        return None
+
+
+def header_charset(content_type: str) -> Optional[str]:
+    """The charset parameter of a Content-Type header, or None if it has none (or an unknown one)."""
+    match = re.search(r"charset\s*=\s*[\"']?([^;\"'\s]+)", content_type or "", re.I)
+    return _known_codec(match.group(1)) if match else None
+
+
+def sniff_meta_charset(data: bytes) -> Optional[str]:
+    """Encoding declared by <meta charset> or <meta http-equiv="Content-Type"> in the first bytes of a page."""
+    match = META_CHARSET_PATTERN.search(data)
+    return _known_codec(match.group(1)) if match else None
+
+
+class StreamedPage:
+    """
+    Incrementally read HTML response. read_head() stops as soon as </head> (or
+    a byte cap) is reached; read_full() continues the same response for tiers
+    that need the body, so the page is never requested twice.
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self.url = response.url
+        # Only trust a charset the server actually sent: for text/html without one, requests
+        # reports ISO-8859-1, which would override the page's own <meta charset>
+        self.encoding = header_charset(response.headers.get("Content-Type", ""))
+        self._buffer = bytearray()
+        self._chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        self._exhausted = False
+
+    def _read_chunk(self) -> bool:
+        """Append the next chunk to the buffer; False once the body is exhausted."""
+        if self._exhausted:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except (StopIteration, requests.RequestException):
+            self._exhausted = True
+            self.close()
+            return False
+        self._buffer.extend(chunk)
+        return True
+
+    def _decode(self, data) -> str:
+        if self.encoding is None:
+            # No charset header: use the page's <meta charset>, else UTF-8 (HTML5's default
+            # in practice). Decided once, from the first bytes read, so every read agrees.
+            self.encoding = sniff_meta_charset(bytes(self._buffer[:META_CHARSET_SNIFF_BYTES])) or "utf-8"
+        return bytes(data).decode(self.encoding, errors="replace")
+
+    def read_head(self, max_bytes: int = HEAD_FETCH_MAX_BYTES) -> str:
+        """Read until </head> is seen (or max_bytes) and return the document up to that point."""
+        search_from = 0
+        while True:
+            end = self._buffer[search_from:].lower().find(b"</head>")
+            if end != -1:
+                return self._decode(self._buffer[:search_from + end + len(b"</head>")])
+            # Overlap so a tag split across chunks is still found
+            search_from = max(0, len(self._buffer) - len(b"</head>"))
+            if len(self._buffer) >= max_bytes or not self._read_chunk():
+                return self._decode(self._buffer)
+
+    def read_full(self, max_bytes: int = PAGE_FETCH_MAX_BYTES) -> str:
+        """Read the rest of the body (up to max_bytes) and return the whole document."""
+        while len(self._buffer) < max_bytes and self._read_chunk():
+            pass
+        self.close()
+        return self._decode(self._buffer[:max_bytes])
+
+    def close(self) -> None:
+        self.response.close()
+
+
+def open_page(page_url: str, timeout: float = 5, session: Optional[PooledSession] = None) -> StreamedPage:
+    """Start a streamed GET for page_url; headers are read, the body is not."""
+    session = session or get_http_session()
+    return StreamedPage(session.get(page_url, timeout=timeout, stream=True))
+
+
+PAGE_CACHE_MAX_ENTRIES = 32  # Recently fetched recipe pages kept per process
+PAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Budget for cached HTML and extracted text
+PAGE_CACHE_TTL_SECONDS = 30 * 60
+PAGE_FAILURE_TTL_SECONDS = 5 * 60  # How long a failed fetch is remembered (so it isn't retried per extraction step)
+MAIN_CONTENT_MAX_CHARS = 30000  # Text sent to the model; recipes are far shorter than this
+NON_CONTENT_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "form",
+                    "nav", "header", "footer", "aside", "button", "select"]
+
+
+class FetchedPage:
+    """
+    A downloaded HTML page. It is parsed once, on first use, and only what extraction and
+    image discovery need is kept (main text, schema.org objects, image candidates); the
+    parse tree itself is dropped so cached pages don't hold on to it.
+    """
+
+    def __init__(self, url: str, final_url: str, html: str):
+        self.url = url
+        self.final_url = final_url
+        self.html = html
+        self.fetched_at = time.time()
+        self._analysis = None
+        self._lock = threading.Lock()
+
+    def _analyse(self) -> dict:
+        with self._lock:
+            if self._analysis is None:
+                soup = bs4.BeautifulSoup(self.html, 'html.parser')
+                try:
+                    recipe_data = find_jsonld_recipes(soup) or find_microdata_recipes(soup)
+                except Exception as e:
+                    print(f"Warning: could not read structured data from {self.url}: {e}")
+                    recipe_data = []
+                try:
+                    image_candidates = collect_image_candidates(soup, self.final_url)
+                except Exception:
+                    # Fallback to basic regex over the whole page if BeautifulSoup fails
+                    image_candidates = scan_html_for_images(self.html, self.final_url)
+                self._analysis = {
+                    "main_text": self._extract_main_text(soup),
+                    "recipe_data": recipe_data,
+                    "image_candidates": image_candidates,
+                }
+            return self._analysis
+
+    @staticmethod
+    def _extract_main_text(soup) -> str:
+        """Readable text of the main content, without scripts, navigation, footers, etc."""
+        root = (soup.find(attrs={"itemtype": re.compile("schema.org/Recipe", re.I)})
+                or soup.find("article") or soup.find("main") or soup.body or soup)
+        lines = []
+        for text in root.find_all(string=True):
+            # Skip comments/doctype and anything inside non-content tags (the soup isn't
+            # modified, since structured data and image candidates are read from it too)
+            if type(text) is not bs4.element.NavigableString or text.find_parent(NON_CONTENT_TAGS):
+                continue
+            line = " ".join(text.split())
+            if line:
+                lines.append(line)
+        title = soup.title.get_text(strip=True) if soup.title else ""
+        return "\n".join(([title] if title else []) + lines)[:MAIN_CONTENT_MAX_CHARS]
+
+    @property
+    def head(self) -> str:
+        """The document up to and including </head> (the whole document if there's no </head>)."""
+        end = self.html.lower().find("</head>")
+        return self.html if end == -1 else self.html[:end + len("</head>")]
+
+    def main_text(self) -> str:
+        return self._analyse()["main_text"]
+
+    def recipe_data(self) -> list[dict]:
+        """schema.org Recipe objects on the page (JSON-LD first, then microdata)."""
+        return self._analyse()["recipe_data"]
+
+    def image_candidates(self) -> list[str]:
+        """Candidate image URLs, best first (see collect_image_candidates)."""
+        return self._analyse()["image_candidates"]
+
+    def meta_images(self) -> list[str]:
+        """Images declared in <head> meta/link tags (og:image, twitter:image, ...)."""
+        return scan_html_for_images(self.head, self.final_url)
+
+    @property
+    def size(self) -> int:
+        """Approximate memory held by the page: the HTML plus, at most, the capped main text."""
+        return len(self.html) + min(len(self.html), MAIN_CONTENT_MAX_CHARS)
+
+
+class PageCache:
+    """
+    Thread-safe LRU of FetchedPage objects keyed by both the requested and the final URL,
+    bounded by entry count and by total page size. URLs that could not be fetched are
+    remembered briefly too, so image discovery doesn't request them again.
+    """
+
+    def __init__(self, max_entries: int = PAGE_CACHE_MAX_ENTRIES, max_bytes: int = PAGE_CACHE_MAX_BYTES,
+                 ttl_seconds: float = PAGE_CACHE_TTL_SECONDS, failure_ttl_seconds: float = PAGE_FAILURE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self._entries = OrderedDict()  # url -> FetchedPage
+        self._failures = OrderedDict()  # url -> time the fetch failed
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, url: str) -> Optional[FetchedPage]:
+        with self._lock:
+            page = self._entries.get(url)
+            if page is not None and time.time() - page.fetched_at >= self.ttl_seconds:
+                self._discard(page)
+                page = None
+            if page is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+            return page
+
+    def put(self, page: FetchedPage) -> None:
+        if page.size > self.max_bytes:
+            return
+        with self._lock:
+            for url in {page.url, page.final_url}:
+                self._entries[url] = page
+                self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries or self._total_bytes() > self.max_bytes:
+                self._discard(next(iter(self._entries.values())))
+                self.evictions += 1
+
+    def put_failure(self, url: str) -> None:
+        with self._lock:
+            self._failures[url] = time.time()
+            self._failures.move_to_end(url)
+            while len(self._failures) > self.max_entries:
+                self._failures.popitem(last=False)
+
+    def failed(self, url: str) -> bool:
+        """True if fetching url failed within the last failure_ttl_seconds."""
+        with self._lock:
+            failed_at = self._failures.get(url)
+            if failed_at is not None and time.time() - failed_at >= self.failure_ttl_seconds:
+                del self._failures[url]
+                failed_at = None
+            return failed_at is not None
+
+    def _pages(self) -> list[FetchedPage]:
+        # A page is stored under up to two URLs; count it once
+        return list({id(page): page for page in self._entries.values()}.values())
+
+    def _total_bytes(self) -> int:
+        return sum(page.size for page in self._pages())
+
+    def _discard(self, page: FetchedPage) -> None:
+        # Caller holds the lock; removes every URL the page is stored under
+        for url in [url for url, cached in self._entries.items() if cached is page]:
+            del self._entries[url]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "pages": len(self._pages()),
+                "bytes": self._total_bytes(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "failures": len(self._failures),
+            }
+
+
+@st.cache_resource
+def get_page_cache() -> PageCache:
+    """Process-wide cache of fetched pages, so extraction and image discovery share one download."""
+    return PageCache()
+
+
+def fetch_page(url: str, timeout: float = 10, resources: Optional[ExtractionResources] = None) -> Optional[FetchedPage]:
+    """
+    Download url once (or reuse a recent download). Returns None on network/HTTP errors;
+    the failure is cached too, so later steps of the same extraction don't retry it.
+    """
+    resources = resources or get_extraction_resources()
+    cache = resources.page_cache
+    page = cache.get(url)
+    if page is not None:
+        return page
+    if cache.failed(url):
+        return None
+    try:
+        streamed = open_page(url, timeout=timeout, session=resources.http_session)
+        if streamed.response.status_code >= 400:
+            streamed.close()
+            cache.put_failure(url)
+            return None
+        page = FetchedPage(url, streamed.url, streamed.read_full())
+    except requests.RequestException as e:
+        print(f"Warning: could not fetch {url}: {e}")
+        cache.put_failure(url)
+        return None
+    cache.put(page)
+    return page
+
 
 # --- Enhanced Image Fetching Functions ---
 
-def is_valid_image_url(url: str, timeout: int = 3) -> bool:
+def is_valid_image_url(url: str, timeout: int = 3, session: Optional[PooledSession] = None) -> bool:
     """
     Check if a URL points to a valid image by making a HEAD request
     and checking content type.
@@ -195,11 +712,13 @@ def is_valid_image_url(url: str, timeout: int = 3) -> bool:
 
     try:
         # Make a HEAD request first to check content type without downloading the whole image
-        response = requests.head(
-            url,
-            timeout=timeout,
-            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        )
+        session = session or get_http_session()
+        response = session.head(url, timeout=timeout)
+
+        # Some CDNs reject HEAD; ask again with a streamed GET and close before reading the body
+        if response.status_code in (403, 405):
+            response = session.get(url, timeout=timeout, stream=True, allow_redirects=False)
+            response.close()
 
         # Check if response is successful and content type is an image
         content_type = response.headers.get('Content-Type', '')
@@ -208,226 +727,311 @@ def is_valid_image_url(url: str, timeout: int = 3) -> bool:
         return False
 
 
-def follow_redirects(url: str, max_redirects: int = 3) -> str:
+def follow_redirects(url: str, max_redirects: int = 3, session: Optional[PooledSession] = None) -> str:
     """Follow URL redirects up to a maximum number and return the final URL."""
     if not url:
         return url
 
     try:
         # Don't download content, just follow redirects
-        response = requests.head(
-            url,
-            allow_redirects=True,
-            timeout=5,
-            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        )
+        session = session or get_http_session()
+        response = session.head(url, allow_redirects=True, timeout=5)
         return response.url
     except (requests.RequestException, Exception):
         return url  # Return original if error
 
 
-def fetch_meta_image(page_url: str) -> str | None:
+# Upper bound on concurrent HEAD probes per page, so image-heavy pages don't open dozens of sockets at once
+IMAGE_PROBE_WORKERS = 8
+
+
+def collect_image_candidates(soup: bs4.BeautifulSoup, page_url: str) -> list[str]:
     """
-    Enhanced function to grab image URLs from meta tags.
-    Supports more variants and follows redirects.
+    Collect every candidate image URL from a parsed page in a single pass.
+    Returns absolute URLs ordered from best to worst (meta tags first, then
+    schema.org images, then large <img> tags by area), without duplicates.
     """
-    try:
-        resp = requests.get(
-            page_url,
-            timeout=5,
-            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        )
-        html = resp.text
-
-        # Try using BeautifulSoup for more reliable parsing if available
+    candidates = []
+
+    def add(value):
+        if isinstance(value, str) and value.strip():
+            url = urljoin(page_url, value.strip())
+            if url not in candidates:
+                candidates.append(url)
+
+    # 1-4. Meta/link tags in priority order
+    for tag_name, attrs, attr in (
+        ('meta', {'property': 'og:image'}, 'content'),
+        ('meta', {'name': 'twitter:image'}, 'content'),
+        ('link', {'rel': 'image_src'}, 'href'),
+        ('meta', {'property': 'og:article:image'}, 'content'),
+    ):
+        tag = soup.find(tag_name, attrs=attrs)
+        if tag:
+            add(tag.get(attr))
+
+    # 5. schema.org Recipe images (string, list of strings, or ImageObject dicts)
+    for data in find_jsonld_recipes(soup):
+        if data.get('image'):
+            images = data['image'] if isinstance(data['image'], list) else [data['image']]
+            for img in images:
+                add(img.get('url') if isinstance(img, dict) else img)
+
+    # 6. Last resort: significant <img> tags, largest first (skip icons, logos, data URLs, SVGs)
+    significant_images = []
+    for img in soup.find_all('img'):
+        src = img.get('src')
+        if not src:
+            continue
+        lowered = src.lower()
+        if any(marker in lowered for marker in ('icon', 'logo', 'avatar', 'data:', '.svg')):
+            continue
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Look for meta tags in priority order
-            # 1. OpenGraph image (og:image)
-            og_image = soup.find('meta', property='og:image') or soup.find('meta', attrs={'property': 'og:image'})
-            if og_image and og_image.get('content'):
-                url = urljoin(page_url, og_image['content'])
-                if is_valid_image_url(url):
-                    return url
+            width, height = int(img.get('width')), int(img.get('height'))
+        except (ValueError, TypeError):
+            # Width/height missing or not valid numbers
+            continue
+        if width >= 200 and height >= 200:
+            significant_images.append((width * height, src))
 
-            # 2. Twitter image
-            twitter_image = soup.find('meta', name='twitter:image') or soup.find('meta', attrs={'name': 'twitter:image'})
-            if twitter_image and twitter_image.get('content'):
-                url = urljoin(page_url, twitter_image['content'])
-                if is_valid_image_url(url):
-                    return url
+    significant_images.sort(key=lambda item: item[0], reverse=True)
+    for _, src in significant_images:
+        add(src)
 
-            # 3. Image_src link
-            image_src = soup.find('link', rel='image_src')
-            if image_src and image_src.get('href'):
-                url = urljoin(page_url, image_src['href'])
-                if is_valid_image_url(url):
-                    return url
+    return candidates
 
-            # 4. Article image
-            article_image = soup.find('meta', property='og:article:image') or soup.find('meta', attrs={'property': 'og:article:image'})
-            if article_image and article_image.get('content'):
-                url = urljoin(page_url, article_image['content'])
-                if is_valid_image_url(url):
-                    return url
-
-            # 5. Look for schema.org Recipe image
-            for script in soup.find_all('script', type='application/ld+json'):
-                try:
-                    data = json.loads(script.string)
-                    if isinstance(data, dict):
-                        # Check for Recipe schema
-                        if data.get('@type') == 'Recipe' and data.get('image'):
-                            # Handle both string and array image values
-                            img = data['image']
-                            if isinstance(img, list) and img:
-                                img = img[0]  # Take first image if it's a list
-                            if isinstance(img, str):
-                                url = urljoin(page_url, img)
-                                if is_valid_image_url(url):
-                                    return url
-                            elif isinstance(img, dict) and img.get('url'):
-                                url = urljoin(page_url, img['url'])
-                                if is_valid_image_url(url):
-                                    return url
-                except (json.JSONDecodeError, AttributeError):
-                    continue
 
-            # 6. Last resort: look for the largest image in the page
-            # Find all images above a certain size (to avoid icons, etc.)
-            significant_images = []
-            for img in soup.find_all('img'):
-                src = img.get('src')
-                if not src:
-                    continue
-
-                # Skip tiny images, data URLs, or SVGs
-                if (
-                    'icon' in src.lower() or
-                    'logo' in src.lower() or
-                    'avatar' in src.lower() or
-                    'data:' in src or
-                    '.svg' in src.lower()
-                ):
-                    continue
+def probe_image_candidates(candidates: list[str], max_workers: int = IMAGE_PROBE_WORKERS,
+                           session: Optional[PooledSession] = None) -> str | None:
+    """
+    Validate candidate image URLs concurrently and return the highest-priority
+    one that is a real image. Returns as soon as every better-ranked candidate
+    has been ruled out, without waiting for the remaining probes.
+    """
+    if not candidates:
+        return None
 
-                # Try to get image dimensions from attributes
-                width = img.get('width')
-                height = img.get('height')
-                try:
-                    # Check if dimensions suggest a significant image (not small icons)
-                    if width and height and int(width) >= 200 and int(height) >= 200:
-                        url = urljoin(page_url, src)
-                        if is_valid_image_url(url):
-                            significant_images.append((int(width) * int(height), url))
-                except (ValueError, TypeError):
-                    # Width/height weren't valid numbers
-                    pass
+    # Resolve the shared session here; cached resources shouldn't be looked up from worker threads
+    session = session or get_http_session()
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(candidates)))
+    try:
+        futures = {executor.submit(is_valid_image_url, url, session=session): url for url in candidates}
+        results = {}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            # Walk candidates in priority order; stop at the first one still pending
+            for url in candidates:
+                if url not in results:
+                    break
+                if results[url]:
+                    return url
+        return None
+    finally:
+        # Don't block on probes for lower-priority candidates
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Meta/link/JSON-LD image patterns for the regex tiers, in priority order
+META_IMAGE_PATTERNS = [
+    # Standard OG image
+    r'<meta[^>]+(?:property|name)=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']',
+    # Reverse attribute order
+    r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+(?:property|name)=["\']og:image["\']',
+    # Twitter image
+    r'<meta[^>]+(?:property|name)=["\']twitter:image(?::src)?["\'][^>]+content=["\']([^"\']+)["\']',
+    r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+(?:property|name)=["\']twitter:image(?::src)?["\']',
+    # Image_src link
+    r'<link[^>]+rel=["\']image_src["\'][^>]+href=["\']([^"\']+)["\']',
+    r'<link[^>]+href=["\']([^"\']+)["\'][^>]+rel=["\']image_src["\']',
+    # Schema.org Recipe image
+    r'"@type"\s*:\s*"Recipe"[^}]*"image"\s*:\s*"([^"]+)"',
+    r'"@type"\s*:\s*"Recipe"[^}]*"image"\s*:\s*\[\s*"([^"]+)"',
+]
+
+
+class ImageDiscoveryStats:
+    """Thread-safe per-tier call/hit counts and timings for discover_image."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers = {}
+
+    def record(self, tier: str, seconds: float, hit: bool) -> None:
+        with self._lock:
+            stats = self._tiers.setdefault(tier, {"calls": 0, "hits": 0, "total_ms": 0.0})
+            stats["calls"] += 1
+            stats["hits"] += int(hit)
+            stats["total_ms"] += seconds * 1000
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                tier: {**s, "avg_ms": s["total_ms"] / s["calls"] if s["calls"] else 0.0}
+                for tier, s in self._tiers.items()
+            }
+
+
+@st.cache_resource
+def get_image_discovery_stats() -> ImageDiscoveryStats:
+    return ImageDiscoveryStats()
+
+
+def scan_html_for_images(html: str, page_url: str) -> list[str]:
+    """Regex scan for meta/link/JSON-LD image URLs, returned in priority order without duplicates."""
+    candidates = []
+    for pattern in META_IMAGE_PATTERNS:
+        for m in re.finditer(pattern, html, flags=re.IGNORECASE):
+            url = urljoin(page_url, m.group(1).strip())
+            if url not in candidates:
+                candidates.append(url)
+    return candidates
+
+
+def fetch_noembed_thumbnail(page_url: str, session: Optional[PooledSession] = None) -> str | None:
+    """Ask noembed.com for the page's oEmbed thumbnail, if it has a valid one."""
+    session = session or get_http_session()
+    try:
+        oe_response = session.get(
+            "https://noembed.com/embed",
+            params={"url": page_url},
+            timeout=4
+        )
+        if oe_response.status_code == 200:
+            thumb = oe_response.json().get("thumbnail_url")
+            if thumb and is_valid_image_url(thumb, session=session):
+                return thumb
+    except Exception:
+        pass
+    return None
 
-            # Sort by image size (largest first) and return the biggest one
-            if significant_images:
-                significant_images.sort(reverse=True)
-                return significant_images[0][1]  # Return URL of largest image
 
-        except (ImportError, Exception):
-            # Fallback to basic regex if BeautifulSoup fails or isn't available
+def discover_image(page_url: str, resources: Optional[ExtractionResources] = None) -> Tuple[Optional[str], dict]:
+    """
+    Tiered image discovery for a recipe page. Returns (image URL or None, {tier: seconds}).
+
+    Tiers run cheapest first and stop at the first validated hit:
+      1. head_regex - regex scan of <head> (streamed; the body isn't downloaded yet)
+      2. full_parse - reads the rest of the body and parses it with BeautifulSoup
+                      (adds JSON-LD lists and large <img> tags)
+      3. noembed    - oEmbed thumbnail from noembed.com (also tried when the page can't be fetched)
+    Candidates are validated concurrently, and a URL is never probed twice across tiers.
+    If the page was already downloaded (fetch_page, e.g. for recipe extraction), its cached
+    document is used and nothing is fetched again; if that download failed, only noembed
+    is tried. So the streamed head-only read applies to pages no extraction fetched first.
+    """
+    resources = resources or get_extraction_resources()
+    session = resources.http_session
+    timings = {}
+    stats = resources.image_discovery_stats
+    probed = set()
+
+    def run_tier(tier, func):
+        start = time.perf_counter()
+        result = func()
+        timings[tier] = time.perf_counter() - start
+        stats.record(tier, timings[tier], bool(result))
+        return result
+
+    def probe(candidates):
+        fresh = [url for url in candidates if url not in probed]
+        probed.update(fresh)
+        return probe_image_candidates(fresh, session=session)
+
+    cached_page = resources.page_cache.get(page_url)
+
+    def full_parse():
+        if cached_page is not None:
+            return probe(cached_page.image_candidates())
+        # Only this tier needs the body; keep reading the same streamed response
+        html = page.read_full()
+        try:
+            candidates = collect_image_candidates(bs4.BeautifulSoup(html, 'html.parser'), page_url)
+        except Exception:
+            # Fallback to basic regex over the whole page if BeautifulSoup fails
+            candidates = scan_html_for_images(html, page_url)
+        return probe(candidates)
+
+    page = None
+    head = None
+    if cached_page is not None:
+        head = cached_page.head
+    elif resources.page_cache.failed(page_url):
+        # fetch_page just failed on this URL; don't request it again
+        pass
+    else:
+        try:
+            page = open_page(page_url, session=session)
+            head = run_tier("fetch_head", page.read_head)
+        except requests.RequestException:
+            # Page unreachable (blocked, timeout, ...); noembed may still know it
             pass
 
-        # Fallback to regex approach if BeautifulSoup didn't find anything
-        # 1) og:image - expanded regex to catch more variations
-        patterns = [
-            # Standard OG image
-            r'<meta[^>]+(?:property|name)=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']',
-            # Reverse attribute order
-            r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+(?:property|name)=["\']og:image["\']',
-            # Twitter image
-            r'<meta[^>]+(?:property|name)=["\']twitter:image(?::src)?["\'][^>]+content=["\']([^"\']+)["\']',
-            r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+(?:property|name)=["\']twitter:image(?::src)?["\']',
-            # Image_src link
-            r'<link[^>]+rel=["\']image_src["\'][^>]+href=["\']([^"\']+)["\']',
-            r'<link[^>]+href=["\']([^"\']+)["\'][^>]+rel=["\']image_src["\']',
-            # Schema.org Recipe image
-            r'"@type"\s*:\s*"Recipe"[^}]*"image"\s*:\s*"([^"]+)"',
-            r'"@type"\s*:\s*"Recipe"[^}]*"image"\s*:\s*\[\s*"([^"]+)"',
+    tiers = [("noembed", lambda: fetch_noembed_thumbnail(page_url, session=session))]
+    if head is not None:
+        tiers[:0] = [
+            ("head_regex", lambda: probe(scan_html_for_images(head, page_url))),
+            ("full_parse", full_parse),
         ]
 
-        for pattern in patterns:
-            m = re.search(pattern, html, flags=re.IGNORECASE)
-            if m:
-                url = urljoin(page_url, m.group(1))
-                if is_valid_image_url(url):
-                    return url
+    try:
+        for tier, func in tiers:
+            try:
+                image_url = run_tier(tier, func)
+            except requests.RequestException:
+                # Body download failed part way; move on to the next tier
+                continue
+            if image_url:
+                return image_url, timings
+    finally:
+        if page is not None:
+            page.close()
 
-        # If we got this far, try noembed as a last resort
-        try:
-            oe_response = requests.get(
-                "https://noembed.com/embed",
-                params={"url": page_url},
-                timeout=4
-            )
-            if oe_response.status_code == 200:
-                data = oe_response.json()
-                thumb = data.get("thumbnail_url")
-                if thumb and is_valid_image_url(thumb):
-                    return thumb
-        except Exception:
-            pass
+    return None, timings
 
-    except requests.RequestException:
-        return None
 
-    return None
+def fetch_meta_image(page_url: str, resources: Optional[ExtractionResources] = None) -> str | None:
+    """
+    Find the best image URL for a page (meta tags, schema.org data, large images, oEmbed).
+    See discover_image for the tiers.
+    """
+    return discover_image(page_url, resources)[0]
 
 
-def get_recipe_image(url: str, recipe_data: dict) -> str:
+def get_recipe_image(url: str, recipe_data: dict, resources: Optional[ExtractionResources] = None) -> str:
     """
     Comprehensive function to get the best image for a recipe using multiple strategies.
     Returns a valid image URL or None.
     """
+    resources = resources or get_extraction_resources()
+    session = resources.http_session
     image_url = recipe_data.get("image_url")
 
     # Only try to fetch an image if one wasn't already provided or it's invalid
-    if not image_url or not is_valid_image_url(image_url):
+    if not image_url or not is_valid_image_url(image_url, session=session):
         # Strategy 1: Try meta tags
-        image_url = fetch_meta_image(url)
+        image_url = fetch_meta_image(url, resources)
 
         # Strategy 2: If recipe has a source_url different from the given URL, try that too
         source_url = recipe_data.get("source_url")
         if not image_url and source_url and source_url != url:
-            image_url = fetch_meta_image(source_url)
+            image_url = fetch_meta_image(source_url, resources)
 
-        # Strategy 3: Try noembed service if we still don't have an image
-        if not image_url:
-            try:
-                response = requests.get(
-                    "https://noembed.com/embed",
-                    params={"url": url},
-                    timeout=4
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    image_url = data.get("thumbnail_url")
-                    # Verify it's valid
-                    if not is_valid_image_url(image_url):
-                        image_url = None
-            except Exception:
-                pass
+        # (noembed is the last tier inside fetch_meta_image, so it isn't repeated here)
 
-        # Strategy 4: Try simple domain-level favicon as a last resort
+        # Strategy 3: Try simple domain-level favicon as a last resort
         if not image_url:
             try:
                 parsed_url = urlparse(url)
                 base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
                 favicon_url = f"{base_url}/favicon.ico"
-                if is_valid_image_url(favicon_url):
+                if is_valid_image_url(favicon_url, session=session):
                     image_url = favicon_url
             except Exception:
                 pass
 
     # If we found an image URL, follow any redirects and update recipe_data
     if image_url:
-        image_url = follow_redirects(image_url)
+        image_url = follow_redirects(image_url, session=session)
         recipe_data["image_url"] = image_url
         return image_url
 
@@ -436,66 +1040,452 @@ def get_recipe_image(url: str, recipe_data: dict) -> str:
 
 # --- Image Caching System ---
 
+IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Memory budget for cached image bytes across all sessions
+IMAGE_CACHE_TTL_SECONDS = 24 * 3600
+
+
+class ImageCache:
+    """
+    Thread-safe, process-wide LRU cache for image bytes with a byte budget and TTL.
+    Shared by every browser session so each image is downloaded once per process.
+    """
+
+    def __init__(self, max_bytes: int = IMAGE_CACHE_MAX_BYTES, ttl_seconds: float = IMAGE_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> {'content', 'content_type', 'timestamp'}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> (lock, holders)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, max_age_seconds: Optional[float] = None) -> Optional[dict]:
+        """Return the cached entry for key (marking it recently used), or None if missing/expired."""
+        return self._lookup(key, max_age_seconds, record_stats=True)
+
+    def peek(self, key: str, max_age_seconds: Optional[float] = None) -> Optional[dict]:
+        """Like get, but not counted in the hit/miss stats (for re-checks after waiting on key_lock)."""
+        return self._lookup(key, max_age_seconds, record_stats=False)
+
+    def _lookup(self, key: str, max_age_seconds: Optional[float], record_stats: bool) -> Optional[dict]:
+        max_age = self.ttl_seconds if max_age_seconds is None else max_age_seconds
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry['timestamp'] >= max_age:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                if record_stats:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if record_stats:
+                self.hits += 1
+            return entry
+
+    def put(self, key: str, content: bytes, content_type: Optional[str] = None,
+            source_time: Optional[datetime] = None) -> None:
+        """
+        Store image bytes, evicting least recently used entries to stay within the byte budget.
+        source_time is when the underlying data was written (see discard_if_older).
+        """
+        if len(content) > self.max_bytes:
+            return  # Never let a single image flush the whole cache
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {'content': content, 'content_type': content_type, 'timestamp': time.time(),
+                                  'source_time': source_time}
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def discard(self, key: str) -> None:
+        """Remove key if cached (used when the underlying data changes)."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def discard_if_older(self, key: str, changed_at: Optional[datetime]) -> None:
+        """
+        Remove key unless its data was written at or after changed_at (always removed when either
+        time is unknown), so an entry refreshed after a change isn't dropped by a late notification.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            source_time = entry.get('source_time')
+            if changed_at is None or source_time is None or source_time < changed_at:
+                self._remove(key)
+
+    def discard_prefix(self, prefix: str) -> int:
+        """Remove every cached key starting with prefix; returns how many were removed."""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    @contextmanager
+    def key_lock(self, key: str):
+        """
+        Per-key lock so concurrent sessions wait for one download instead of starting their own.
+        The lock is dropped when its last holder leaves, whether or not the download succeeded.
+        """
+        with self._lock:
+            lock, holders = self._key_locks.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self._key_locks[key] = (lock, holders + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, holders = self._key_locks[key]
+                if holders <= 1:
+                    del self._key_locks[key]
+                else:
+                    self._key_locks[key] = (lock, holders - 1)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size -= len(entry['content'])
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+@st.cache_resource
+def get_image_cache() -> ImageCache:
+    """Process-wide image cache shared across all sessions."""
+    return ImageCache()
+
+
+IMAGE_DISK_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", os.path.join(".cache", "images"))
+IMAGE_DISK_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB on disk
+IMAGE_DISK_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+class DiskImageCache:
+    """
+    Content store for image bytes on local disk, keyed by get_image_cache_key.
+    Survives restarts; bounded by a byte cap with LRU eviction. Writes go to a
+    temp file and are renamed into place, so readers never see partial files.
+    """
+
+    def __init__(
+        self,
+        directory: str = IMAGE_DISK_CACHE_DIR,
+        max_bytes: int = IMAGE_DISK_CACHE_MAX_BYTES,
+        ttl_seconds: float = IMAGE_DISK_CACHE_TTL_SECONDS,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._index = OrderedDict()  # key -> size, least recently used first
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.img")
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from files on disk, oldest write first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                # Leftover from an interrupted write
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".img"):
+                continue
+            try:
+                file_stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((file_stat.st_mtime, name[:-len(".img")], file_stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._size += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Read cached bytes for key, or None if missing or older than the TTL."""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.ttl_seconds:
+                self.delete(key)
+                with self._lock:
+                    self.misses += 1
+                return None
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            content = None
+        if not content:
+            # File vanished or is empty; drop it from the index
+            self.delete(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def put(self, key: str, content: bytes) -> None:
+        """Atomically write bytes for key, then evict least recently used files over the cap."""
+        if not content or len(content) > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except (OSError, UnboundLocalError):
+                pass
+            return
+        with self._lock:
+            self._size -= self._index.pop(key, 0)
+            self._index[key] = len(content)
+            self._size += len(content)
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._size -= self._index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        # Caller holds the lock (or is the constructor)
+        while self._size > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+@st.cache_resource
+def get_disk_image_cache() -> Optional[DiskImageCache]:
+    """Process-wide on-disk image store, or None if the cache directory isn't usable."""
+    try:
+        return DiskImageCache()
+    except OSError as e:
+        print(f"Warning: Disk image cache disabled: {e}")
+        return None
+
+
 def get_image_cache_key(url: str) -> str:
     """Generate a cache key from an image URL."""
     return hashlib.md5(url.encode()).hexdigest()
 
 
-def cache_image(url: str, max_age_hours: int = 24) -> None:
+def cache_image(url: str, max_age_hours: int = 24, resources: Optional[ExtractionResources] = None) -> Optional[bytes]:
     """
-    Cache an image from a URL in the session state.
-    Includes verification and expiration.
+    Cache an image from a URL in the process-wide image cache.
+    Includes verification and expiration. Returns the cached bytes, or None
+    if the URL doesn't serve a valid image. Background workers pass resources.
     """
     if not url:
-        return
+        return None
 
+    cache = resources.image_cache if resources else get_image_cache()
     cache_key = get_image_cache_key(url)
+    max_age_seconds = max_age_hours * 3600
 
     # Check if already in cache and not expired
-    now = time.time()
-    if cache_key in st.session_state:
-        cached = st.session_state[cache_key]
-        # If cache is still valid, don't reload
-        if cached.get('timestamp') and now - cached['timestamp'] < (max_age_hours * 3600):
-            return
+    entry = cache.get(cache_key, max_age_seconds=max_age_seconds)
+    if entry:
+        return entry['content']
+
+    with cache.key_lock(cache_key):
+        # Another session may have fetched it while we were waiting for the lock
+        entry = cache.peek(cache_key, max_age_seconds=max_age_seconds)
+        if entry:
+            return entry['content']
+
+        # Cold start: serve from the on-disk store if an earlier process saved it
+        disk_cache = resources.disk_image_cache if resources else get_disk_image_cache()
+        if disk_cache:
+            content = disk_cache.get(cache_key)
+            if content:
+                cache.put(cache_key, content)
+                return content
+
+        # Not in cache or expired, try to fetch
+        try:
+            session = resources.http_session if resources else get_http_session()
+            response = session.get(url, timeout=5)
 
-    # Not in cache or expired, try to fetch
-    try:
-        response = requests.get(
-            url,
-            timeout=5,
-            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        )
+            if response.status_code == 200 and response.headers.get('Content-Type', '').startswith('image/'):
+                # Verify it's an actual image by reading its header (no full decode)
+                try:
+                    Image.open(BytesIO(response.content))
+                    cache.put(cache_key, response.content, response.headers.get('Content-Type'))
+                    if disk_cache:
+                        disk_cache.put(cache_key, response.content)
+                    return response.content
+                except Image.UnidentifiedImageError:
+                    # Not a valid image
+                    pass
+        except Exception:
+            # Any error, just skip caching
+            pass
 
-        if response.status_code == 200 and response.headers.get('Content-Type', '').startswith('image/'):
-            # Verify it's an actual image by trying to open it
-            try:
-                img = Image.open(BytesIO(response.content))
-                # Store in session state cache
-                st.session_state[cache_key] = {
-                    'content': response.content,
-                    'content_type': response.headers.get('Content-Type'),
-                    'timestamp': now
-                }
-            except UnidentifiedImageError:
-                # Not a valid image
-                pass
-    except Exception:
-        # Any error, just skip caching
-        pass
+    return None
+
+
+# --- Thumbnails ---
+
+THUMBNAIL_WIDTHS = (320, 640, 1024)  # Fixed variant widths generated on first fetch
+CARD_IMAGE_WIDTH = 640  # Variant served on recipe cards (rendered at up to 500px)
+THUMBNAIL_QUALITY = 80
+EXIF_ORIENTATION_TAG = 0x0112
+STORE_THUMBNAILS_ON_SAVE = True  # Persist the card thumbnail with each saved recipe
+
+
+def get_thumbnail_format() -> Tuple[str, str]:
+    """Preferred (PIL format, MIME type) for thumbnails: WebP when Pillow supports it, else JPEG."""
+    if features.check("webp"):
+        return "WEBP", "image/webp"
+    return "JPEG", "image/jpeg"
+
+
+def make_thumbnails(content: bytes, widths: Tuple[int, ...] = THUMBNAIL_WIDTHS) -> dict:
+    """
+    Decode an image once and produce downscaled variants at each width.
+    Widths at or above the original size map to the original bytes.
+    Returns {width: bytes}.
+    """
+    img = Image.open(BytesIO(content))
+    # Compare against the width as displayed: phone photos are often stored sideways with an
+    # EXIF orientation. Read from the tag, since transposing now would decode at full size.
+    rotated = img.getexif().get(EXIF_ORIENTATION_TAG, 1) in (5, 6, 7, 8)
+    original_width = img.height if rotated else img.width
+    # Let the JPEG decoder skip detail we're about to throw away (square, so it holds either way up)
+    img.draft("RGB", (max(widths), max(widths)))
+    img = ImageOps.exif_transpose(img)
+
+    fmt, _ = get_thumbnail_format()
+    if fmt == "JPEG" or img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if fmt == "WEBP" and "A" in img.getbands() else "RGB")
+
+    variants = {}
+    # Resize largest first so each step starts from the smallest image that's still big enough
+    for width in sorted(widths, reverse=True):
+        if width >= original_width:
+            variants[width] = content
+            continue
+        height = max(1, round(img.height * width / img.width))
+        img = img.resize((width, height), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        img.save(buffer, format=fmt, quality=THUMBNAIL_QUALITY, optimize=fmt == "JPEG")
+        variants[width] = buffer.getvalue()
+    return variants
 
 
-def get_cached_image(url: str) -> Union[bytes, None]:
-    """Retrieve an image from cache if available."""
+def get_thumbnail_cache_key(url: str, width: int) -> str:
+    return f"{get_image_cache_key(url)}-w{width}"
+
+
+def get_image_variant(url: str, width: int = CARD_IMAGE_WIDTH,
+                      resources: Optional[ExtractionResources] = None) -> Optional[bytes]:
+    """
+    Return the image at url downscaled to width (one of THUMBNAIL_WIDTHS).
+    Variants are generated together on first request and kept in the memory
+    and disk caches, so later renders never touch the original. Background workers pass resources.
+    """
     if not url:
         return None
 
-    cache_key = get_image_cache_key(url)
+    cache = resources.image_cache if resources else get_image_cache()
+    disk_cache = resources.disk_image_cache if resources else get_disk_image_cache()
+    variant_key = get_thumbnail_cache_key(url, width)
+
+    entry = cache.get(variant_key)
+    if entry:
+        return entry['content']
+    if disk_cache:
+        content = disk_cache.get(variant_key)
+        if content:
+            cache.put(variant_key, content)
+            return content
+
+    original = cache_image(url, resources=resources)
+    if not original:
+        return None
 
-    if cache_key in st.session_state:
-        return st.session_state[cache_key].get('content')
+    with cache.key_lock(variant_key):
+        entry = cache.peek(variant_key)
+        if entry:
+            return entry['content']
+        try:
+            variants = make_thumbnails(original)
+        except Exception:
+            # Can't decode/re-encode (e.g. unusual format); serve the original
+            return original
+        _, mime = get_thumbnail_format()
+        for variant_width, content in variants.items():
+            key = get_thumbnail_cache_key(url, variant_width)
+            cache.put(key, content, mime if content is not original else None)
+            if disk_cache:
+                disk_cache.put(key, content)
 
-    return None
+    return variants.get(width, original)
 
 
 # --- Display Functions ---
@@ -516,47 +1506,37 @@ def display_recipe_image(recipe: dict, use_container_width: bool = True, width:
     if width is None and use_container_width:
         width = max_desktop_width
 
-    if image_url and isinstance(image_url, str) and image_url.startswith(('http://', 'https://')):
-        # Try to get from cache first
-        image_data = get_cached_image(image_url)
+    # Freshly uploaded image in the preview, before the recipe is saved
+    if recipe.get("uploaded_image"):
+        try:
+            st.image(recipe["uploaded_image"], use_container_width=use_container_width, width=width, caption=recipe.get('title', ''))
+            return
+        except Exception:
+            pass
 
+    # Saved recipes carry their own thumbnail; no external request needed
+    if recipe.get("thumbnail_stored") and recipe.get("_id"):
+        image_data = get_stored_thumbnail(recipe["_id"])
         if image_data:
-            # Display from cached data
             try:
-                img = Image.open(BytesIO(image_data))
-                st.image(img, use_container_width=use_container_width, width=width, caption=recipe.get('title', ''))
+                st.image(image_data, use_container_width=use_container_width, width=width, caption=recipe.get('title', ''))
                 return
             except Exception:
-                # Fall through to direct URL if cached image fails
                 pass
 
-        # Try loading directly from URL (will be cached for next time)
-        try:
-            # Attempt to cache the image first
-            cache_image(image_url)
-
-            # Most reliable way - always try to load through requests first to handle redirects, etc.
-            response = requests.get(
-                image_url,
-                timeout=5,
-                headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-            )
+    if image_url and isinstance(image_url, str) and image_url.startswith(('http://', 'https://')):
+        # Single fetch-validate path: memory cache, then disk, then one download,
+        # served as a card-sized variant rather than the full-resolution original
+        image_data = get_image_variant(image_url, CARD_IMAGE_WIDTH)
 
-            if response.status_code == 200 and response.headers.get('Content-Type', '').startswith('image/'):
-                try:
-                    img = Image.open(BytesIO(response.content))
-                    st.image(img, use_container_width=use_container_width, width=width, caption=recipe.get('title', ''))
-                    return
-                except UnidentifiedImageError:
-                    # Not a valid image, fall through to placeholder
-                    pass
-            else:
-                # Direct attempt with Streamlit
-                st.image(image_url, use_container_width=use_container_width, width=width, caption=recipe.get('title', ''))
+        if image_data:
+            try:
+                # Hand the stored bytes straight to Streamlit; it decodes them at most once
+                st.image(image_data, use_container_width=use_container_width, width=width, caption=recipe.get('title', ''))
                 return
-        except Exception:
-            # Any error, fall through to placeholder
-            pass
+            except Exception:
+                # Any error, fall through to placeholder
+                pass
 
     # If we got here, we need to show a placeholder
     # Use a nicer food-themed placeholder
@@ -576,8 +1556,511 @@ def display_recipe_image(recipe: dict, use_container_width: bool = True, width:
         except Exception:
             continue
 
+# --- Structured Recipe Data (schema.org) ---
+
+REQUIRED_RECIPE_FIELDS = ("title", "ingredients", "instructions")
+
+
+def _is_recipe_type(value) -> bool:
+    types = value if isinstance(value, list) else [value]
+    return any(isinstance(t, str) and t.split(":")[-1].split("/")[-1] == "Recipe" for t in types)
+
+
+def find_jsonld_recipes(soup: bs4.BeautifulSoup) -> list[dict]:
+    """All schema.org Recipe objects in the page's JSON-LD (top level, lists, @graph or nested)."""
+    recipes = []
+
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, dict):
+            if _is_recipe_type(node.get("@type")):
+                recipes.append(node)
+                return
+            for value in node.values():
+                if isinstance(value, (dict, list)):
+                    walk(value)
+
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            walk(json.loads(script.string))
+        except (json.JSONDecodeError, TypeError):
+            continue
+    return recipes
+
+
+def _microdata_value(tag) -> str:
+    for attr in ("content", "datetime", "src", "href"):
+        if tag.get(attr):
+            return tag[attr]
+    return tag.get_text(" ", strip=True)
+
+
+MICRODATA_LIST_PROPS = {"recipeIngredient", "ingredients", "recipeInstructions", "image"}
+
+
+def find_microdata_recipes(soup: bs4.BeautifulSoup) -> list[dict]:
+    """schema.org Recipe microdata (itemscope/itemprop), converted to the same shape as JSON-LD."""
+    recipes = []
+    for scope in soup.find_all(attrs={"itemtype": re.compile(r"schema\.org/Recipe$", re.I)}):
+        data = {"@type": "Recipe"}
+        for tag in scope.find_all(attrs={"itemprop": True}):
+            # Properties of nested items (e.g. a HowToStep's own "text") belong to that item;
+            # the nested item itself is read as text
+            if tag.find_parent(attrs={"itemscope": True}) is not scope:
+                continue
+            value = tag.get_text(" ", strip=True) if tag.has_attr("itemscope") else _microdata_value(tag)
+            for prop in tag["itemprop"].split():
+                data.setdefault(prop, []).append(value)
+        for prop, values in data.items():
+            if isinstance(values, list) and len(values) == 1 and prop not in MICRODATA_LIST_PROPS:
+                data[prop] = values[0]
+        recipes.append(data)
+    return recipes
+
+
+def _clean_text(value) -> str:
+    """Strip tags, entities and runs of whitespace from a schema.org text value."""
+    if value is None:
+        return ""
+    text = unescape(re.sub(r"<[^>]+>", " ", str(value)))
+    return " ".join(text.split())
+
+
+def _text_list(value) -> list[str]:
+    if value is None:
+        return []
+    items = value if isinstance(value, list) else [value]
+    return [text for text in (_clean_text(item) for item in items) if text]
+
+
+def _instruction_steps(value) -> list[str]:
+    """Flatten recipeInstructions: a string, strings, HowToStep objects or HowToSection groups."""
+    if isinstance(value, str):
+        return [line for line in (_clean_text(part) for part in re.split(r"\n+|<br\s*/?>|</p>|</li>", value)) if line]
+    if isinstance(value, dict):
+        if value.get("itemListElement"):
+            return _instruction_steps(value["itemListElement"])
+        return _text_list(value.get("text") or value.get("name"))
+    steps = []
+    for item in value or []:
+        steps.extend(_instruction_steps(item))
+    return steps
+
+
+def format_iso_duration(value) -> Optional[str]:
+    """'PT1H30M' -> '1 hour 30 minutes'; values that aren't ISO 8601 durations are returned as-is."""
+    if not value:
+        return None
+    match = re.fullmatch(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?", str(value).strip(), re.I)
+    if not match:
+        return _clean_text(value) or None
+    days, hours, minutes, seconds = (float(part or 0) for part in match.groups())
+    total_seconds = round(((days * 24 + hours) * 60 + minutes) * 60 + seconds)
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    parts = []
+    for amount, unit in ((hours, "hour"), (minutes, "minute"), (seconds, "second")):
+        if amount:
+            parts.append(f"{amount} {unit}{'s' if amount != 1 else ''}")
+    return " ".join(parts) or None
+
+
+def _first_image(value, page_url: str) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("url") or value.get("contentUrl")
+    return urljoin(page_url, value.strip()) if isinstance(value, str) and value.strip() else None
+
+
+def map_schema_recipe(data: dict, page_url: str) -> dict:
+    """Map a schema.org Recipe object onto our recipe schema (same fields the Gemini prompts use)."""
+    keywords = data.get("keywords")
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    servings = data.get("recipeYield")
+    if isinstance(servings, list):
+        servings = servings[0] if servings else None
+    return {
+        "title": _clean_text(data.get("name")) or None,
+        "description": _clean_text(data.get("description")) or None,
+        "prep_time": format_iso_duration(data.get("prepTime")),
+        "cook_time": format_iso_duration(data.get("cookTime")),
+        "total_time": format_iso_duration(data.get("totalTime")),
+        "servings": _clean_text(servings) or None,
+        "ingredients": _text_list(data.get("recipeIngredient") or data.get("ingredients")),
+        "instructions": _instruction_steps(data.get("recipeInstructions")),
+        "cuisine": ", ".join(_text_list(data.get("recipeCuisine"))) or None,
+        "meal_type": ", ".join(_text_list(data.get("recipeCategory"))) or None,
+        "keywords": _text_list(keywords),
+        "image_url": _first_image(data.get("image"), page_url),
+    }
+
+
+def missing_recipe_fields(recipe) -> list[str]:
+    """Required fields that are empty, plus list fields of the wrong type (everything if it isn't an object)."""
+    if not isinstance(recipe, dict):
+        return list(REQUIRED_RECIPE_FIELDS)
+    missing = [field for field in REQUIRED_RECIPE_FIELDS if not recipe.get(field)]
+    for field in ("ingredients", "instructions", "keywords"):
+        if recipe.get(field) and not isinstance(recipe[field], list) and field not in missing:
+            missing.append(field)
+    return missing
+
+
+def describe_missing_fields(missing: list[str]) -> str:
+    """Hebrew names of missing recipe fields, for the partial-result warning."""
+    labels = {"title": "recipe_title", "keywords": "tags"}
+    return ", ".join(get_translation(labels.get(field, field)) for field in missing)
+
+
+def is_complete_recipe(recipe: Optional[dict]) -> bool:
+    """True if the recipe has every field we need (title, ingredients, instructions as lists)."""
+    return bool(recipe) and not missing_recipe_fields(recipe)
+
+
+def extract_structured_recipe(page: FetchedPage) -> Optional[dict]:
+    """
+    Best schema.org Recipe on the page (JSON-LD first, then microdata), mapped onto our schema.
+    Returns None if the page has no Recipe markup.
+    """
+    recipes = [map_schema_recipe(data, page.final_url) for data in page.recipe_data()]
+    if not recipes:
+        return None
+    # Prefer the most complete object (some pages also embed short "related recipe" entries)
+    return max(recipes, key=lambda r: (is_complete_recipe(r), len(r["ingredients"]) + len(r["instructions"])))
+
+
+def merge_recipe_fields(primary: dict, fallback: dict) -> dict:
+    """Fill primary's empty fields from fallback."""
+    for key, value in fallback.items():
+        if value and not primary.get(key):
+            primary[key] = value
+    return primary
+
+
+# --- Extraction Cache ---
+
+# Model tiers, cheapest/fastest first; the router escalates only when a result is incomplete.
+# Overridable with comma-separated GEMINI_URL_MODELS / GEMINI_IMAGE_MODELS.
+DEFAULT_EXTRACTION_MODELS = "gemini-1.5-flash-latest,gemini-1.5-pro-latest"
+
+
+def model_list_from_env(name: str, default: str = DEFAULT_EXTRACTION_MODELS) -> Tuple[str, ...]:
+    """Comma-separated model names from an env var, trimmed and without empty entries (default if none)."""
+    models = tuple(model.strip() for model in os.environ.get(name, "").split(",") if model.strip())
+    return models or tuple(default.split(","))
+
+
+URL_EXTRACTION_MODELS = model_list_from_env("GEMINI_URL_MODELS")
+IMAGE_EXTRACTION_MODELS = model_list_from_env("GEMINI_IMAGE_MODELS")
+EXTRACTION_PROMPT_VERSION = 3  # Bump whenever a prompt or the structured-data mapping changes
+EXTRACTION_CACHE_TTL_SECONDS = 30 * 24 * 3600
+TRACKING_PARAM_PREFIXES = ("utm_",)
+# Only well-known click/campaign trackers; generic names like "ref" or "id" can select the recipe
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+                   "_ga", "_gl", "ref_src"}
+
+
+def utc_now() -> datetime:
+    """Current time as an aware UTC datetime (MongoDB stores dates, and runs TTL indexes, in UTC)."""
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Datetimes read back from MongoDB are naive UTC; make them aware so they compare with utc_now()."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalise a URL so equivalent links compare equal: lower-case scheme/host, no default
+    port, fragment or trailing slash, tracking parameters removed and the rest sorted.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme, parsed.port) in (("http", 80), ("https", 443)):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    return urlunparse((scheme, netloc, parsed.path.rstrip("/") or "/", "", urlencode(query), ""))
+
+
+def extraction_cache_key(kind: str, identity: str, models: Tuple[str, ...]) -> str:
+    """Cache key for one extraction: source kind, prompt version, model tiers and the source identity."""
+    return f"{kind}:v{EXTRACTION_PROMPT_VERSION}:{'+'.join(models)}:{hashlib.sha256(identity.encode()).hexdigest()}"
+
+
+class ExtractionCache:
+    """
+    Persistent (MongoDB) cache of extraction results, so re-submitting a URL or photo
+    returns instantly instead of paying for another model call. Entries expire via a
+    TTL index; lookups fall back to a miss if MongoDB errors.
+    """
+
+    def __init__(self, collection, ttl_seconds: float = EXTRACTION_CACHE_TTL_SECONDS):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+        try:
+            collection.create_index("created_at", expireAfterSeconds=int(ttl_seconds), name="created_at_ttl")
+        except pymongo.errors.PyMongoError as e:
+            print(f"Warning: Could not ensure extraction cache TTL index: {e}")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Cached recipe for key (a fresh copy), or None."""
+        try:
+            doc = self.collection.find_one({"_id": key}, {"recipe": 1, "created_at": 1})
+        except pymongo.errors.PyMongoError as e:
+            print(f"Warning: extraction cache lookup failed: {e}")
+            self._count("errors")
+            doc = None
+        # The TTL monitor only runs periodically, so check the age here as well
+        if doc is None or (utc_now() - as_utc(doc["created_at"])).total_seconds() >= self.ttl_seconds:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return dict(doc["recipe"])
+
+    def put(self, keys, recipe: dict) -> None:
+        """Store recipe under each key (e.g. both the requested and the redirected URL)."""
+        now = utc_now()
+        for key in dict.fromkeys(keys):
+            try:
+                self.collection.replace_one({"_id": key}, {"recipe": dict(recipe), "created_at": now}, upsert=True)
+                self._count("stores")
+            except pymongo.errors.PyMongoError as e:
+                print(f"Warning: could not store extraction result: {e}")
+                self._count("errors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "errors": self.errors,
+                "ttl_days": self.ttl_seconds / 86400,
+            }
+
+
+@st.cache_resource
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide handle on the persistent extraction cache."""
+    return ExtractionCache(get_extraction_cache_collection())
+
+
 # --- Gemini Recipe Extraction ---
 
+GEMINI_REQUESTS_PER_MINUTE = int(os.environ.get("GEMINI_RPM", "60"))  # Process-wide cap across sessions and workers
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly so at most calls_per_minute start per minute."""
+
+    def __init__(self, calls_per_minute: int):
+        self.interval = 60.0 / calls_per_minute if calls_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.timeouts = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until this caller's slot comes up and return True. With a timeout, return False
+        at once (without using up a slot) if the slot wouldn't come up within it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            if timeout is not None and slot - now > timeout:
+                self.timeouts += 1
+                return False
+            self._next_slot = slot + self.interval
+            self.calls += 1
+            self.waited_seconds += slot - now
+        if slot > now:
+            time.sleep(slot - now)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "timeouts": self.timeouts, "waited_seconds": round(self.waited_seconds, 2),
+                    "calls_per_minute": round(60.0 / self.interval) if self.interval else None}
+
+
+@st.cache_resource
+def get_gemini_rate_limiter() -> RateLimiter:
+    """Shared Gemini request limiter (GEMINI_RPM env var)."""
+    return RateLimiter(GEMINI_REQUESTS_PER_MINUTE)
+
+
+GEMINI_CALL_TIMEOUT_SECONDS = 30  # Deadline for a single model call
+EXTRACTION_DEADLINE_SECONDS = 90  # Deadline for all tiers of one extraction together
+MIN_CALL_SECONDS = 5  # Don't start another tier with less time than this left
+
+
+class ModelStats:
+    """Thread-safe per-model call outcomes and latency for the model router."""
+
+    OUTCOMES = ("ok", "incomplete", "timeout", "error")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+
+    def record(self, model_name: str, seconds: float, outcome: str) -> None:
+        with self._lock:
+            stats = self._models.setdefault(
+                model_name, {"calls": 0, **{outcome: 0 for outcome in self.OUTCOMES}, "total_s": 0.0})
+            stats["calls"] += 1
+            stats[outcome] += 1
+            stats["total_s"] += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                model_name: {
+                    **s,
+                    "avg_s": round(s["total_s"] / s["calls"], 2) if s["calls"] else 0.0,
+                    "success_rate": s["ok"] / s["calls"] if s["calls"] else 0.0,
+                }
+                for model_name, s in self._models.items()
+            }
+
+
+@st.cache_resource
+def get_model_stats() -> ModelStats:
+    return ModelStats()
+
+
+class ExtractionResources:
+    """
+    The process-wide objects an extraction (and saving its result) uses, resolved once in a
+    script thread. Background job workers have no ScriptRunContext, so they are handed these
+    instead of calling the st.cache_resource getters (or get_database, which calls st.stop).
+    """
+
+    def __init__(self, http_session: PooledSession, page_cache: PageCache,
+                 image_discovery_stats: ImageDiscoveryStats, image_cache: ImageCache,
+                 disk_image_cache: Optional[DiskImageCache], extraction_cache: ExtractionCache,
+                 rate_limiter: RateLimiter, model_stats: ModelStats, recipes_collection,
+                 recipe_images_collection, app_meta_collection, query_cache: QueryCache):
+        self.http_session = http_session
+        self.page_cache = page_cache
+        self.image_discovery_stats = image_discovery_stats
+        self.image_cache = image_cache
+        self.disk_image_cache = disk_image_cache
+        self.extraction_cache = extraction_cache
+        self.rate_limiter = rate_limiter
+        self.model_stats = model_stats
+        self.recipes_collection = recipes_collection
+        self.recipe_images_collection = recipe_images_collection
+        self.app_meta_collection = app_meta_collection
+        self.query_cache = query_cache
+
+
+@st.cache_resource
+def get_extraction_resources() -> ExtractionResources:
+    """Resolve (and create, on first use) everything extraction needs; Gemini is configured too."""
+    configure_gemini()
+    return ExtractionResources(
+        http_session=get_http_session(),
+        page_cache=get_page_cache(),
+        image_discovery_stats=get_image_discovery_stats(),
+        image_cache=get_image_cache(),
+        disk_image_cache=get_disk_image_cache(),
+        extraction_cache=get_extraction_cache(),
+        rate_limiter=get_gemini_rate_limiter(),
+        model_stats=get_model_stats(),
+        recipes_collection=get_recipes_collection(),
+        recipe_images_collection=get_recipe_images_collection(),
+        app_meta_collection=get_app_meta_collection(),
+        query_cache=get_query_cache(),
+    )
+
+
+def parse_model_json(response_text: str):
+    """JSON from a model response (raises ValueError if there is none)."""
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        # Fallback parsing if response_mime_type didn't enforce JSON correctly
+        return parse_gemini_json_output(response_text)
+
+
+def generate_recipe_json(contents, models: Tuple[str, ...],
+                         deadline_seconds: float = EXTRACTION_DEADLINE_SECONDS,
+                         resources: Optional[ExtractionResources] = None) -> Optional[dict]:
+    """
+    Model router: ask each model in turn (cheapest first) and return the first result that
+    passes missing_recipe_fields. A failed, timed-out or incomplete call escalates to the next
+    tier while the overall deadline allows. If no tier is complete, the most complete (partial)
+    result is returned, so callers check missing_recipe_fields before caching it; if every call
+    failed, the last error is raised (TimeoutError if the deadline left no time for any call).
+    """
+    resources = resources or get_extraction_resources()  # Also configures Gemini
+    stats = resources.model_stats
+    deadline = time.monotonic() + deadline_seconds
+    best, best_missing, last_error = None, None, None
+    for model_name in models:
+        # Wait for a rate limiter slot only while a call could still start with MIN_CALL_SECONDS left
+        remaining = deadline - time.monotonic()
+        if remaining < MIN_CALL_SECONDS:
+            last_error = last_error or TimeoutError("Extraction deadline reached before a Gemini call could start")
+            break
+        if not resources.rate_limiter.acquire(timeout=remaining - MIN_CALL_SECONDS):
+            last_error = last_error or TimeoutError("No Gemini rate limit slot before the extraction deadline")
+            break
+        remaining = deadline - time.monotonic()
+        start = time.perf_counter()
+        try:
+            response = genai.GenerativeModel(model_name).generate_content(
+                contents,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.1, # Lower temperature for more deterministic extraction
+                    response_mime_type="application/json" # Request JSON directly
+                ),
+                request_options={"timeout": min(GEMINI_CALL_TIMEOUT_SECONDS, remaining)},
+            )
+            recipe_data = parse_model_json(response.text)
+        except Exception as e:
+            timed_out = isinstance(e, (google_exceptions.DeadlineExceeded, requests.Timeout, TimeoutError))
+            stats.record(model_name, time.perf_counter() - start, "timeout" if timed_out else "error")
+            print(f"Warning: {model_name} call failed: {e}")
+            last_error = e
+            continue
+
+        missing = missing_recipe_fields(recipe_data)
+        stats.record(model_name, time.perf_counter() - start, "incomplete" if missing else "ok")
+        if not missing:
+            return recipe_data
+        if isinstance(recipe_data, dict) and (best_missing is None or len(missing) < best_missing):
+            best, best_missing = recipe_data, len(missing)
+
+    if best is not None:
+        return best
+    if last_error is not None:
+        raise last_error
+    return None
+
+
 def parse_gemini_json_output(response_text):
     """Attempts to parse JSON from Gemini's response text, handling common issues."""
     # Try finding JSON within ```json ... ```
@@ -613,196 +2096,711 @@ def parse_gemini_json_output(response_text):
             raise ValueError(f"Failed to parse JSON from LLM response: {e2}")
 
 
-def fetch_meta_image(page_url: str) -> str | None:
+# Defaults for photo preprocessing, overridable with environment variables
+MODEL_IMAGE_MAX_SIDE = int(os.environ.get("MODEL_IMAGE_MAX_SIDE", "2048"))
+MODEL_IMAGE_JPEG_QUALITY = int(os.environ.get("MODEL_IMAGE_JPEG_QUALITY", "85"))
+MODEL_IMAGE_GRAYSCALE = os.environ.get("MODEL_IMAGE_GRAYSCALE", "").lower() in ("1", "true", "yes")
+MODEL_IMAGE_EXIF_ROTATE = os.environ.get("MODEL_IMAGE_EXIF_ROTATE", "1").lower() not in ("0", "false", "no")
+
+
+class ImagePreprocessing:
+    """
+    How photos are prepared for a vision call. The defaults come from environment variables
+    (MODEL_IMAGE_*); bench_image_preprocessing.py measures latency and accuracy for other settings.
+    """
+
+    def __init__(self, max_side: int = MODEL_IMAGE_MAX_SIDE, jpeg_quality: int = MODEL_IMAGE_JPEG_QUALITY,
+                 grayscale: bool = MODEL_IMAGE_GRAYSCALE, exif_rotate: bool = MODEL_IMAGE_EXIF_ROTATE):
+        self.max_side = max_side  # Longest side in pixels; 0 keeps the original size
+        self.jpeg_quality = jpeg_quality
+        self.grayscale = grayscale  # Recipe text reads fine without colour, at a smaller payload
+        self.exif_rotate = exif_rotate  # Phone photos are often stored sideways with an EXIF flag
+
+    def __repr__(self) -> str:
+        return (f"ImagePreprocessing(max_side={self.max_side}, jpeg_quality={self.jpeg_quality}, "
+                f"grayscale={self.grayscale}, exif_rotate={self.exif_rotate})")
+
+
+MODEL_IMAGE_PREPROCESSING = ImagePreprocessing()
+
+
+def prepare_image_for_model(image, settings: Optional[ImagePreprocessing] = None) -> dict:
+    """
+    Rotate, downsize and re-encode a photo as JPEG before a vision call (otherwise the SDK
+    uploads it as full-resolution lossless WebP). Returns a Gemini blob part.
+    """
+    settings = settings or MODEL_IMAGE_PREPROCESSING
+    mode = "L" if settings.grayscale else "RGB"
+    if settings.max_side:
+        # JPEG: let the decoder scale down while decoding (no-op if already loaded or not a JPEG)
+        image.draft(mode, (settings.max_side, settings.max_side))
+    if settings.exif_rotate:
+        image = ImageOps.exif_transpose(image)
+    if image.mode != mode:
+        image = image.convert(mode)
+    if settings.max_side:
+        image.thumbnail((settings.max_side, settings.max_side), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=settings.jpeg_quality, optimize=True)
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
+
+
+def call_image_model(pages: list[dict], models: Tuple[str, ...] = IMAGE_EXTRACTION_MODELS,
+                     resources: Optional[ExtractionResources] = None) -> Optional[dict]:
+    """Routed vision call for prepared page blobs (no caching). Errors from every tier are raised."""
+    prompt = """
+    You are an expert recipe analyser. Extract the complete recipe from the provided image.
+    Return the result ONLY as a valid JSON object with the following fields:
+    {
+        "title": "Recipe title (string)",
+        "description": "Brief description of the dish (string, optional)",
+        "prep_time": "Preparation time (string, e.g., '15 minutes', optional)",
+        "cook_time": "Cooking time (string, e.g., '30 minutes', optional)",
+        "total_time": "Total time (string, e.g., '45 minutes', optional)",
+        "servings": "Number of servings (string or number, optional)",
+        "ingredients": ["List of ingredients with quantities (array of strings)"],
+        "instructions": ["List of preparation/cooking steps (array of strings)"],
+        "cuisine": "Type of cuisine (string, e.g., 'Italian', 'Asian', optional)",
+        "meal_type": "Type of meal (string, e.g., 'Breakfast', 'Dinner', 'Dessert', optional)",
+        "keywords": ["List of relevant keywords/tags (array of strings, optional)"]
+    }
+    If a field is not clearly present in the image, use null or an empty array/string as appropriate for the field type.
+    Focus ONLY on extracting information present in the image. Do not add external knowledge.
+    Ensure the output is a single, valid JSON object and nothing else.
+    """
+    if len(pages) > 1:
+        prompt += f"""
+    The {len(pages)} images are consecutive pages of ONE recipe, in order. Combine them into a single recipe.
+    """
+
+    return generate_recipe_json([prompt, *pages], models, resources=resources)
+
+
+def run_image_extraction(images, settings: Optional[ImagePreprocessing] = None,
+                         resources: Optional[ExtractionResources] = None) -> Optional[dict]:
+    """
+    Extract recipe information from an image (or a list of consecutive pages of one recipe)
+    using Gemini Pro Vision.
+    Errors are raised; ExtractionJobQueue records them as the job's error.
     """
-    Grab <meta property="og:image">, <meta name="twitter:image"> or <link rel="image_src">
-    from the raw HTML. Returns the first absolute URL found, or None.
+    pages = [prepare_image_for_model(image, settings) for image in (images if isinstance(images, list) else [images])]
+
+    # Same photo(s) with the same preprocessing, prompt and model -> reuse the earlier result
+    digest = hashlib.sha256()
+    for page in pages:
+        digest.update(page["data"])
+    resources = resources or get_extraction_resources()
+    extraction_cache = resources.extraction_cache
+    cache_key = extraction_cache_key("image", digest.hexdigest(), IMAGE_EXTRACTION_MODELS)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    recipe_data = call_image_model(pages, resources=resources)
+    # A partial result (e.g. the better tier timed out) would pin the gap for the cache TTL; retry next time
+    if recipe_data and not missing_recipe_fields(recipe_data):
+        extraction_cache.put([cache_key], recipe_data)
+    return recipe_data
+
+
+def extract_recipe_with_gemini(url: str, page: Optional[FetchedPage],
+                               resources: Optional[ExtractionResources] = None) -> Optional[dict]:
+    """
+    Ask Gemini (through the model router) for the recipe, giving it the page's main text (or
+    just the URL if the page couldn't be fetched). Errors from every tier are raised to the caller.
+    """
+    if page is not None:
+        # The main text leaves out <head>, so pass its image meta tags along separately
+        meta_images = ", ".join(page.meta_images()[:3]) or "none"
+        page_source = f"""Below is the main text content of the webpage at {url}.
+    Images declared in the page's meta tags (og:image, twitter:image, ...): {meta_images}
+    --- PAGE CONTENT ---
+    {page.main_text()}
+    --- END PAGE CONTENT ---"""
+    else:
+        page_source = f"Please analyze the content of the webpage at the following URL: {url}"
+
+    # --- Enhanced Prompt ---
+    prompt = f"""
+    {page_source}
+    This page contains a recipe. Extract the complete recipe details.
+    Return the result ONLY as a single, valid JSON object with the following fields:
+    {{
+        "title": "Recipe title (string)",
+        "description": "Brief description of the dish (string, optional)",
+        "prep_time": "Preparation time (string, e.g., '15 minutes', optional)",
+        "cook_time": "Cooking time (string, e.g., '30 minutes', optional)",
+        "total_time": "Total time (string, e.g., '45 minutes', optional)",
+        "servings": "Number of servings (string or number, optional)",
+        "ingredients": ["List of ingredients with quantities (array of strings)"],
+        "instructions": ["List of preparation/cooking steps (array of strings)"],
+        "cuisine": "Type of cuisine (string, e.g., 'Italian', 'Asian', optional)",
+        "meal_type": "Type of meal (string, e.g., 'Breakfast', 'Dinner', 'Dessert', optional)",
+        "keywords": ["List of relevant keywords/tags (array of strings, optional)"],
+        "image_url": "URL of the main, featured recipe image (string, optional). Prioritize images specified in meta tags (like og:image) or the primary image clearly associated with the finished dish."
+    }}
+    If a field is not clearly present on the page, use null or an empty array/string as appropriate.
+    Focus ONLY on extracting information present on the webpage. Do not add external knowledge.
+
+    IMPORTANT for image_url: Identify the primary, featured image representing the final dish. Prefer the meta tag images (like 'og:image' or 'twitter:image') when they are given. Avoid logos, ingredient photos, user avatars, or advertisement images. If no suitable main image URL is found, return null for the 'image_url' field.
+
+    Ensure the output is a single, valid JSON object and nothing else.
+    """
+    # --- End Enhanced Prompt ---
+
+    return generate_recipe_json(prompt, URL_EXTRACTION_MODELS, resources=resources)
+
+
+def run_url_extraction(url: str, resources: Optional[ExtractionResources] = None) -> Optional[dict]:
     """
+    Extract recipe information from a URL (schema.org data or Gemini), with enhanced image handling.
+    Errors are raised; ExtractionJobQueue (and bulk import) record them per item.
+    """
+    resources = resources or get_extraction_resources()
+    # Same canonical URL with the same prompt/model -> reuse the earlier result
+    extraction_cache = resources.extraction_cache
+    cache_keys = [extraction_cache_key("url", canonicalize_url(url), URL_EXTRACTION_MODELS)]
+    cached = extraction_cache.get(cache_keys[0])
+    if cached is not None:
+        cached["source_url"] = url
+        return cached
+
+    # Download the page once; structured data, the model prompt and image discovery
+    # below all read the same cached document
+    page = fetch_page(url, resources=resources)
+
+    # Shortened/tracking links: look up the page's final address too
+    if page is not None and canonicalize_url(page.final_url) != canonicalize_url(url):
+        cache_keys.append(extraction_cache_key("url", canonicalize_url(page.final_url), URL_EXTRACTION_MODELS))
+        cached = extraction_cache.get(cache_keys[1])
+        if cached is not None:
+            extraction_cache.put(cache_keys[:1], cached)
+            cached["source_url"] = url
+            return cached
+
+    # Fast path: most recipe sites embed a complete schema.org Recipe, which needs no model call
+    structured = extract_structured_recipe(page) if page is not None else None
+    if is_complete_recipe(structured):
+        recipe_data = structured
+    else:
+        recipe_data = extract_recipe_with_gemini(url, page, resources)
+        if recipe_data and structured:
+            merge_recipe_fields(recipe_data, structured)
+
+    # --- Enhanced Image Handling ---
+    if recipe_data:
+        recipe_data["source_url"] = url # Add source URL
+
+        # Use our enhanced image fetching function (reads the page cached by fetch_page)
+        get_recipe_image(url, recipe_data, resources)
+
+        # If we have an image URL, try to cache it in advance
+        if recipe_data.get("image_url"):
+            try:
+                cache_image(recipe_data["image_url"], resources=resources)
+            except Exception:
+                # Ignore caching errors
+                pass
+
+        # A partial result (e.g. the better tier timed out) would pin the gap for the cache TTL; retry next time
+        if not missing_recipe_fields(recipe_data):
+            extraction_cache.put(cache_keys, recipe_data)
+
+    return recipe_data
+
+
+# --- Database Operations ---
+
+QUERY_CACHE_MAX_ENTRIES = 500
+QUERY_CACHE_TTL_SECONDS = 15 * 60
+
+
+RECIPE_FILTER_FIELDS = ("cuisine", "meal_type")  # Fields the recipe list can be filtered on
+
+
+def list_scopes(filters: Optional[dict]) -> list[tuple]:
+    """
+    Query cache scopes a list result depends on: each (field, value) it filters on plus that
+    field's wildcard (a change whose old value is unknown), or ("unfiltered",) without filters.
+    """
+    if not filters:
+        return [("unfiltered",)]
+    return [scope for field, value in sorted(filters.items()) for scope in ((field, value), (field, "*"))]
+
+
+class QueryCache:
+    """
+    Process-wide cache of list/search query results shared by all sessions.
+    Each result depends on scopes (see list_scopes; search, count and filter options depend
+    on ("any",)), and each scope has a generation. A recipe write bumps only the scopes that
+    recipe can appear in (invalidate_recipe), so lists filtered on other cuisines/meal types
+    stay cached; invalidate() bumps everything. Results computed against an older generation
+    are never stored. Values are deep-copied in and out, so no session can modify another's
+    results (recipes carry nested ingredient/tag lists).
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES, ttl_seconds: float = QUERY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0  # Generation of every scope at once (bumped by invalidate())
+        self._generations = {}  # scope -> generation
+        self._entries = OrderedDict()  # key -> (stamp, timestamp, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.recipe_invalidations = 0
+
+    def _stamp(self, scopes) -> tuple:
+        # Caller holds the lock
+        return (self.version, *(self._generations.get(scope, 0) for scope in scopes))
+
+    def stamp(self, scopes) -> tuple:
+        """Current generations of scopes; a result (or page) computed now is valid while this is unchanged."""
+        with self._lock:
+            return self._stamp(scopes)
+
+    def get(self, key: str, scopes=(("any",),)):
+        """Return (True, a copy of the value) for a current cached result, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == self._stamp(scopes) and time.time() - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = entry[2]
+            else:
+                if entry:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+        # Stored values are never modified, so they can be copied outside the lock
+        return True, copy.deepcopy(value)
+
+    def put(self, key: str, value, stamp: tuple, scopes=(("any",),)) -> None:
+        """Store a copy of a result computed while scopes were at stamp."""
+        value = copy.deepcopy(value)  # The caller keeps (and may modify) the original
+        with self._lock:
+            if stamp != self._stamp(scopes):
+                return  # A write landed while the query ran; the result may be stale
+            self._entries[key] = (stamp, time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached result (after bulk writes, or when what changed is unknown)."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def invalidate_recipe(self, recipe_id, docs: list[dict]) -> None:
+        """
+        A recipe was written: bump the scopes it can appear in. docs are its known versions
+        (before and/or after the write); a filter field missing from one of them counts as
+        unknown, which invalidates every list filtered on that field.
+        """
+        scopes = {("any",), ("unfiltered",), ("recipe", str(recipe_id))}
+        for doc in docs or [{}]:
+            for field in RECIPE_FILTER_FIELDS:
+                scopes.add((field, doc[field]) if field in doc else (field, "*"))
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            self.recipe_invalidations += 1
+        # Stale entries are dropped lazily by get() (and by LRU eviction)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "recipe_invalidations": self.recipe_invalidations,
+            }
+
+
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    """Process-wide recipe query cache shared across all sessions."""
+    return QueryCache()
+
+
+def cached_query(kind: str, params: tuple, run, scopes=(("any",),)):
+    """Return run() through the shared query cache, keyed by kind and params (see QueryCache for scopes)."""
+    cache = get_query_cache()
+    key = f"{kind}:{params!r}"
+    found, value = cache.get(key, scopes)
+    if found:
+        return value
+    stamp = cache.stamp(scopes)
+    value = run()
+    cache.put(key, value, stamp, scopes)
+    return value
+
+def store_recipe_thumbnail(recipe_id, content: bytes, content_type: Optional[str] = None,
+                           resources: Optional[ExtractionResources] = None) -> bool:
+    """Store a card thumbnail for a recipe in the side collection. Returns True on success."""
+    collection = resources.recipe_images_collection if resources else get_recipe_images_collection()
     try:
-        resp = requests.get(page_url, timeout=5, headers={"User-Agent": "Mozilla/5.0"})
-        html = resp.text
-    except requests.RequestException:
-        return None
+        collection.replace_one(
+            {"_id": recipe_id},
+            {
+                "_id": recipe_id,
+                "content": bson.Binary(content),
+                "content_type": content_type,
+                "width": CARD_IMAGE_WIDTH,
+                "stored_on": datetime.now(),
+            },
+            upsert=True,
+        )
+        return True
+    except pymongo.errors.PyMongoError as e:
+        print(f"Warning: Could not store thumbnail for recipe {recipe_id}: {e}")
+        return False
 
-    # 1) og:image
-    m = re.search(
-        r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']',
-        html, flags=re.IGNORECASE
-    )
-    if m:
-        return urljoin(page_url, m.group(1))
 
-    # 2) twitter:image
-    m = re.search(
-        r'<meta[^>]+name=["\']twitter:image["\'][^>]+content=["\']([^"\']+)["\']',
-        html, flags=re.IGNORECASE
-    )
-    if m:
-        return urljoin(page_url, m.group(1))
+RECIPES_VERSION_ID = "recipes_version"
+RECIPE_CHANGES_KEPT = 200  # Recent changes listed next to the version counter, for polling replicas
+CACHE_WATCHER_ENABLED = os.environ.get("CACHE_WATCHER", "1").lower() not in ("0", "false", "no")
+CACHE_WATCHER_POLL_SECONDS = 5  # Version-counter polling interval when change streams are unavailable
 
-    # 3) legacy link rel image_src
-    m = re.search(
-        r'<link[^>]+rel=["\']image_src["\'][^>]+href=["\']([^"\']+)["\']',
-        html, flags=re.IGNORECASE
-    )
-    if m:
-        return urljoin(page_url, m.group(1))
 
-    return None
+def recipe_change(recipe_id, docs: list[dict], updated_on: Optional[datetime] = None) -> dict:
+    """A change entry for bump_recipes_version: the recipe, its known filter values and write time."""
+    return {
+        "recipe_id": str(recipe_id),
+        "docs": [{field: doc[field] for field in RECIPE_FILTER_FIELDS if field in doc} for doc in docs],
+        "updated_on": updated_on,
+    }
 
-def extract_recipe_from_image(image):
-    """Extract recipe information from an image using Gemini Pro Vision."""
-    try:
-        # Choose appropriate model, flash is faster/cheaper, pro might be more accurate
-        model = genai.GenerativeModel("gemini-1.5-flash-latest")
-
-        prompt = """
-        You are an expert recipe analyser. Extract the complete recipe from the provided image.
-        Return the result ONLY as a valid JSON object with the following fields:
-        {
-            "title": "Recipe title (string)",
-            "description": "Brief description of the dish (string, optional)",
-            "prep_time": "Preparation time (string, e.g., '15 minutes', optional)",
-            "cook_time": "Cooking time (string, e.g., '30 minutes', optional)",
-            "total_time": "Total time (string, e.g., '45 minutes', optional)",
-            "servings": "Number of servings (string or number, optional)",
-            "ingredients": ["List of ingredients with quantities (array of strings)"],
-            "instructions": ["List of preparation/cooking steps (array of strings)"],
-            "cuisine": "Type of cuisine (string, e.g., 'Italian', 'Asian', optional)",
-            "meal_type": "Type of meal (string, e.g., 'Breakfast', 'Dinner', 'Dessert', optional)",
-            "keywords": ["List of relevant keywords/tags (array of strings, optional)"]
-        }
-        If a field is not clearly present in the image, use null or an empty array/string as appropriate for the field type.
-        Focus ONLY on extracting information present in the image. Do not add external knowledge.
-        Ensure the output is a single, valid JSON object and nothing else.
-        """
 
-        response = model.generate_content(
-            contents=[prompt, image],
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.1, # Lower temperature for more deterministic extraction
-                response_mime_type="application/json" # Request JSON directly if model supports
-                )
+def bump_recipes_version(resources: Optional[ExtractionResources] = None, change: Optional[dict] = None) -> None:
+    """
+    Record a write in the shared version counter, so other replicas notice it when polling.
+    Each bump appends one entry to the counter's recent changes (change, or None for "anything
+    may have changed"), so a poller can invalidate just the recipes that changed.
+    """
+    collection = resources.app_meta_collection if resources else get_app_meta_collection()
+    try:
+        collection.update_one(
+            {"_id": RECIPES_VERSION_ID},
+            {"$inc": {"version": 1}, "$push": {"changes": {"$each": [change], "$slice": -RECIPE_CHANGES_KEPT}}},
+            upsert=True,
         )
+    except pymongo.errors.PyMongoError as e:
+        print(f"Warning: Could not bump recipes version: {e}")
 
-        # Assuming response_mime_type worked, response.text should be JSON
-        try:
-            recipe_data = json.loads(response.text)
-            return recipe_data
-        except json.JSONDecodeError:
-             # Fallback parsing if response_mime_type didn't enforce JSON correctly
+
+class CacheInvalidationWatcher:
+    """
+    Background thread that invalidates local caches when the recipes collection
+    changes on any replica. Uses a MongoDB change stream, and falls back to
+    polling the app_meta version counter when change streams aren't supported
+    (e.g. a standalone mongod).
+    """
+
+    def __init__(self, collection, meta_collection, query_cache: QueryCache, image_cache: ImageCache,
+                 poll_seconds: float = CACHE_WATCHER_POLL_SECONDS):
+        self.collection = collection
+        self.meta_collection = meta_collection
+        self.query_cache = query_cache
+        self.image_cache = image_cache
+        self.poll_seconds = poll_seconds
+        self.mode = "starting"
+        self.events = 0
+        self.errors = 0
+        self._resume_token = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation-watcher", daemon=True)
+
+    def start(self) -> "CacheInvalidationWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
             try:
-                return parse_gemini_json_output(response.text)
-            except ValueError as e:
-                 st.error(f"{get_translation('error_extract_image')}: Failed to decode JSON from response. {e}")
-                 # print("Failed JSON Response Text:", response.text) # Debugging
-                 return None
-        except Exception as e: # Catch other potential Gemini errors
-             st.error(f"{get_translation('error_extract_image')}: {str(e)}")
-             # print("Gemini Response:", response) # Debugging
-             return None
+                self._watch_change_stream()
+            except pymongo.errors.OperationFailure as e:
+                if self._resume_token is not None:
+                    # Resume point fell out of the oplog; start over from "now" with clean caches
+                    self._resume_token = None
+                    self._invalidate_all()
+                    continue
+                print(f"Change streams unavailable ({e}); polling for recipe changes instead")
+                self._poll_version()
+                return
+            except pymongo.errors.PyMongoError:
+                self.errors += 1
+                self._stop.wait(self.poll_seconds)
+            except Exception as e:
+                # Client can't open change streams at all (e.g. an in-memory test double)
+                print(f"Change streams unavailable ({e}); polling for recipe changes instead")
+                self._poll_version()
+                return
 
+    def _watch_change_stream(self) -> None:
+        with self.collection.watch(resume_after=self._resume_token, max_await_time_ms=1000,
+                                   full_document="updateLookup") as stream:
+            self.mode = "change_stream"
+            while not self._stop.is_set():
+                change = stream.try_next()
+                self._resume_token = stream.resume_token
+                if change is not None:
+                    self._apply_change(change)
+
+    def _apply_change(self, change: dict) -> None:
+        self.events += 1
+        operation = change.get("operationType")
+        doc_id = change.get("documentKey", {}).get("_id")
+        if doc_id is None or operation not in ("insert", "update", "replace", "delete"):
+            # drop/rename/invalidate: the whole collection is affected
+            self._invalidate_all()
+            return
+        current = change.get("fullDocument")
+        if operation == "delete" or current is None:
+            # Deleted (or gone again before the lookup): its filter values are unknown
+            docs = [{}]
+        elif operation == "update":
+            description = change.get("updateDescription") or {}
+            touched = set(description.get("updatedFields") or {}) | set(description.get("removedFields") or [])
+            # Fields the update didn't touch had the same value before it
+            docs = [current, {field: current[field] for field in RECIPE_FILTER_FIELDS
+                              if field in current and field not in touched}]
+        elif operation == "replace":
+            docs = [current, {}]
+        else:
+            docs = [current]
+        self.query_cache.invalidate_recipe(doc_id, docs)
+        if operation != "insert":
+            # Only this recipe's stored thumbnail can be affected
+            self._discard_thumbnail(doc_id, (current or {}).get("updated_on") if operation != "delete" else None)
+
+    def _discard_thumbnail(self, recipe_id, updated_on: Optional[datetime]) -> None:
+        # A thumbnail stored after the change (e.g. by the same save) is already current
+        self.image_cache.discard_if_older(f"recipe-{recipe_id}", updated_on)
+
+    def _apply_polled_changes(self, changes: list) -> None:
+        for change in changes:
+            if not change:
+                self._invalidate_all()
+                return
+            self.query_cache.invalidate_recipe(change["recipe_id"], change["docs"])
+            self._discard_thumbnail(change["recipe_id"], change.get("updated_on"))
+
+    def _invalidate_all(self) -> None:
+        # Which recipes changed is unknown, so every stored thumbnail may be stale
+        self.image_cache.discard_prefix("recipe-")
+        self.query_cache.invalidate()
+
+    def _read_version(self) -> Tuple[Optional[int], list]:
+        doc = self.meta_collection.find_one({"_id": RECIPES_VERSION_ID})
+        return (doc.get("version"), doc.get("changes") or []) if doc else (None, [])
+
+    def _poll_version(self) -> None:
+        self.mode = "polling"
+        last_version = None
+        while True:
+            try:
+                last_version, _ = self._read_version()
+                break
+            except pymongo.errors.PyMongoError:
+                self.errors += 1
+                if self._stop.wait(self.poll_seconds):
+                    return
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                current, changes = self._read_version()
+            except pymongo.errors.PyMongoError:
+                self.errors += 1
+                continue
+            if current != last_version:
+                missed = (current or 0) - (last_version or 0)
+                self.events += 1
+                if last_version is None or not 0 < missed <= len(changes):
+                    # More changes than are listed (or a reset counter): which recipes changed is unknown
+                    self._invalidate_all()
+                else:
+                    self._apply_polled_changes(changes[-missed:])
+                last_version = current
 
-    except Exception as e:
-        st.error(f"{get_translation('error_extract_image')}: An unexpected error occurred: {str(e)}")
-        return None
+    def stats(self) -> dict:
+        return {"mode": self.mode, "events": self.events, "errors": self.errors}
 
 
-def extract_recipe_from_url(url):
-    """Extract recipe information from a URL using Gemini, with enhanced image handling."""
+@st.cache_resource
+def start_cache_watcher() -> Optional[CacheInvalidationWatcher]:
+    """Start the process-wide cache invalidation watcher once, if enabled."""
+    if not CACHE_WATCHER_ENABLED:
+        return None
+    # Resolve the caches here; the watcher thread has no Streamlit script context
+    return CacheInvalidationWatcher(
+        get_recipes_collection(), get_app_meta_collection(), get_query_cache(), get_image_cache()
+    ).start()
+
+
+def get_stored_thumbnail(recipe_id) -> Optional[bytes]:
+    """Load a recipe's stored thumbnail, going through the process-wide image cache."""
+    cache = get_image_cache()
+    cache_key = f"recipe-{recipe_id}"
+    entry = cache.get(cache_key)
+    if entry:
+        return entry['content']
     try:
-        model = genai.GenerativeModel("gemini-1.5-pro-latest") # Or your preferred model
-
-        # --- Enhanced Prompt ---
-        prompt = f"""
-        Please analyze the content of the webpage at the following URL: {url}
-        This page contains a recipe. Extract the complete recipe details.
-        Return the result ONLY as a single, valid JSON object with the following fields:
-        {{
-            "title": "Recipe title (string)",
-            "description": "Brief description of the dish (string, optional)",
-            "prep_time": "Preparation time (string, e.g., '15 minutes', optional)",
-            "cook_time": "Cooking time (string, e.g., '30 minutes', optional)",
-            "total_time": "Total time (string, e.g., '45 minutes', optional)",
-            "servings": "Number of servings (string or number, optional)",
-            "ingredients": ["List of ingredients with quantities (array of strings)"],
-            "instructions": ["List of preparation/cooking steps (array of strings)"],
-            "cuisine": "Type of cuisine (string, e.g., 'Italian', 'Asian', optional)",
-            "meal_type": "Type of meal (string, e.g., 'Breakfast', 'Dinner', 'Dessert', optional)",
-            "keywords": ["List of relevant keywords/tags (array of strings, optional)"],
-            "image_url": "URL of the main, featured recipe image (string, optional). Prioritize images specified in meta tags (like og:image) or the primary image clearly associated with the finished dish."
-        }}
-        If a field is not clearly present on the page, use null or an empty array/string as appropriate.
-        Focus ONLY on extracting information present on the webpage. Do not add external knowledge.
-
-        IMPORTANT for image_url: Identify the primary, featured image representing the final dish. Check for meta tags like 'og:image' or 'twitter:image' content if possible from the page structure you analyze. Avoid logos, ingredient photos, user avatars, or advertisement images. If no suitable main image URL is found, return null for the 'image_url' field.
-
-        Ensure the output is a single, valid JSON object and nothing else.
-        """
-        # --- End Enhanced Prompt ---
+        doc = get_recipe_images_collection().find_one({"_id": recipe_id})
+    except pymongo.errors.PyMongoError:
+        return None
+    if not doc or not doc.get("content"):
+        return None
+    content = bytes(doc["content"])
+    cache.put(cache_key, content, doc.get("content_type"), source_time=doc.get("stored_on"))
+    return content
 
-        response = model.generate_content(
-            prompt,
-             generation_config=genai.types.GenerationConfig(
-                temperature=0.1,
-                response_mime_type="application/json" # Request JSON directly
-                )
-            )
 
-        # Attempt to parse the response
-        try:
-            recipe_data = json.loads(response.text)
-        except json.JSONDecodeError:
-            try:
-                 recipe_data = parse_gemini_json_output(response.text)
-            except ValueError as e:
-                 st.error(f"{get_translation('error_extract_url')}: Failed to decode JSON. {e}")
-                 return None
-        except Exception as e: # Catch other potential Gemini errors
-             st.error(f"{get_translation('error_extract_url')}: {str(e)}")
-             return None
-
-        # --- Enhanced Image Handling ---
-        if recipe_data:
-            recipe_data["source_url"] = url # Add source URL
-
-            # Use our enhanced image fetching function
-            get_recipe_image(url, recipe_data)
-
-            # If we have an image URL, try to cache it in advance
-            if recipe_data.get("image_url"):
-                try:
-                    cache_image(recipe_data["image_url"])
-                except Exception:
-                    # Ignore caching errors
-                    pass
+def _normalise_text(value) -> str:
+    """Lower-case, punctuation-free, single-spaced text (works for Hebrew too)."""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(value or "").lower()).split())
 
-        return recipe_data
 
-    except Exception as e:
-        st.error(f"{get_translation('error_extract_url')}: An unexpected error occurred: {str(e)}")
+def recipe_fingerprint(recipe: dict) -> Optional[str]:
+    """
+    Content fingerprint: normalised title plus the set of normalised ingredients (order-insensitive).
+    None without ingredients, since a title alone doesn't identify a recipe (two photos titled "Cake").
+    """
+    title = _normalise_text(recipe.get("title"))
+    ingredients = sorted({_normalise_text(item) for item in recipe.get("ingredients") or []} - {""})
+    if not ingredients:
         return None
+    return hashlib.sha256(json.dumps([title, ingredients], ensure_ascii=False).encode()).hexdigest()
 
-# --- Database Operations ---
 
-def save_recipe_to_db(recipe_data):
-    """Save the recipe to MongoDB."""
-    try:
-        # Add timestamp
-        recipe_data["added_on"] = datetime.now()
+def set_dedupe_keys(recipe: dict) -> dict:
+    """Set source_url_canonical and fingerprint (the unique keys) on a recipe document."""
+    for field, value in (
+        ("source_url_canonical", canonicalize_url(recipe["source_url"]) if recipe.get("source_url") else None),
+        ("fingerprint", recipe_fingerprint(recipe)),
+    ):
+        if value:
+            recipe[field] = value
+        else:
+            # Partial unique indexes only cover documents where the key is a string
+            recipe.pop(field, None)
+    return recipe
+
+
+def find_duplicate_recipe(recipe: dict, collection=None) -> Optional[dict]:
+    """An existing recipe with the same canonical source URL (preferred) or fingerprint."""
+    collection = collection if collection is not None else get_recipes_collection()
+    for field in ("source_url_canonical", "fingerprint"):
+        if recipe.get(field):
+            existing = collection.find_one({field: recipe[field]}, {"_id": 1})
+            if existing:
+                return existing
+    return None
 
-        # Ensure ingredients and instructions are lists
-        if "ingredients" not in recipe_data or not isinstance(recipe_data["ingredients"], list):
-            recipe_data["ingredients"] = []
-        if "instructions" not in recipe_data or not isinstance(recipe_data["instructions"], list):
-            recipe_data["instructions"] = []
-        if "keywords" not in recipe_data or not isinstance(recipe_data["keywords"], list):
-            recipe_data["keywords"] = []
+
+def merge_into_recipe(collection, recipe_id, fields: dict) -> None:
+    """
+    Update an existing recipe with fields. If the new content's fingerprint already belongs to
+    another recipe, the update goes ahead without it (the source URL owner wins).
+    """
+    try:
+        collection.update_one({"_id": recipe_id}, {"$set": fields})
+    except pymongo.errors.DuplicateKeyError:
+        if "fingerprint" not in fields:
+            raise
+        fields = {key: value for key, value in fields.items() if key != "fingerprint"}
+        collection.update_one({"_id": recipe_id}, {"$set": fields, "$unset": {"fingerprint": ""}})
 
 
-        # Insert into MongoDB
-        result = recipes_collection.insert_one(recipe_data)
-        return result.inserted_id
+def upsert_recipe(recipe_data: dict, collection=None) -> Tuple[bson.ObjectId, bool]:
+    """
+    Insert the recipe, or update its existing duplicate in place (keeping its _id and
+    added_on). Returns (recipe id, True if a new document was created).
+    """
+    collection = collection if collection is not None else get_recipes_collection()
+    fields = {key: value for key, value in recipe_data.items() if key not in ("_id", "added_on")}
+    for _ in range(3):
+        existing = find_duplicate_recipe(recipe_data, collection)
+        try:
+            if existing:
+                merge_into_recipe(collection, existing["_id"], fields)
+                return existing["_id"], False
+            return collection.insert_one(recipe_data).inserted_id, True
+        except pymongo.errors.DuplicateKeyError:
+            # Another session saved the same recipe (or claimed its source URL) in between;
+            # look again, which now finds the URL owner first
+            recipe_data.pop("_id", None)
+    raise pymongo.errors.DuplicateKeyError("Duplicate recipe could not be resolved")
+
+
+def store_recipe(recipe_data, store_thumbnail: bool = STORE_THUMBNAILS_ON_SAVE,
+                 resources: Optional[ExtractionResources] = None) -> Tuple[bson.ObjectId, bool]:
+    """
+    Save the recipe to MongoDB; returns (recipe id, True if newly created rather than an
+    updated duplicate). Database errors are raised; see save_recipe_to_db for the UI wrapper.
+    With store_thumbnail, the card-sized image is fetched now and stored alongside
+    the recipe, so rendering it later never depends on the source site.
+    Background workers (bulk import jobs) pass resources.
+    """
+    collection = resources.recipes_collection if resources else get_recipes_collection()
+    image_cache = resources.image_cache if resources else get_image_cache()
+    query_cache = resources.query_cache if resources else get_query_cache()
+
+    # Add timestamps (added_on is kept when an existing duplicate is updated)
+    recipe_data["added_on"] = recipe_data["updated_on"] = datetime.now()
+
+    # Manual uploads never go into the recipe document itself
+    thumbnail = recipe_data.pop("uploaded_image", None)
+
+    # Fetch and resize the image before inserting, so the flag is set in the same write
+    if not thumbnail and store_thumbnail and recipe_data.get("image_url"):
+        thumbnail = get_image_variant(recipe_data["image_url"], CARD_IMAGE_WIDTH, resources)
+    if thumbnail:
+        recipe_data["thumbnail_stored"] = True
+
+    # Ensure ingredients and instructions are lists
+    if "ingredients" not in recipe_data or not isinstance(recipe_data["ingredients"], list):
+        recipe_data["ingredients"] = []
+    if "instructions" not in recipe_data or not isinstance(recipe_data["instructions"], list):
+        recipe_data["instructions"] = []
+    if "keywords" not in recipe_data or not isinstance(recipe_data["keywords"], list):
+        recipe_data["keywords"] = []
+
+
+    # Insert into MongoDB, or update the existing copy if this recipe was saved before
+    set_dedupe_keys(recipe_data)
+    recipe_id, created = upsert_recipe(recipe_data, collection)
+
+    if thumbnail:
+        if store_recipe_thumbnail(recipe_id, thumbnail, get_thumbnail_format()[1], resources):
+            image_cache.discard(f"recipe-{recipe_id}")
+        elif created:
+            # Rendering will fall back to image_url
+            collection.update_one({"_id": recipe_id}, {"$unset": {"thumbnail_stored": ""}})
+    # Write-through invalidation of the list/search results this recipe can appear in. An updated
+    # duplicate's previous filter values aren't known here, so they count as unknown ({})
+    docs = [recipe_data] if created else [recipe_data, {}]
+    query_cache.invalidate_recipe(recipe_id, docs)
+    bump_recipes_version(resources, recipe_change(recipe_id, docs, recipe_data["updated_on"]))
+    return recipe_id, created
+
+
+def save_recipe_to_db(recipe_data, store_thumbnail: bool = STORE_THUMBNAILS_ON_SAVE):
+    """Save the recipe to MongoDB (see store_recipe); returns its id, or None after showing an error."""
+    try:
+        recipe_id, created = store_recipe(recipe_data, store_thumbnail)
+        if not created:
+            st.info(get_translation("recipe_duplicate_updated"))
+        return recipe_id
 
     except pymongo.errors.PyMongoError as e:
         st.error(f"{get_translation('error_save')}: Database error: {str(e)}")
@@ -811,15 +2809,175 @@ def save_recipe_to_db(recipe_data):
         st.error(f"{get_translation('error_save')}: An unexpected error occurred: {str(e)}")
         return None
 
+# Heavy fields kept out of list/search results (legacy uploads stored inline as base64)
+LIST_EXCLUDED_FIELDS = {"image_data_b64": 0}
+
+
+INLINE_IMAGES_MIGRATION_ID = "inline_images_migration"  # app_meta marker, set once the migration has run
+
+
+def migrate_inline_images() -> int:
+    """
+    Move legacy base64 uploads (image_data_b64) out of recipe documents into
+    the recipe_images side collection as downscaled binary. Returns the count moved.
+    """
+    moved = 0
+    failed = 0
+    for doc in get_recipes_collection().find({"image_data_b64": {"$exists": True}}, {"image_data_b64": 1}):
+        try:
+            raw = base64.b64decode(doc["image_data_b64"])
+            thumbnail = make_thumbnails(raw, widths=(CARD_IMAGE_WIDTH,))[CARD_IMAGE_WIDTH]
+        except Exception as e:
+            print(f"Warning: Could not migrate image for recipe {doc['_id']}: {e}")
+            failed += 1
+            continue
+        if store_recipe_thumbnail(doc["_id"], thumbnail, get_thumbnail_format()[1]):
+            get_recipes_collection().update_one(
+                {"_id": doc["_id"]},
+                {"$set": {"thumbnail_stored": True}, "$unset": {"image_data_b64": ""}},
+            )
+            moved += 1
+    # Nothing writes image_data_b64 any more, so later starts can skip the (unindexed) scan.
+    # Images that couldn't be decoded stay inline; they're excluded from listings anyway
+    get_app_meta_collection().update_one(
+        {"_id": INLINE_IMAGES_MIGRATION_ID},
+        {"$set": {"completed_on": datetime.now(), "moved": moved, "failed": failed}},
+        upsert=True,
+    )
+    return moved
+
+
+@st.cache_resource
+def ensure_inline_images_migrated() -> int:
+    """Run the inline image migration once per process, unless it has already completed."""
+    try:
+        if get_app_meta_collection().find_one({"_id": INLINE_IMAGES_MIGRATION_ID}, {"_id": 1}):
+            return 0
+        return migrate_inline_images()
+    except pymongo.errors.PyMongoError as e:
+        print(f"Warning: Inline image migration failed: {e}")
+        return 0
+
+
+DEDUPE_KEY_FIELDS = ("source_url_canonical", "fingerprint")
+DEDUPE_BATCH_SIZE = 500
+
+
+def backfill_dedupe_keys() -> int:
+    """
+    Recompute source_url_canonical/fingerprint on every recipe (older recipes predate them,
+    or were keyed by rules that have since changed). Returns the count updated.
+    """
+    collection = get_recipes_collection()
+    projection = {"title": 1, "ingredients": 1, "source_url": 1, "dedupe_checked": 1,
+                  **{field: 1 for field in DEDUPE_KEY_FIELDS}}
+    operations = []
+    updated = 0
+    for doc in collection.find({}, projection):
+        keys = set_dedupe_keys(dict(doc))
+        update = {}
+        for field in DEDUPE_KEY_FIELDS:
+            if keys.get(field) != doc.get(field):
+                if field in keys:
+                    update.setdefault("$set", {})[field] = keys[field]
+                else:
+                    update.setdefault("$unset", {})[field] = ""
+        if "dedupe_checked" in doc:
+            # Marker left by an earlier version of this backfill
+            update.setdefault("$unset", {})["dedupe_checked"] = ""
+        if update:
+            operations.append(pymongo.UpdateOne({"_id": doc["_id"]}, update))
+        if len(operations) >= DEDUPE_BATCH_SIZE:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+def _recipe_survivor_rank(doc: dict) -> tuple:
+    """Sort key for the copy kept from a group of duplicates: most complete, then most recently saved."""
+    filled = sum(1 for key, value in doc.items() if value and key not in ("_id",) + DEDUPE_KEY_FIELDS)
+    content = len(doc.get("ingredients") or []) + len(doc.get("instructions") or [])
+    saved = doc.get("updated_on") or doc.get("added_on") or datetime.min
+    return (not missing_recipe_fields(doc), filled, content, saved)
+
+
+def plan_recipe_dedupe() -> list[dict]:
+    """
+    Find existing duplicates without changing anything. Recipes are grouped by canonical
+    source URL, then (among what's left) by fingerprint, with keys computed from the current
+    content. Returns one {"field", "key", "keep", "remove"} entry per group, where keep is the
+    most complete (then most recently saved) recipe and remove lists the others.
+    """
+    docs = [set_dedupe_keys(doc) for doc in get_recipes_collection().find({}, LIST_EXCLUDED_FIELDS)]
+    plan = []
+    for field in DEDUPE_KEY_FIELDS:
+        groups = {}
+        for doc in docs:
+            if doc.get(field):
+                groups.setdefault(doc[field], []).append(doc)
+        removed = set()
+        for key, group in groups.items():
+            if len(group) < 2:
+                continue
+            keep = max(group, key=_recipe_survivor_rank)
+            remove = [doc for doc in group if doc is not keep]
+            plan.append({"field": field, "key": key, "keep": keep, "remove": remove})
+            removed.update(doc["_id"] for doc in remove)
+        docs = [doc for doc in docs if doc["_id"] not in removed]
+    return plan
+
+
+def apply_recipe_dedupe(plan: list[dict]) -> int:
+    """
+    Delete the recipes (and their thumbnails) listed for removal in a plan_recipe_dedupe() plan,
+    then backfill the dedupe keys and create the unique indexes. Irreversible: run it from
+    dedupe_recipes.py, which reports and backs up first. Returns the number of recipes removed.
+    """
+    collection = get_recipes_collection()
+    duplicate_ids = [doc["_id"] for group in plan for doc in group["remove"]]
+    removed = 0
+    for start in range(0, len(duplicate_ids), DEDUPE_BATCH_SIZE):
+        batch = duplicate_ids[start:start + DEDUPE_BATCH_SIZE]
+        removed += collection.delete_many({"_id": {"$in": batch}}).deleted_count
+        get_recipe_images_collection().delete_many({"_id": {"$in": batch}})
+    backfill_dedupe_keys()
+    ensure_unique_recipe_indexes(collection)
+    if removed:
+        get_query_cache().invalidate()
+        bump_recipes_version()
+    return removed
+
+
+def ensure_unique_recipe_indexes(collection) -> None:
+    """
+    Unique keys that make save_recipe_to_db's upsert safe. Creating them fails (with a
+    warning) while duplicates remain; dedupe_recipes.py removes those and retries.
+    """
+    for field in DEDUPE_KEY_FIELDS:
+        try:
+            collection.create_index(
+                [(field, 1)],
+                name=f"{field}_unique",
+                unique=True,
+                partialFilterExpression={field: {"$type": "string"}},
+            )
+        except pymongo.errors.PyMongoError as e:
+            print(f"Warning: Could not ensure unique index on {field} (run dedupe_recipes.py): {e}")
+
+
 def search_recipes(query):
     """Search recipes using MongoDB text search."""
     try:
         # Use MongoDB text search
-        results = recipes_collection.find(
-            {"$text": {"$search": query}}, {"score": {"$meta": "textScore"}}
-        ).sort([("score", {"$meta": "textScore"})])
+        def run():
+            results = get_recipes_collection().find(
+                {"$text": {"$search": query}}, {"score": {"$meta": "textScore"}, **LIST_EXCLUDED_FIELDS}
+            ).sort([("score", {"$meta": "textScore"})])
+            return list(results)
 
-        return list(results)
+        return cached_query("search", (query.strip().lower(),), run)
     except pymongo.errors.PyMongoError as e:
         st.error(f"{get_translation('error_search')}: Database error: {str(e)}")
         return []
@@ -828,16 +2986,76 @@ def search_recipes(query):
         return []
 
 
-def get_all_recipes(sort_option="newest"):
-    """Get all saved recipes, with sorting."""
-    try:
-        sort_criteria = ("added_on", -1) # Default: newest first
-        if sort_option == "oldest":
-            sort_criteria = ("added_on", 1)
-        elif sort_option == "title":
-             sort_criteria = ("title", 1) # Sort A-Z by title
+RECIPES_PAGE_SIZE = 20
+
+# Fields a collapsed recipe card needs; ingredients/instructions are loaded on demand
+LIST_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "image_url": 1,
+    "thumbnail_stored": 1,
+    "cuisine": 1,
+    "meal_type": 1,
+    "prep_time": 1,
+    "cook_time": 1,
+    "total_time": 1,
+    "servings": 1,
+    "keywords": 1,
+    "source_url": 1,
+    "added_on": 1,
+}
+
+# sort option -> (field, direction); _id breaks ties so keyset cursors are unique
+SORT_OPTIONS = {
+    "newest": ("added_on", -1),
+    "oldest": ("added_on", 1),
+    "title": ("title", 1),
+}
+
+
+def get_page_cursor(recipe: dict, sort_option: str = "newest") -> tuple:
+    """Keyset cursor (sort value, _id) pointing just past this recipe."""
+    field, _ = SORT_OPTIONS.get(sort_option, SORT_OPTIONS["newest"])
+    return (recipe.get(field), recipe["_id"])
+
 
-        return list(recipes_collection.find().sort([sort_criteria]))
+def _keyset_filter(field: str, direction: int, cursor: tuple) -> dict:
+    """Query predicate for documents strictly after cursor in (field, _id) order."""
+    value, last_id = cursor
+    op = "$gt" if direction > 0 else "$lt"
+    after_value = {op: value}
+    if value is None:
+        # Missing values sort first ascending / last descending
+        after_value = {"$ne": None} if direction > 0 else {"$in": []}
+    return {"$or": [{field: after_value}, {field: value, "_id": {op: last_id}}]}
+
+
+def get_all_recipes(sort_option="newest", limit=0, after=None, projection=None, filters=None):
+    """
+    Get saved recipes, with sorting.
+    Pass limit and the cursor from get_page_cursor(last recipe) as after for
+    keyset pagination; projection defaults to full documents minus inline images.
+    filters is an equality match such as {"cuisine": "Italian"}.
+    """
+    try:
+        field, direction = SORT_OPTIONS.get(sort_option, SORT_OPTIONS["newest"])
+        query = dict(filters or {})
+        if after:
+            query.update(_keyset_filter(field, direction, after))
+
+        def run():
+            cursor = get_recipes_collection().find(query, projection or LIST_EXCLUDED_FIELDS)
+            cursor = cursor.sort([(field, direction), ("_id", direction)]).limit(limit)
+            return list(cursor)
+
+        params = (
+            sort_option,
+            limit,
+            after,
+            sorted((projection or LIST_EXCLUDED_FIELDS).items()),
+            sorted((filters or {}).items()),
+        )
+        return cached_query("list", params, run, list_scopes(filters))
     except pymongo.errors.PyMongoError as e:
         st.error(f"{get_translation('error_fetch')}: Database error: {str(e)}")
         return []
@@ -845,11 +3063,84 @@ def get_all_recipes(sort_option="newest"):
         st.error(f"{get_translation('error_fetch')}: An unexpected error occurred: {str(e)}")
         return []
 
+
+def count_recipes():
+    """Approximate total number of saved recipes (from collection metadata, no scan)."""
+    try:
+        return cached_query("count", (), get_recipes_collection().estimated_document_count)
+    except pymongo.errors.PyMongoError:
+        return 0
+
+
+def _distinct_strings(field: str) -> list:
+    values = set()
+    for value in get_recipes_collection().distinct(field):
+        if value and isinstance(value, str) and value.strip():
+            values.add(value.strip())
+    return sorted(values)
+
+
+def get_filter_options():
+    """Distinct cuisines and meal types for the filter selects, as (cuisines, meal_types)."""
+    try:
+        return cached_query(
+            "filter_options", (), lambda: (_distinct_strings("cuisine"), _distinct_strings("meal_type"))
+        )
+    except pymongo.errors.PyMongoError as e:
+        st.error(f"{get_translation('error_fetch')}: Database error: {str(e)}")
+        return [], []
+
+
+def get_recipe_details(recipe_id):
+    """Load the fields left out of LIST_PROJECTION for a single recipe."""
+    try:
+        return get_recipes_collection().find_one(
+            {"_id": recipe_id}, {"ingredients": 1, "instructions": 1}
+        ) or {}
+    except pymongo.errors.PyMongoError as e:
+        st.error(f"{get_translation('error_fetch')}: Database error: {str(e)}")
+        return {}
+
+
+RECIPE_DETAILS_SESSION_MAX = 50  # Opened recipes' details kept per session
+
+
+def get_session_recipe_details(recipe_id) -> dict:
+    """
+    get_recipe_details, kept in the session so toggling a card doesn't re-query. An entry is
+    reloaded once that recipe changes (its query cache scope moves), and only the most recently
+    opened RECIPE_DETAILS_SESSION_MAX are kept.
+    """
+    scopes = [("recipe", str(recipe_id))]
+    stamp = get_query_cache().stamp(scopes)
+    items = st.session_state.setdefault("recipe_details", OrderedDict())
+    key = str(recipe_id)
+    if key in items and items[key][0] == stamp:
+        items.move_to_end(key)
+    else:
+        items[key] = (stamp, get_recipe_details(recipe_id))
+        items.move_to_end(key)
+        while len(items) > RECIPE_DETAILS_SESSION_MAX:
+            items.popitem(last=False)
+    return items[key][1]
+
+
 def delete_recipe_from_db(recipe_id):
     """Delete a recipe from MongoDB by its ID."""
     try:
-        result = recipes_collection.delete_one({"_id": ObjectId(recipe_id)})
-        return result.deleted_count > 0
+        recipe_id = bson.ObjectId(recipe_id)
+        # Projected fields say which filtered lists the recipe was in
+        deleted = get_recipes_collection().find_one_and_delete(
+            {"_id": recipe_id}, projection={field: 1 for field in RECIPE_FILTER_FIELDS}
+        )
+        get_recipe_images_collection().delete_one({"_id": recipe_id})
+        get_image_cache().discard(f"recipe-{recipe_id}")
+        if deleted is None:
+            return False
+        docs = [{field: deleted.get(field) for field in RECIPE_FILTER_FIELDS}]
+        get_query_cache().invalidate_recipe(recipe_id, docs)
+        bump_recipes_version(change=recipe_change(recipe_id, docs))
+        return True
     except pymongo.errors.PyMongoError as e:
         st.error(f"{get_translation('error_delete')}: Database error: {str(e)}")
         return False
@@ -857,8 +3148,362 @@ def delete_recipe_from_db(recipe_id):
         st.error(f"{get_translation('error_delete')}: An unexpected error occurred: {str(e)}")
         return False
 
+# --- Bulk Import ---
+
+BULK_IMPORT_WORKERS = 4  # Concurrent extractions; Gemini calls are additionally rate limited
+BULK_IMPORT_MAX_ATTEMPTS = 3
+BULK_IMPORT_RETRY_BACKOFF_SECONDS = 2.0  # Doubled after each failed attempt
+URL_PATTERN = re.compile(r"https?://[^\s,;\"'<>]+")
+
+
+def parse_url_list(text: str) -> list[str]:
+    """Every http(s) URL in pasted text or a text/CSV file, in order, without (canonical) duplicates."""
+    urls = {}
+    for match in URL_PATTERN.finditer(text):
+        url = match.group(0).rstrip(").]")
+        urls.setdefault(canonicalize_url(url), url)
+    return list(urls.values())
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Errors worth retrying: network failures, Gemini rate limits/overload/deadlines, MongoDB failovers."""
+    return isinstance(error, (
+        TimeoutError,  # generate_recipe_json ran out of its deadline (e.g. waiting for the rate limiter)
+        requests.ConnectionError,
+        requests.Timeout,
+        pymongo.errors.AutoReconnect,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+    ))
+
+
+def import_recipe_url(url: str, max_attempts: int = BULK_IMPORT_MAX_ATTEMPTS,
+                      resources: Optional[ExtractionResources] = None) -> dict:
+    """Extract and save one URL, retrying transient failures. Returns a report row; never raises."""
+    start = time.perf_counter()
+    row = {"url": url, "status": "failed", "title": None, "recipe_id": None, "attempts": 0, "error": None,
+           "missing_fields": None}
+    for attempt in range(1, max_attempts + 1):
+        row["attempts"] = attempt
+        try:
+            # A retry after a failed save is cheap: the extraction is already cached
+            recipe_data = run_url_extraction(url, resources)
+            if not recipe_data:
+                row["error"] = "No recipe found"
+                break
+            row["title"] = recipe_data.get("title")
+            # Saved anyway, but flagged in the report (the better model tier may have timed out)
+            row["missing_fields"] = ", ".join(missing_recipe_fields(recipe_data)) or None
+            recipe_id, created = store_recipe(recipe_data, resources=resources)
+            row.update(status="saved" if created else "updated", recipe_id=str(recipe_id), error=None)
+            break
+        except Exception as e:
+            row["error"] = str(e)
+            if attempt == max_attempts or not is_transient_error(e):
+                break
+            time.sleep(BULK_IMPORT_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+    row["seconds"] = round(time.perf_counter() - start, 2)
+    return row
+
+
+def run_concurrently(func, items: list, max_workers: int, on_result=None) -> list:
+    """
+    func(item) for every item with at most max_workers in flight. on_result(result, done, total)
+    is called in the calling thread as each finishes. Returns the results in input order.
+    Workers get no script context, so func must be handed whatever resources it needs.
+    If the caller stops waiting (on_result raises, e.g. on a Streamlit rerun), items that
+    haven't started are cancelled instead of being run to completion first.
+    """
+    results = [None] * len(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="run-concurrently")
+    try:
+        futures = {executor.submit(func, item): index for index, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = results[futures[future]] = future.result()
+            if on_result:
+                on_result(result, done, len(items))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def bulk_import_urls(urls: list[str], max_workers: int = BULK_IMPORT_WORKERS, on_result=None,
+                     resources: Optional[ExtractionResources] = None) -> list[dict]:
+    """
+    Import urls concurrently in the calling process (see run_concurrently), e.g. from the CLI.
+    Returns the report rows in input order. The app submits each URL to the job queue instead.
+    """
+    resources = resources or get_extraction_resources()
+    return run_concurrently(partial(import_recipe_url, resources=resources), urls, max_workers, on_result)
+
+
+def summarize_import(rows: list[dict]) -> dict:
+    """Counts per status for a bulk import report."""
+    summary = {"total": len(rows), "saved": 0, "updated": 0, "failed": 0}
+    for row in rows:
+        summary[row["status"]] += 1
+    return summary
+
+
+def group_pages(pages: list, continues_previous: list[bool]) -> list[list]:
+    """Split uploaded pages into recipes: a page marked as continuing the previous one joins its group."""
+    groups = []
+    for page, continues in zip(pages, continues_previous):
+        if continues and groups:
+            groups[-1].append(page)
+        else:
+            groups.append([page])
+    return groups
+
+
+def save_recipes(recipes: list[dict]) -> dict:
+    """Save several reviewed recipes; returns counts like summarize_import. One failure never stops the rest."""
+    rows = []
+    for recipe in recipes:
+        try:
+            _, created = store_recipe(dict(recipe))
+            rows.append({"status": "saved" if created else "updated"})
+        except Exception as e:
+            # Database errors, but also documents BSON can't encode
+            print(f"Warning: Could not save recipe '{recipe.get('title')}': {e}")
+            rows.append({"status": "failed"})
+    return summarize_import(rows)
+
+
+# --- Background Extraction Jobs ---
+
+JOB_WORKERS = 4  # Single URL/photo extractions running at once across all sessions
+JOB_POLL_SECONDS = 2
+JOB_TTL_SECONDS = 7 * 24 * 3600  # Finished jobs are removed by a TTL index after this
+JOB_HEARTBEAT_SECONDS = 10  # Workers refresh updated_at on their unfinished jobs this often
+JOB_STALE_SECONDS = 6 * JOB_HEARTBEAT_SECONDS  # No heartbeat for this long: the owning process is gone
+RECIPE_JOB_KINDS = ("url", "image", "batch_image")  # Jobs whose result is an extracted recipe (not a report row)
+BULK_JOB_KINDS = ("import", "batch_image")  # Many jobs per click; run on their own pool
+
+
+class ExtractionJobQueue:
+    """
+    Runs extractions on a process-wide worker pool so a slow model call never blocks a
+    session's script thread. Job state lives in the jobs collection, so any rerun (or
+    a reloaded page) can poll it by job id. While a job is queued or running, its process
+    refreshes updated_at every JOB_HEARTBEAT_SECONDS; a job whose heartbeat stops is
+    reported as interrupted by whoever polls it next.
+    Bulk import items and batch photo groups run on their own pool, so a long import
+    never queues ahead of anyone's single extraction.
+    """
+
+    def __init__(self, collection, resources: ExtractionResources, max_workers: int = JOB_WORKERS,
+                 heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS, stale_seconds: float = JOB_STALE_SECONDS,
+                 bulk_workers: int = BULK_IMPORT_WORKERS):
+        self.collection = collection
+        self.resources = resources  # Workers have no script context to resolve these themselves
+        self.stale_seconds = stale_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extraction-job")
+        self.bulk_executor = ThreadPoolExecutor(max_workers=bulk_workers, thread_name_prefix="bulk-job")
+        self._lock = threading.Lock()
+        self._owned = set()  # Ids of this process's queued/running jobs
+        self.submitted = 0
+        self.active = 0
+        self.done = 0
+        self.failed = 0
+        self.interrupted = 0
+        try:
+            collection.create_index("created_at", expireAfterSeconds=JOB_TTL_SECONDS, name="created_at_ttl")
+        except pymongo.errors.PyMongoError as e:
+            print(f"Warning: Could not prepare jobs collection: {e}")
+        self._stop = threading.Event()
+        self._heartbeat_seconds = heartbeat_seconds
+        threading.Thread(target=self._heartbeat, name="extraction-job-heartbeat", daemon=True).start()
+
+    def submit(self, kind: str, source: str, run, *args) -> str:
+        """Record a queued job and start run(*args) in the background. Returns the job id."""
+        job_id = bson.ObjectId()
+        now = utc_now()
+        self.collection.insert_one({
+            "_id": job_id, "kind": kind, "source": source, "status": "queued",
+            "created_at": now, "updated_at": now,
+        })
+        with self._lock:
+            self.submitted += 1
+            self._owned.add(job_id)
+        executor = self.bulk_executor if kind in BULK_JOB_KINDS else self.executor
+        executor.submit(self._run, job_id, kind, run, args)
+        return str(job_id)
+
+    def submit_url(self, url: str) -> str:
+        return self.submit("url", url, run_url_extraction, url, self.resources)
+
+    def submit_image(self, image, name: str) -> str:
+        # The worker downsizes/re-encodes it (prepare_image_for_model) before the model call.
+        # Decode now: the uploaded file object doesn't outlive the script run (this gives up
+        # the decoder's JPEG draft downscaling for uploads, in exchange for a safe worker)
+        image.load()
+        return self.submit("image", name, run_image_extraction, image, None, self.resources)
+
+    def submit_image_group(self, pages: list) -> str:
+        """Extract one recipe from a batch's group of (name, image) pages, on the bulk pool."""
+        images = [image for _, image in pages]
+        for image in images:
+            image.load()  # See submit_image
+        name = ", ".join(name for name, _ in pages)
+        return self.submit("batch_image", name, run_image_extraction, images, None, self.resources)
+
+    def submit_import(self, url: str) -> str:
+        """Extract and save url (one bulk import item); the job's result is its report row."""
+        return self.submit("import", url, import_recipe_url, url, BULK_IMPORT_MAX_ATTEMPTS, self.resources)
+
+    def _update(self, job_id, **fields) -> None:
+        fields["updated_at"] = utc_now()
+        try:
+            self.collection.update_one({"_id": job_id}, {"$set": fields})
+        except pymongo.errors.PyMongoError as e:
+            print(f"Warning: Could not update job {job_id}: {e}")
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self._heartbeat_seconds):
+            with self._lock:
+                owned = list(self._owned)
+            if not owned:
+                continue
+            try:
+                self.collection.update_many(
+                    {"_id": {"$in": owned}, "status": {"$in": ["queued", "running"]}},
+                    {"$set": {"updated_at": utc_now()}},
+                )
+            except pymongo.errors.PyMongoError as e:
+                print(f"Warning: Could not refresh job heartbeats: {e}")
+
+    def _run(self, job_id, kind, run, args) -> None:
+        with self._lock:
+            self.active += 1
+        error = "Interrupted"
+        try:
+            self._update(job_id, status="running")
+            start = time.perf_counter()
+            try:
+                result = run(*args)
+                error = None if result else "No recipe found"
+            except Exception as e:
+                result, error = None, str(e)
+            seconds = round(time.perf_counter() - start, 2)
+            if not error:
+                try:
+                    fields = {"result": result, "seconds": seconds}
+                    if kind in RECIPE_JOB_KINDS:
+                        # Partial results are still returned; the poller tells the user what's missing
+                        fields["missing_fields"] = missing_recipe_fields(result)
+                    self._update(job_id, status="done", **fields)
+                except Exception as e:
+                    # A model value BSON can't store (e.g. an integer over 64 bits)
+                    error = f"Could not store the result: {e}"
+            if error:
+                self._update(job_id, status="failed", error=error, seconds=seconds)
+        finally:
+            # Always release the job, or the heartbeat would keep it "running" forever
+            with self._lock:
+                self._owned.discard(job_id)
+                self.active -= 1
+                if error:
+                    self.failed += 1
+                else:
+                    self.done += 1
+
+    def is_stale(self, job: dict) -> bool:
+        """True if an unfinished job's heartbeat has stopped (its process died or restarted)."""
+        return (job.get("status") in ("queued", "running")
+                and (utc_now() - as_utc(job["updated_at"])).total_seconds() >= self.stale_seconds)
+
+    def _fail_if_stale(self, job: dict) -> dict:
+        if self.is_stale(job):
+            # Conditional on the heartbeat we saw, so a job that just came back to life isn't failed
+            fields = {"status": "failed", "error": "Interrupted", "updated_at": utc_now()}
+            self.collection.update_one(
+                {"_id": job["_id"], "status": job["status"], "updated_at": job["updated_at"]}, {"$set": fields})
+            with self._lock:
+                self.interrupted += 1
+            job.update(fields)
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """The job document, or None if the id is unknown (or expired). Stale jobs come back failed."""
+        try:
+            job = self.collection.find_one({"_id": bson.ObjectId(job_id)})
+        except bson.errors.InvalidId:
+            return None
+        return self._fail_if_stale(job) if job is not None else None
+
+    def get_many(self, job_ids: list[str]) -> list[dict]:
+        """Like get for several jobs in one query; unknown or expired ids are left out."""
+        ids = [bson.ObjectId(job_id) for job_id in job_ids if bson.ObjectId.is_valid(job_id)]
+        jobs = {job["_id"]: job for job in self.collection.find({"_id": {"$in": ids}})}
+        return [self._fail_if_stale(jobs[job_id]) for job_id in ids if job_id in jobs]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"submitted": self.submitted, "active": self.active, "done": self.done,
+                    "failed": self.failed, "interrupted": self.interrupted}
+
+
+@st.cache_resource
+def get_job_queue() -> ExtractionJobQueue:
+    """Process-wide background extraction queue."""
+    return ExtractionJobQueue(get_jobs_collection(), get_extraction_resources())
+
+
 # --- UI Rendering ---
 
+def load_recipes_page(page_state: dict, sort_option: str, filters: Optional[dict] = None) -> None:
+    """Append the next page of list-view recipes to page_state (items/cursor/has_more)."""
+    if not page_state["items"]:
+        page_state["version"] = get_query_cache().stamp(list_scopes(filters))
+    # Ask for one extra document to learn whether another page exists
+    page = get_all_recipes(
+        sort_option=sort_option,
+        limit=RECIPES_PAGE_SIZE + 1,
+        after=page_state["cursor"],
+        projection=LIST_PROJECTION,
+        filters=filters,
+    )
+    page_state["has_more"] = len(page) > RECIPES_PAGE_SIZE
+    page = page[:RECIPES_PAGE_SIZE]
+    page_state["items"].extend(page)
+    if page:
+        page_state["cursor"] = get_page_cursor(page[-1], sort_option)
+
+
+def render_recipe_details(recipe):
+    """Render the ingredients and instructions columns of a recipe card."""
+    ing_col, inst_col = st.columns(2)
+
+    # Ingredients
+    with ing_col:
+        st.markdown(f"<h5 dir='rtl'>{get_translation('ingredients')}</h5>", unsafe_allow_html=True)
+        if recipe.get("ingredients") and len(recipe["ingredients"]) > 0:
+            ingredients_html = "<ul dir='rtl' class='recipe-ingredients'>"
+            for ingredient in recipe["ingredients"]:
+                if ingredient: # Avoid rendering empty items
+                    ingredients_html += f"<li>{ingredient}</li>"
+            ingredients_html += "</ul>"
+            st.markdown(ingredients_html, unsafe_allow_html=True)
+        else:
+            st.write(f"({get_translation('no_matches')})") # Or some placeholder
+
+    # Instructions
+    with inst_col:
+        st.markdown(f"<h5 dir='rtl'>{get_translation('instructions')}</h5>", unsafe_allow_html=True)
+        if recipe.get("instructions") and len(recipe["instructions"]) > 0:
+            instructions_html = "<ol dir='rtl' class='recipe-instructions'>"
+            for i, step in enumerate(recipe["instructions"]):
+                if step: # Avoid rendering empty steps
+                    instructions_html += f"<li>{step}</li>"
+            instructions_html += "</ol>"
+            st.markdown(instructions_html, unsafe_allow_html=True)
+        else:
+             st.write(f"({get_translation('no_matches')})") # Or some placeholder
+
+
 def render_recipe_card(recipe, show_delete_button=False):
     """Render a beautiful recipe card with RTL support and optional delete button."""
     card_key = str(recipe.get('_id', 'new_recipe')) # Unique key for elements within loop/map
@@ -909,35 +3554,16 @@ def render_recipe_card(recipe, show_delete_button=False):
 
         st.markdown("---") # Separator
 
-        # Expander for Ingredients and Instructions
-        with st.expander(f"{get_translation('ingredients')} & {get_translation('instructions')}", expanded=False):
-             ing_col, inst_col = st.columns(2)
-
-             # Ingredients
-             with ing_col:
-                 st.markdown(f"<h5 dir='rtl'>{get_translation('ingredients')}</h5>", unsafe_allow_html=True)
-                 if recipe.get("ingredients") and len(recipe["ingredients"]) > 0:
-                     ingredients_html = "<ul dir='rtl' class='recipe-ingredients'>"
-                     for ingredient in recipe["ingredients"]:
-                         if ingredient: # Avoid rendering empty items
-                             ingredients_html += f"<li>{ingredient}</li>"
-                     ingredients_html += "</ul>"
-                     st.markdown(ingredients_html, unsafe_allow_html=True)
-                 else:
-                     st.write(f"({get_translation('no_matches')})") # Or some placeholder
-
-             # Instructions
-             with inst_col:
-                 st.markdown(f"<h5 dir='rtl'>{get_translation('instructions')}</h5>", unsafe_allow_html=True)
-                 if recipe.get("instructions") and len(recipe["instructions"]) > 0:
-                     instructions_html = "<ol dir='rtl' class='recipe-instructions'>"
-                     for i, step in enumerate(recipe["instructions"]):
-                         if step: # Avoid rendering empty steps
-                             instructions_html += f"<li>{step}</li>"
-                     instructions_html += "</ol>"
-                     st.markdown(instructions_html, unsafe_allow_html=True)
-                 else:
-                      st.write(f"({get_translation('no_matches')})") # Or some placeholder
+        details_label = f"{get_translation('ingredients')} & {get_translation('instructions')}"
+        if "ingredients" in recipe or "_id" not in recipe:
+            # Full document (preview/search results): everything is already here
+            with st.expander(details_label, expanded=False):
+                render_recipe_details(recipe)
+        else:
+            # List-view document: fetch ingredients/instructions only when the reader opens them.
+            # (st.expander has no open callback in our Streamlit version, so a toggle drives it.)
+            if st.toggle(details_label, key=f"details_{card_key}"):
+                render_recipe_details(get_session_recipe_details(recipe["_id"]))
 
 
         # Keywords/tags
@@ -975,9 +3601,7 @@ def render_recipe_card(recipe, show_delete_button=False):
                             if delete_recipe_from_db(recipe['_id']):
                                 st.success(get_translation('recipe_deleted', title=recipe.get('title', '')))
                                 st.session_state[confirm_key] = False # Reset confirmation state
-                                # Clear potentially cached recipe data if needed
-                                if 'recipes_cache' in st.session_state:
-                                    del st.session_state['recipes_cache']
+                                # Cached lists were invalidated by delete_recipe_from_db
                                 st.rerun() # Refresh the page to show updated list
                             else:
                                 # Error message is shown by delete_recipe_from_db
@@ -996,6 +3620,258 @@ def render_recipe_card(recipe, show_delete_button=False):
         st.markdown("<div style='margin-bottom: 10px;'></div>", unsafe_allow_html=True)
 
 
+def render_diagnostics():
+    """Show process-wide performance counters in the (collapsed) sidebar."""
+    with st.sidebar.expander(get_translation("diagnostics"), expanded=False):
+        st.markdown(f"**{get_translation('http_pool')}**")
+        st.json(get_http_pool_stats(), expanded=False)
+        st.markdown(f"**{get_translation('image_cache')}**")
+        st.json(get_image_cache().stats(), expanded=False)
+        disk_cache = get_disk_image_cache()
+        if disk_cache:
+            st.markdown(f"**{get_translation('disk_image_cache')}**")
+            st.json(disk_cache.stats(), expanded=False)
+        st.markdown(f"**{get_translation('page_cache')}**")
+        st.json(get_page_cache().stats(), expanded=False)
+        st.markdown(f"**{get_translation('image_discovery')}**")
+        st.json(get_image_discovery_stats().stats(), expanded=False)
+        st.markdown(f"**{get_translation('model_router')}**")
+        st.json(get_model_stats().stats(), expanded=False)
+        st.markdown(f"**{get_translation('gemini_rate_limiter')}**")
+        st.json(get_gemini_rate_limiter().stats(), expanded=False)
+        st.markdown(f"**{get_translation('job_queue')}**")
+        st.json(get_job_queue().stats(), expanded=False)
+        st.markdown(f"**{get_translation('extraction_cache')}**")
+        st.json(get_extraction_cache().stats(), expanded=False)
+        st.markdown(f"**{get_translation('query_cache')}**")
+        st.json(get_query_cache().stats(), expanded=False)
+        watcher = start_cache_watcher()
+        if watcher:
+            st.markdown(f"**{get_translation('cache_watcher')}**")
+            st.json(watcher.stats(), expanded=False)
+
+
+def start_extraction_job(job_id: str) -> None:
+    """Make job_id this session's pending extraction (kept in the URL so a reload keeps polling)."""
+    st.session_state.extraction_job_id = job_id
+    st.session_state.extracted_recipe = None
+    st.session_state.recipe_saved_flag = False
+    st.query_params["job"] = job_id
+
+
+def finish_extraction_job() -> None:
+    st.session_state.extraction_job_id = None
+    st.query_params.pop("job", None)
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_extraction_job():
+    """
+    Show the pending job's status, re-checking every JOB_POLL_SECONDS without rerunning the
+    whole page. When it finishes, the result goes into extracted_recipe and the app reruns.
+    """
+    job_id = st.session_state.get("extraction_job_id")
+    if not job_id:
+        return
+    try:
+        job = get_job_queue().get(job_id)
+    except pymongo.errors.PyMongoError as e:
+        print(f"Warning: Could not poll job {job_id}: {e}")
+        return
+    if job is None:
+        finish_extraction_job()
+        return
+
+    if job["status"] in ("queued", "running"):
+        elapsed = (utc_now() - as_utc(job["created_at"])).total_seconds()
+        st.info(f"⏳ {get_translation('job_' + job['status'])} {job['source']} ({elapsed:.0f}s)")
+        return
+
+    finish_extraction_job()
+    if job["status"] == "done":
+        st.session_state.extracted_recipe = job["result"]
+        st.session_state.recipe_saved_flag = False
+        if job.get("missing_fields"):
+            st.session_state.job_notice = (
+                "warning", get_translation("recipe_partial", fields=describe_missing_fields(job["missing_fields"])))
+        else:
+            st.session_state.job_notice = ("success", get_translation("recipe_extracted"))
+    else:
+        st.session_state.job_notice = ("error", f"{get_translation('extraction_failed')} {job.get('error') or ''}")
+    st.rerun()
+
+
+BULK_STATUS_ICONS = {"saved": "✅", "updated": "♻️", "failed": "❌"}
+
+
+def import_report_row(job: dict) -> Optional[dict]:
+    """The report row of a finished bulk import job (None while it is queued or running)."""
+    if job["status"] == "done":
+        return job["result"]
+    if job["status"] == "failed":
+        # The job itself failed (e.g. interrupted by a restart); import_recipe_url never raises
+        return {"url": job["source"], "status": "failed", "title": None, "recipe_id": None, "attempts": 0,
+                "error": job.get("error"), "missing_fields": None, "seconds": job.get("seconds")}
+    return None
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_bulk_import():
+    """
+    Progress of the session's bulk import jobs, re-checked every JOB_POLL_SECONDS. The
+    imports run on the job queue, so reruns and widget changes never wait for them; once
+    every item has finished, the report replaces the progress view.
+    """
+    job_ids = st.session_state.get("bulk_import_jobs")
+    if not job_ids:
+        return
+    try:
+        jobs = get_job_queue().get_many(job_ids)
+    except pymongo.errors.PyMongoError as e:
+        print(f"Warning: Could not poll bulk import jobs: {e}")
+        return
+
+    rows = [row for row in (import_report_row(job) for job in jobs) if row]
+    # Jobs that expired or vanished count as finished, so the import always completes
+    done = len(rows) + len(job_ids) - len(jobs)
+    if done < len(job_ids):
+        st.progress(done / len(job_ids), text=get_translation("bulk_import_progress", done=done, total=len(job_ids)))
+        for row in rows:
+            st.write(f"{BULK_STATUS_ICONS[row['status']]} {row['title'] or row['url']}"
+                     + (f" — {row['error']}" if row["error"] else ""))
+        return
+
+    st.session_state.bulk_import_jobs = None
+    st.session_state.bulk_import_report = rows
+    st.rerun()
+
+
+def render_bulk_import():
+    """Bulk URL import: a pasted list and/or an uploaded text/CSV file, with per-item progress and a report."""
+    pasted = st.text_area(get_translation("bulk_urls_label"), height=150, placeholder="https://...\nhttps://...")
+    uploaded = st.file_uploader(get_translation("bulk_urls_file"), type=["txt", "csv"], key="bulk_urls_file")
+    text = pasted + "\n" + (uploaded.getvalue().decode("utf-8", errors="replace") if uploaded else "")
+    urls = parse_url_list(text)
+    if urls:
+        st.caption(get_translation("bulk_urls_found", count=len(urls)))
+
+    running = bool(st.session_state.get("bulk_import_jobs"))
+    if st.button(get_translation("bulk_import_start"), key="bulk_import_btn", type="primary",
+                 disabled=not urls or running):
+        # Each URL is its own background job on the queue's import pool (and the Gemini rate limit)
+        queue = get_job_queue()
+        st.session_state.bulk_import_report = None
+        st.session_state.bulk_import_jobs = [queue.submit_import(url) for url in urls]
+
+    poll_bulk_import()
+
+    report = st.session_state.get("bulk_import_report")
+    if report:
+        summary = summarize_import(report)
+        st.success(get_translation("bulk_import_summary", **summary))
+        st.dataframe(
+            [{**row, "status": get_translation(f"bulk_status_{row['status']}")} for row in report],
+            use_container_width=True,
+        )
+
+
+def batch_result_row(job: dict) -> Optional[dict]:
+    """The review row of a finished batch photo job (None while it is queued or running)."""
+    if job["status"] not in ("done", "failed"):
+        return None
+    return {"pages": job["source"], "recipe": job.get("result"), "error": job.get("error"),
+            "seconds": job.get("seconds")}
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_batch_image_jobs():
+    """
+    Progress of the session's batch photo jobs (like poll_bulk_import). Once every group
+    has finished, the rows go to the review list.
+    """
+    job_ids = st.session_state.get("batch_image_jobs")
+    if not job_ids:
+        return
+    try:
+        jobs = get_job_queue().get_many(job_ids)
+    except pymongo.errors.PyMongoError as e:
+        print(f"Warning: Could not poll batch photo jobs: {e}")
+        return
+
+    rows = [row for row in (batch_result_row(job) for job in jobs) if row]
+    done = len(rows) + len(job_ids) - len(jobs)
+    if done < len(job_ids):
+        st.progress(done / len(job_ids), text=get_translation("bulk_import_progress", done=done, total=len(job_ids)))
+        return
+
+    st.session_state.batch_image_jobs = None
+    st.session_state.batch_results = rows
+    st.rerun()
+
+
+def render_batch_image_import():
+    """Batch photo mode: many pages, grouped into recipes, extracted concurrently, then reviewed and saved together."""
+    uploaded_files = st.file_uploader(
+        get_translation("upload_images_batch"), type=["jpg", "jpeg", "png"],
+        accept_multiple_files=True, key="batch_image_files",
+    )
+    if uploaded_files:
+        st.caption(get_translation("batch_continues_hint"))
+        continues_previous = [False]
+        for index, uploaded_file in enumerate(uploaded_files):
+            if index == 0:
+                st.write(f"📄 {uploaded_file.name}")
+            else:
+                continues_previous.append(st.checkbox(
+                    f"📄 {uploaded_file.name} — {get_translation('batch_continues_previous')}",
+                    key=f"batch_continues_{index}_{uploaded_file.name}",
+                ))
+
+        running = bool(st.session_state.get("batch_image_jobs"))
+        if st.button(get_translation("batch_extract_start"), key="batch_extract_btn", type="primary",
+                     disabled=running):
+            try:
+                pages = [(f.name, Image.open(f)) for f in uploaded_files]
+            except Image.UnidentifiedImageError as e:
+                st.error(f"{get_translation('img_upload_error')} {e}")
+                return
+            # One background job per recipe, so reruns and widget changes never wait for the model
+            queue = get_job_queue()
+            st.session_state.batch_results = None
+            st.session_state.batch_image_jobs = [
+                queue.submit_image_group(group) for group in group_pages(pages, continues_previous)
+            ]
+
+    poll_batch_image_jobs()
+
+    results = st.session_state.get("batch_results")
+    if not results:
+        return
+
+    st.markdown("---")
+    st.subheader(get_translation("batch_review"), anchor=False)
+    selected = []
+    for index, row in enumerate(results):
+        if not row["recipe"]:
+            st.error(f"{get_translation('extraction_failed')} ({row['pages']}) {row['error']}")
+            continue
+        recipe = row["recipe"]
+        missing = missing_recipe_fields(recipe)
+        if missing:
+            st.warning(get_translation("recipe_partial", fields=describe_missing_fields(missing)))
+        if st.checkbox(f"{recipe.get('title') or 'מתכון ללא שם'} ({row['pages']})",
+                       value=True, key=f"batch_keep_{index}"):
+            selected.append(recipe)
+        with st.expander(f"{get_translation('ingredients')} & {get_translation('instructions')}"):
+            render_recipe_details(recipe)
+
+    if st.button(get_translation("batch_save_selected", count=len(selected)), key="batch_save_btn",
+                 type="primary", disabled=not selected):
+        summary = save_recipes(selected)
+        st.session_state.batch_results = None
+        st.success(get_translation("bulk_import_summary", **summary))
+
+
 def add_manual_image_upload(recipe_data):
     """Allow manual image upload if automatic fetching fails."""
     if not recipe_data.get("image_url"):
@@ -1010,15 +3886,13 @@ def add_manual_image_upload(recipe_data):
 
         if uploaded_file is not None:
             try:
-                # Convert to base64 for storage
-                image_bytes = uploaded_file.getvalue()
-                image_b64 = base64.b64encode(image_bytes).decode()
-                recipe_data["image_data_b64"] = image_b64
+                # Downscale now; the bytes are stored as BSON binary beside the recipe on save
+                image_bytes = make_thumbnails(uploaded_file.getvalue(), widths=(CARD_IMAGE_WIDTH,))[CARD_IMAGE_WIDTH]
+                recipe_data["uploaded_image"] = image_bytes
                 st.success(get_translation("img_upload_success"))
 
                 # Display the uploaded image
-                image = Image.open(BytesIO(image_bytes))
-                st.image(image, use_container_width=True, width=300)
+                st.image(image_bytes, use_container_width=True, width=300)
 
                 return True
             except Exception as e:
@@ -1379,6 +4253,13 @@ def main():
         st.session_state.extracted_recipe = None
     if "recipe_saved_flag" not in st.session_state:
         st.session_state.recipe_saved_flag = False # Use a flag to show message once
+    if "extraction_job_id" not in st.session_state:
+        # A reloaded page picks its pending job back up from the URL
+        st.session_state.extraction_job_id = st.query_params.get("job")
+
+    render_diagnostics()
+    ensure_inline_images_migrated()
+    start_cache_watcher()
 
     # --- Navigation Tabs ---
     tabs = st.tabs(
@@ -1397,7 +4278,12 @@ def main():
 
         add_method = st.radio(
             "בחרי שיטת הוספה:", # Updated to female form
-            [get_translation("add_from_url"), get_translation("add_from_image")],
+            [
+                get_translation("add_from_url"),
+                get_translation("add_from_image"),
+                get_translation("add_bulk_urls"),
+                get_translation("add_from_images_batch"),
+            ],
             horizontal=True,
             label_visibility="visible", # Keep label visible
         )
@@ -1409,19 +4295,11 @@ def main():
                 submit_extract_url = st.form_submit_button(get_translation("extract_recipe"))
 
                 if submit_extract_url and url:
-                    with st.spinner(get_translation("processing")):
-                        recipe_data = extract_recipe_from_url(url)
-                        if recipe_data:
-                            st.session_state.extracted_recipe = recipe_data
-                            st.session_state.recipe_saved_flag = False # Reset saved flag for new extraction
-                            # Allow manual image upload if needed
-                            if not recipe_data.get("image_url"):
-                                add_manual_image_upload(recipe_data)
-
-                            st.success(get_translation("recipe_extracted"))
-                        else:
-                            st.session_state.extracted_recipe = None # Clear previous if extraction failed
-                            st.error(get_translation("extraction_failed"))
+                    # Runs in the background; poll_extraction_job below picks up the result
+                    try:
+                        start_extraction_job(get_job_queue().submit_url(url))
+                    except pymongo.errors.PyMongoError as e:
+                        st.error(f"{get_translation('error_extract_url')}: Database error: {str(e)}")
                 elif submit_extract_url and not url:
                     st.warning(get_translation("enter_url_warning"))
 
@@ -1439,19 +4317,34 @@ def main():
                     st.image(image, caption=uploaded_file.name, width=300)
 
                     if st.button(get_translation("extract_from_image"), key="extract_image_btn"):
-                        with st.spinner(get_translation("processing")):
-                            recipe_data = extract_recipe_from_image(image)
-                            if recipe_data:
-                                st.session_state.extracted_recipe = recipe_data
-                                st.session_state.recipe_saved_flag = False # Reset saved flag
-                                st.success(get_translation("recipe_extracted"))
-                            else:
-                                st.session_state.extracted_recipe = None # Clear previous if extraction failed
-                                st.error(get_translation("extraction_failed"))
+                        start_extraction_job(get_job_queue().submit_image(image, uploaded_file.name))
                 except Exception as e:
                     st.error(f"{get_translation('img_upload_error')} {e}")
 
 
+        # --- Bulk URL Import ---
+        elif add_method == get_translation("add_bulk_urls"):
+            render_bulk_import()
+
+        # --- Batch Photo Import ---
+        elif add_method == get_translation("add_from_images_batch"):
+            render_batch_image_import()
+
+
+        # --- Background Extraction Status ---
+        if st.session_state.extraction_job_id:
+            poll_extraction_job()
+        notice = st.session_state.pop("job_notice", None)
+        if notice:
+            kind, message = notice
+            if kind == "success":
+                st.success(message)
+            elif kind == "warning":
+                st.warning(message)
+            else:
+                st.error(message)
+
+
         # --- Recipe Preview and Save Area ---
         if st.session_state.extracted_recipe:
             st.markdown("---")
@@ -1461,15 +4354,17 @@ def main():
             if not st.session_state.recipe_saved_flag:
                 render_recipe_card(st.session_state.extracted_recipe, show_delete_button=False) # Don't show delete for preview
 
+                # Allow manual image upload if no image was found for a URL recipe
+                if st.session_state.extracted_recipe.get("source_url"):
+                    add_manual_image_upload(st.session_state.extracted_recipe)
+
                 if st.button(get_translation("save_recipe"), key="save_extracted_recipe", type="primary"):
                     recipe_id = save_recipe_to_db(st.session_state.extracted_recipe)
                     if recipe_id:
                         st.success(get_translation("recipe_saved"))
                         st.session_state.recipe_saved_flag = True # Mark as saved for this extraction
                         st.session_state.extracted_recipe = None # Clear preview after successful save
-                        # Clear cache if implemented
-                        if 'recipes_cache' in st.session_state:
-                            del st.session_state['recipes_cache']
+                        # Cached lists were invalidated by save_recipe_to_db
                         st.rerun() # Rerun to clear the preview section
                     else:
                         # Error message is shown by save_recipe_to_db
@@ -1489,9 +4384,8 @@ def main():
         col_refresh, col_sort = st.columns([1, 3])
         with col_refresh:
              if st.button(get_translation("refresh_recipes")):
-                  # Clear cache if implemented before rerun
-                  if 'recipes_cache' in st.session_state:
-                       del st.session_state['recipes_cache']
+                  # Force fresh results from the database before rerun
+                  get_query_cache().invalidate()
                   st.rerun()
 
         # --- Sorting ---
@@ -1510,46 +4404,21 @@ def main():
              sort_key = sort_options_map[selected_sort_label]
 
 
-        # --- Fetch Recipes ---
-        # Cache to improve performance
-        cache_key = f"recipes_{sort_key}" # Cache based on sort order
-        if cache_key not in st.session_state:
-            with st.spinner(get_translation("processing")):
-                st.session_state[cache_key] = get_all_recipes(sort_option=sort_key)
-        recipes = st.session_state[cache_key]
+        total_recipes = count_recipes()
 
-
-        if not recipes:
+        if not total_recipes:
             st.info(get_translation("no_recipes"))
         else:
             st.write(
-                f"{get_translation('you_have')} **{len(recipes)}** {get_translation('saved_recipes')}"
+                f"{get_translation('you_have')} **{total_recipes}** {get_translation('saved_recipes')}"
             )
 
             # --- Filtering ---
             with st.expander(get_translation("filter_recipes")):
                 col1, col2 = st.columns(2)
 
-                # Collect unique filter options with safe handling
-                cuisines_set = set()
-                meal_types_set = set()
-                for r in recipes:
-                    # Process Cuisine
-                    cuisine_val = r.get("cuisine") # Get value (can be None)
-                    if cuisine_val and isinstance(cuisine_val, str): # Check if it's a non-None string
-                        stripped_cuisine = cuisine_val.strip()
-                        if stripped_cuisine: # Check if not empty after stripping
-                            cuisines_set.add(stripped_cuisine)
-
-                    # Process Meal Type
-                    meal_type_val = r.get("meal_type") # Get value (can be None)
-                    if meal_type_val and isinstance(meal_type_val, str): # Check if it's a non-None string
-                        stripped_meal_type = meal_type_val.strip()
-                        if stripped_meal_type: # Check if not empty after stripping
-                            meal_types_set.add(stripped_meal_type)
-
-                cuisines = sorted(list(cuisines_set))
-                meal_types = sorted(list(meal_types_set))
+                # Options come from the database (cached), not from the loaded page
+                cuisines, meal_types = get_filter_options()
 
                 with col1:
                     selected_cuisine = st.selectbox(
@@ -1562,13 +4431,26 @@ def main():
                         [get_translation("all")] + meal_types,
                     )
 
-
-            # Apply filters
-            filtered_recipes = recipes
+            # Filters are applied as query predicates in get_all_recipes
+            filters = {}
             if selected_cuisine != get_translation("all"):
-                filtered_recipes = [r for r in filtered_recipes if r.get("cuisine") == selected_cuisine]
+                filters["cuisine"] = selected_cuisine
             if selected_meal_type != get_translation("all"):
-                filtered_recipes = [r for r in filtered_recipes if r.get("meal_type") == selected_meal_type]
+                filters["meal_type"] = selected_meal_type
+
+            # --- Fetch Recipes ---
+            # Pages are accumulated in session state; "load more" fetches the next keyset page
+            cache_key = f"recipes_{sort_key}_{selected_cuisine}_{selected_meal_type}" # Cache per sort order and filter
+            if cache_key not in st.session_state:
+                st.session_state[cache_key] = {"items": [], "cursor": None, "has_more": True}
+            page_state = st.session_state[cache_key]
+            if page_state.get("version") != get_query_cache().stamp(list_scopes(filters)):
+                # Recipes this list can show were saved/deleted (by anyone) since its pages were loaded
+                page_state.update({"items": [], "cursor": None, "has_more": True})
+            if not page_state["items"] and page_state["has_more"]:
+                with st.spinner(get_translation("processing")):
+                    load_recipes_page(page_state, sort_key, filters)
+            filtered_recipes = page_state["items"]
 
             # Display recipes
             if not filtered_recipes:
@@ -1578,6 +4460,12 @@ def main():
                  for recipe in filtered_recipes:
                     render_recipe_card(recipe, show_delete_button=True) # Show delete button here
 
+            if page_state["has_more"]:
+                if st.button(get_translation("load_more"), key=f"load_more_{cache_key}"):
+                    with st.spinner(get_translation("processing")):
+                        load_recipes_page(page_state, sort_key, filters)
+                    st.rerun()
+
 
     # ============================
     # TAB 3: SEARCH RECIPES
@@ -0,0 +1,81 @@
+"""
+Shared fixtures. streamlit_app reads its secrets at import time, so a throwaway secrets
+file is configured first. Database tests run against mongomock (part of the dev dependency
+group: uv sync) and never touch a real MongoDB; model calls are replaced with fakes.
+"""
+import os
+import tempfile
+import time
+
+import mongomock
+import mongomock.collection
+import pytest
+from streamlit import config
+
+os.environ.setdefault("GEMINI_RPM", "0")  # No rate-limit waits between fake model calls
+
+_secrets = tempfile.NamedTemporaryFile("w", suffix=".toml", delete=False)
+_secrets.write('GEMINI_API_KEY = "test"\nMONGODB_URI = "mongodb://localhost:27017"\nAPP_PASSWORD = "test"\n')
+_secrets.close()
+config.set_option("secrets.files", [_secrets.name])
+
+import streamlit_app as app  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh in-memory database behind get_database() (and every collection getter)."""
+    # mongomock's bulk builder predates the sort option newer pymongo passes to UpdateOne
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    monkeypatch.setattr(mongomock.collection.BulkOperationBuilder, "add_update",
+                        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs))
+
+    database = mongomock.MongoClient()["recipe_keeper_test"]
+    monkeypatch.setattr(app, "get_database", lambda: database)
+    return database
+
+
+@pytest.fixture
+def resources(db):
+    """Extraction resources with fresh, empty caches and stats, as get_job_queue() would hand to workers."""
+    return app.ExtractionResources(
+        http_session=app.PooledSession(),
+        page_cache=app.PageCache(),
+        image_discovery_stats=app.ImageDiscoveryStats(),
+        image_cache=app.ImageCache(),
+        disk_image_cache=None,
+        extraction_cache=app.ExtractionCache(db["extraction_cache"]),
+        rate_limiter=app.RateLimiter(0),
+        model_stats=app.ModelStats(),
+        recipes_collection=db["recipes"],
+        recipe_images_collection=db["recipe_images"],
+        app_meta_collection=db["app_meta"],
+        query_cache=app.QueryCache(),
+    )
+
+
+@pytest.fixture
+def queue(db, resources):
+    """A job queue with fast heartbeats, so stale detection can be tested in well under a second."""
+    queue = app.ExtractionJobQueue(db["jobs"], resources, max_workers=2, heartbeat_seconds=0.05, stale_seconds=0.5,
+                                   bulk_workers=1)
+    yield queue
+    queue._stop.set()
+    queue.executor.shutdown(wait=True)
+    queue.bulk_executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def wait_for():
+    """wait_for(queue, job_id, statuses): poll until the job's status is one of statuses; returns the job."""
+    return _wait_for
+
+
+def _wait_for(queue, job_id, statuses, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} never reached {statuses}")
@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+
+import pytest
+
+import streamlit_app as app
+
+
+def test_import_job_result_is_the_report_row(queue, resources, monkeypatch, wait_for):
+    seen = []
+
+    def extract(url, extraction_resources=None):
+        seen.append(extraction_resources)
+        return {"title": "Soup", "ingredients": ["salt"], "instructions": ["boil"]}
+
+    monkeypatch.setattr(app, "run_url_extraction", extract)
+    monkeypatch.setattr(app, "store_recipe", lambda recipe, resources=None: (app.bson.ObjectId(), True))
+    job = wait_for(queue, queue.submit_import("https://example.com/soup"), ("done", "failed"))
+    assert job["status"] == "done" and "missing_fields" not in job
+    assert app.import_report_row(job)["status"] == "saved" and app.import_report_row(job)["title"] == "Soup"
+    assert seen == [resources]  # Handed the queue's resources, not resolved from a script context
+
+
+def test_failed_import_job_becomes_a_failed_row():
+    job = {"source": "https://example.com", "status": "failed", "error": "Interrupted"}
+    row = app.import_report_row(job)
+    assert row["status"] == "failed" and row["url"] == "https://example.com" and row["error"] == "Interrupted"
+    assert app.import_report_row({"status": "running"}) is None
+
+
+def test_get_many_keeps_order_and_skips_unknown_ids(queue):
+    first = queue.submit("url", "https://example.com/1", lambda: {"title": "A"})
+    second = queue.submit("url", "https://example.com/2", lambda: {"title": "B"})
+    jobs = queue.get_many([second, "not-an-id", str(app.bson.ObjectId()), first])
+    assert [job["source"] for job in jobs] == ["https://example.com/2", "https://example.com/1"]
+
+
+def test_run_concurrently_cancels_pending_items_when_the_caller_stops():
+    started = []
+    release = threading.Event()
+
+    def work(item):
+        started.append(item)
+        if item:
+            release.wait(5)
+        return item
+
+    def on_result(result, done, total):
+        raise RuntimeError("rerun")
+
+    try:
+        with pytest.raises(RuntimeError):
+            app.run_concurrently(work, list(range(20)), max_workers=2, on_result=on_result)
+    finally:
+        release.set()
+    time.sleep(0.1)
+    assert len(started) <= 3  # The first item and whatever was in flight, not all 20
+
+
+def test_a_running_import_does_not_hold_up_single_extractions(queue, monkeypatch, wait_for):
+    release = threading.Event()
+    monkeypatch.setattr(app, "import_recipe_url", lambda url, attempts, resources: release.wait(5) and {"url": url})
+    imports = [queue.submit_import(f"https://example.com/{i}") for i in range(5)]
+    try:
+        job = wait_for(queue, queue.submit("url", "https://example.com/single", lambda: {"title": "Soup"}),
+                       ("done", "failed"), timeout=2)
+        assert job["status"] == "done"
+        assert all(job["status"] in ("queued", "running") for job in queue.get_many(imports))
+    finally:
+        release.set()
+
+
+class OfflineSession:
+    """Every outbound request 404s (no image, no noembed thumbnail)."""
+
+    def get(self, url, **kwargs):
+        response = app.requests.Response()
+        response.status_code = 404
+        response.url = url
+        return response
+
+    head = get
+
+
+def test_import_job_end_to_end_without_a_script_context(queue, resources, db, monkeypatch, wait_for):
+    def no_script_context(*args, **kwargs):
+        raise AssertionError("job workers must use the queue's resources")
+
+    for getter in ("get_database", "get_image_cache", "get_disk_image_cache", "get_query_cache",
+                   "get_http_session", "get_page_cache", "get_extraction_resources"):
+        monkeypatch.setattr(app, getter, no_script_context)
+    monkeypatch.setattr(app, "generate_recipe_json", no_script_context)  # Complete JSON-LD: no model call
+    url = "https://example.com/recipes/soup"
+    recipe = {"@type": "Recipe", "name": "Lentil Soup", "recipeIngredient": ["lentils", "onion"],
+              "recipeInstructions": ["Chop.", "Simmer."]}
+    html = f'<html><head><script type="application/ld+json">{json.dumps(recipe)}</script></head></html>'
+    resources.http_session = OfflineSession()
+    resources.page_cache.put(app.FetchedPage(url, url, html))
+
+    job = wait_for(queue, queue.submit_import(url), ("done", "failed"))
+    row = app.import_report_row(job)
+    assert row["status"] == "saved" and row["error"] is None, row
+    saved = db["recipes"].find_one({"_id": app.bson.ObjectId(row["recipe_id"])})
+    assert saved["title"] == "Lentil Soup" and saved["source_url"] == url
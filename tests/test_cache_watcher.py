@@ -0,0 +1,116 @@
+import time
+from datetime import datetime, timedelta
+
+import streamlit_app as app
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_polling_mode_drops_everything_on_an_unlisted_version_change(db):
+    image_cache = app.ImageCache()
+    image_cache.put("recipe-1", b"thumb", "image/webp")
+    image_cache.put(app.get_image_cache_key("https://example.com/soup.png"), b"image")
+    query_cache = app.QueryCache()
+    db["app_meta"].insert_one({"_id": app.RECIPES_VERSION_ID, "version": 1})
+
+    # mongomock has no change streams, so the watcher falls back to polling the version counter
+    watcher = app.CacheInvalidationWatcher(db["recipes"], db["app_meta"], query_cache, image_cache,
+                                           poll_seconds=0.05).start()
+    try:
+        assert wait_until(lambda: watcher.mode == "polling")
+        time.sleep(0.1)
+        assert image_cache.peek("recipe-1") is not None  # No change yet
+
+        db["app_meta"].update_one({"_id": app.RECIPES_VERSION_ID}, {"$inc": {"version": 1}})
+        assert wait_until(lambda: image_cache.peek("recipe-1") is None)
+        assert image_cache.peek(app.get_image_cache_key("https://example.com/soup.png")) is not None
+    finally:
+        watcher.stop()
+
+
+def test_polling_mode_applies_listed_changes_to_the_changed_recipes_only(db):
+    image_cache = app.ImageCache()
+    now = datetime.now()
+    image_cache.put("recipe-1", b"old", source_time=now - timedelta(minutes=1))
+    image_cache.put("recipe-2", b"fresh", source_time=now + timedelta(seconds=1))  # Stored after the save
+    image_cache.put("recipe-3", b"other")
+    query_cache = app.QueryCache()
+    db["app_meta"].insert_one({"_id": app.RECIPES_VERSION_ID, "version": 1})
+    french = query_cache.stamp(app.list_scopes({"cuisine": "French"}))
+    thai = query_cache.stamp(app.list_scopes({"cuisine": "Thai"}))
+
+    watcher = app.CacheInvalidationWatcher(db["recipes"], db["app_meta"], query_cache, image_cache,
+                                           poll_seconds=0.05).start()
+    try:
+        assert wait_until(lambda: watcher.mode == "polling")
+        time.sleep(0.1)
+        app.bump_recipes_version(change=app.recipe_change(1, [{"cuisine": "Thai"}], now))
+        app.bump_recipes_version(change=app.recipe_change(2, [{"cuisine": "Thai"}], now))
+        assert wait_until(lambda: image_cache.peek("recipe-1") is None)
+        assert image_cache.peek("recipe-2") is not None and image_cache.peek("recipe-3") is not None
+        assert query_cache.stamp(app.list_scopes({"cuisine": "Thai"})) != thai
+        assert query_cache.stamp(app.list_scopes({"cuisine": "French"})) == french
+        assert query_cache.invalidations == 0
+    finally:
+        watcher.stop()
+
+
+def test_change_events_invalidate_by_recipe_and_filter():
+    image_cache = app.ImageCache()
+    query_cache = app.QueryCache()
+    watcher = app.CacheInvalidationWatcher(None, None, query_cache, image_cache)
+    stored_on = datetime(2024, 1, 2)
+    image_cache.put("recipe-1", b"thumb", source_time=stored_on)
+    french = query_cache.stamp(app.list_scopes({"cuisine": "French"}))
+    breakfast = query_cache.stamp(app.list_scopes({"meal_type": "Breakfast"}))
+    thai = query_cache.stamp(app.list_scopes({"cuisine": "Thai"}))
+
+    # The save that also stored the thumbnail: its update happened before the thumbnail was written
+    watcher._apply_change({
+        "operationType": "update", "documentKey": {"_id": 1},
+        "fullDocument": {"_id": 1, "cuisine": "Thai", "meal_type": "Breakfast", "updated_on": datetime(2024, 1, 1)},
+        "updateDescription": {"updatedFields": {"cuisine": "Thai"}, "removedFields": []},
+    })
+    assert image_cache.peek("recipe-1") is not None
+    # cuisine changed from an unknown value; meal_type was unchanged
+    assert query_cache.stamp(app.list_scopes({"cuisine": "French"})) != french
+    assert query_cache.stamp(app.list_scopes({"cuisine": "Thai"})) != thai
+    breakfast_after = query_cache.stamp(app.list_scopes({"meal_type": "Breakfast"}))
+    assert breakfast_after != breakfast
+    lunch = query_cache.stamp(app.list_scopes({"meal_type": "Lunch"}))
+
+    watcher._apply_change({
+        "operationType": "update", "documentKey": {"_id": 1},
+        "fullDocument": {"_id": 1, "cuisine": "Thai", "meal_type": "Breakfast", "updated_on": datetime(2024, 1, 3)},
+        "updateDescription": {"updatedFields": {"title": "Khao tom"}, "removedFields": []},
+    })
+    assert image_cache.peek("recipe-1") is None  # Older than the change
+    assert query_cache.stamp(app.list_scopes({"meal_type": "Lunch"})) == lunch
+    assert query_cache.invalidations == 0
+
+
+def test_discard_if_older():
+    cache = app.ImageCache()
+    cache.put("a", b"x", source_time=datetime(2024, 1, 2))
+    cache.discard_if_older("a", datetime(2024, 1, 1))
+    assert cache.peek("a") is not None
+    cache.discard_if_older("a", datetime(2024, 1, 3))
+    assert cache.peek("a") is None
+    cache.put("b", b"x")
+    cache.discard_if_older("b", datetime(2024, 1, 1))  # Unknown write time: always dropped
+    assert cache.peek("b") is None
+
+
+def test_discard_prefix():
+    cache = app.ImageCache()
+    for key in ("recipe-1", "recipe-2", "img-1"):
+        cache.put(key, b"x")
+    assert cache.discard_prefix("recipe-") == 2
+    assert cache.peek("img-1") is not None and cache.stats()["entries"] == 1
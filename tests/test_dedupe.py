@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import streamlit_app as app
+
+
+def recipe(title, ingredients, source_url=None, **fields):
+    doc = {"title": title, "ingredients": ingredients, "instructions": ["Mix"], **fields}
+    if source_url:
+        doc["source_url"] = source_url
+    return doc
+
+
+def test_fingerprint_ignores_case_punctuation_and_order():
+    assert (app.recipe_fingerprint(recipe("Tomato Soup!", ["Salt", "2 tomatoes"]))
+            == app.recipe_fingerprint(recipe("tomato soup", ["2 Tomatoes.", "salt "])))
+    assert (app.recipe_fingerprint(recipe("Tomato Soup", ["salt"]))
+            != app.recipe_fingerprint(recipe("Tomato Soup", ["pepper"])))
+
+
+@pytest.mark.parametrize("ingredients", [[], None, ["", "  "]])
+def test_no_fingerprint_without_ingredients(ingredients):
+    assert app.recipe_fingerprint({"title": "Cake", "ingredients": ingredients}) is None
+
+
+def test_same_title_without_ingredients_is_not_a_duplicate(db):
+    first, _ = app.store_recipe(recipe("Cake", []), store_thumbnail=False)
+    second, created = app.store_recipe(recipe("Cake", []), store_thumbnail=False)
+    assert created and first != second
+    assert db["recipes"].count_documents({}) == 2
+    assert app.plan_recipe_dedupe() == []
+
+
+def test_save_updates_the_existing_copy(db):
+    first, created = app.store_recipe(recipe("Soup", ["salt"], "https://example.com/soup?utm_source=x"),
+                                      store_thumbnail=False)
+    assert created
+    second, created = app.store_recipe(recipe("Soup v2", ["salt", "water"], "https://example.com/soup/"),
+                                       store_thumbnail=False)
+    assert second == first and not created
+    assert db["recipes"].find_one({"_id": first})["title"] == "Soup v2"
+
+
+def test_save_merges_into_url_owner_when_fingerprint_is_taken(db):
+    owner = app.set_dedupe_keys(recipe("Old soup", ["salt"], "https://example.com/a"))
+    other = app.set_dedupe_keys(recipe("New soup", ["water"], "https://example.com/b"))
+    db["recipes"].insert_many([owner, other])
+    app.ensure_unique_recipe_indexes(db["recipes"])
+
+    # Same content as "other", but from the URL "owner" was saved from
+    recipe_id, created = app.store_recipe(recipe("New soup", ["water"], "https://example.com/a"),
+                                          store_thumbnail=False)
+    assert recipe_id == owner["_id"] and not created
+    saved = db["recipes"].find_one({"_id": owner["_id"]})
+    assert saved["title"] == "New soup" and "fingerprint" not in saved
+    assert db["recipes"].find_one({"_id": other["_id"]})["fingerprint"] == other["fingerprint"]
+
+
+def test_save_with_resources_never_uses_the_script_getters(db, resources, monkeypatch):
+    def no_script_context():
+        raise AssertionError("workers must not resolve cached resources themselves")
+
+    for getter in ("get_database", "get_image_cache", "get_disk_image_cache", "get_query_cache",
+                   "get_http_session", "get_extraction_resources"):
+        monkeypatch.setattr(app, getter, no_script_context)
+    resources.query_cache.put("list:()", ["stale"], resources.query_cache.stamp([("any",)]))
+    recipe_id, created = app.store_recipe(recipe("Soup", ["salt"], image_url=None), resources=resources)
+    assert created and db["recipes"].find_one({"_id": recipe_id})["title"] == "Soup"
+    assert resources.query_cache.get("list:()") == (False, None)
+    assert db["app_meta"].find_one({"_id": app.RECIPES_VERSION_ID})["version"] == 1
+
+
+def test_plan_reports_without_changing_anything(db):
+    now = datetime.now()
+    db["recipes"].insert_many([
+        recipe("Soup", ["salt"], "https://example.com/soup", added_on=now - timedelta(days=2)),
+        recipe("Soup", ["salt"], "https://example.com/soup/?fbclid=1", added_on=now),
+    ])
+    before = list(db["recipes"].find())
+    plan = app.plan_recipe_dedupe()
+    assert len(plan) == 1 and len(plan[0]["remove"]) == 1
+    assert list(db["recipes"].find()) == before
+
+
+def test_plan_keeps_the_most_complete_then_newest_copy(db):
+    now = datetime.now()
+    sparse = recipe("Soup", ["salt", "water"], description="", added_on=now)
+    complete_old = recipe("soup", ["water", "salt"], description="Warm", cuisine="French",
+                          added_on=now - timedelta(days=9))
+    complete_new = recipe("Soup.", ["salt", "water"], description="Warm", cuisine="French",
+                          added_on=now - timedelta(days=9), updated_on=now - timedelta(days=1))
+    db["recipes"].insert_many([sparse, complete_old, complete_new])
+
+    [group] = app.plan_recipe_dedupe()
+    assert group["field"] == "fingerprint"
+    assert group["keep"]["_id"] == complete_new["_id"]
+    assert {doc["_id"] for doc in group["remove"]} == {sparse["_id"], complete_old["_id"]}
+
+
+def test_apply_deletes_only_planned_duplicates_and_their_thumbnails(db):
+    keep = recipe("Soup", ["salt"], "https://example.com/soup", description="Warm", added_on=datetime.now())
+    duplicate = recipe("Soup", ["salt"], "https://example.com/soup#top", added_on=datetime.now())
+    unrelated = recipe("Cake", [], added_on=datetime.now())
+    db["recipes"].insert_many([keep, duplicate, unrelated])
+    db["recipe_images"].insert_many([{"_id": keep["_id"]}, {"_id": duplicate["_id"]}])
+
+    plan = app.plan_recipe_dedupe()
+    assert app.apply_recipe_dedupe(plan) == 1
+    assert {doc["_id"] for doc in db["recipes"].find()} == {keep["_id"], unrelated["_id"]}
+    assert [doc["_id"] for doc in db["recipe_images"].find()] == [keep["_id"]]
+
+
+def test_backfill_sets_and_clears_keys(db):
+    stale = recipe("Cake", [], source_url="https://example.com/cake?utm_source=x",
+                   fingerprint="title-only", dedupe_checked=True)
+    fresh = recipe("Soup", ["salt"], "https://example.com/soup")
+    db["recipes"].insert_many([stale, fresh])
+
+    assert app.backfill_dedupe_keys() == 2
+    stale_doc = db["recipes"].find_one({"_id": stale["_id"]})
+    assert "fingerprint" not in stale_doc and "dedupe_checked" not in stale_doc
+    assert stale_doc["source_url_canonical"] == "https://example.com/cake"
+    assert db["recipes"].find_one({"_id": fresh["_id"]})["fingerprint"] == app.recipe_fingerprint(fresh)
+    assert app.backfill_dedupe_keys() == 0
+
+
+def test_cli_is_a_dry_run_without_apply(db, monkeypatch, tmp_path, capsys):
+    import dedupe_recipes
+
+    db["recipes"].insert_many([recipe("Soup", ["salt"]), recipe("soup", ["Salt"])])
+    backup = tmp_path / "backup.json"
+    monkeypatch.setattr("sys.argv", ["dedupe_recipes.py", "--backup", str(backup)])
+    assert dedupe_recipes.main() == 0
+    assert db["recipes"].count_documents({}) == 2 and not backup.exists()
+    assert "1 duplicate recipes" in capsys.readouterr().out
+
+    monkeypatch.setattr("sys.argv", ["dedupe_recipes.py", "--apply", "--backup", str(backup)])
+    assert dedupe_recipes.main() == 0
+    assert db["recipes"].count_documents({}) == 1 and backup.exists()
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+import streamlit_app as app
+
+
+def test_canonicalize_url_normalises_equivalent_links():
+    assert (app.canonicalize_url("HTTPS://Example.com:443/recipes/soup/?utm_source=x&b=2&a=1#comments")
+            == "https://example.com/recipes/soup?a=1&b=2")
+
+
+def test_canonicalize_url_strips_known_trackers_only():
+    url = "https://example.com/r?fbclid=1&gclid=2&utm_campaign=3&ref=cake&si=9&id=42"
+    assert app.canonicalize_url(url) == "https://example.com/r?id=42&ref=cake&si=9"
+
+
+def test_canonicalize_url_keeps_recipe_identifying_params_apart():
+    assert (app.canonicalize_url("https://example.com/recipe?ref=soup")
+            != app.canonicalize_url("https://example.com/recipe?ref=cake"))
+
+
+def test_extraction_cache_key_depends_on_models_and_identity():
+    key = app.extraction_cache_key("url", "https://example.com/a", ("flash",))
+    assert key != app.extraction_cache_key("url", "https://example.com/a", ("flash", "pro"))
+    assert key != app.extraction_cache_key("url", "https://example.com/b", ("flash",))
+    assert key != app.extraction_cache_key("image", "https://example.com/a", ("flash",))
+
+
+def test_extraction_cache_round_trip(db):
+    cache = app.ExtractionCache(db["extraction_cache"])
+    cache.put(["a", "b"], {"title": "Soup"})
+    assert cache.get("a") == {"title": "Soup"}
+    assert cache.get("b") == {"title": "Soup"}
+    assert cache.get("missing") is None
+    # Callers may modify what they get back without touching the cache
+    cache.get("a")["title"] = "changed"
+    assert cache.get("a") == {"title": "Soup"}
+    assert cache.stats()["stores"] == 2
+
+
+def test_extraction_cache_expires_old_entries(db):
+    cache = app.ExtractionCache(db["extraction_cache"], ttl_seconds=60)
+    db["extraction_cache"].insert_one({"_id": "old", "recipe": {"title": "Soup"},
+                                       "created_at": app.utc_now() - timedelta(seconds=61)})
+    # As pymongo returns them: naive, in UTC
+    db["extraction_cache"].insert_one({"_id": "fresh", "recipe": {"title": "Cake"},
+                                       "created_at": app.utc_now().replace(tzinfo=None)})
+    assert cache.get("old") is None
+    assert cache.get("fresh") == {"title": "Cake"}
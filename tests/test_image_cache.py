@@ -0,0 +1,120 @@
+import base64
+import threading
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+import streamlit_app as app
+
+URL = "https://example.com/soup.png"
+
+
+def png_bytes() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (4, 4), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class SlowSession:
+    """Serves one PNG (or a 404) slowly enough for concurrent callers to pile up on the key lock."""
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        time.sleep(0.2)
+        return type("Response", (), {"status_code": self.status_code, "content": png_bytes(),
+                                     "headers": {"Content-Type": "image/png"}})()
+
+
+def run_concurrently(count: int, target) -> list:
+    results = [None] * count
+
+    def worker(i):
+        results[i] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_misses_download_once(resources):
+    resources.http_session = SlowSession()
+    results = run_concurrently(5, lambda: app.cache_image(URL, resources=resources))
+    assert resources.http_session.calls == 1
+    assert all(result == png_bytes() for result in results)
+    # One miss per caller; the re-check under the key lock isn't counted again
+    stats = resources.image_cache.stats()
+    assert stats["misses"] == 5 and stats["hits"] == 0
+    assert resources.image_cache._key_locks == {}
+
+
+def test_key_locks_are_released_after_failed_downloads(resources):
+    resources.http_session = SlowSession(status_code=404)
+    assert run_concurrently(3, lambda: app.cache_image(URL, resources=resources)) == [None] * 3
+    assert resources.image_cache._key_locks == {}
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = app.ImageCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")
+    cache.put("c", b"12345")
+    assert cache.peek("a") and cache.peek("c") and cache.peek("b") is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 10
+    cache.put("huge", b"x" * 11)
+    assert cache.peek("huge") is None
+
+
+def test_expired_entries_are_dropped():
+    cache = app.ImageCache(ttl_seconds=60)
+    cache.put("a", b"123")
+    assert cache.get("a", max_age_seconds=0) is None
+    assert cache.stats()["expirations"] == 1 and cache.stats()["bytes"] == 0
+
+
+def jpeg_bytes(size, orientation=None) -> bytes:
+    img = Image.new("RGB", size, "red")
+    exif = img.getexif()
+    if orientation:
+        exif[app.EXIF_ORIENTATION_TAG] = orientation
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def test_thumbnails_of_a_sideways_photo_use_its_displayed_width():
+    # Stored 800x400 with orientation 6: displayed 400 wide and 800 tall
+    content = jpeg_bytes((800, 400), orientation=6)
+    variants = app.make_thumbnails(content, widths=(320, 640))
+    assert variants[640] is content  # Already narrower than 640 as displayed
+    assert Image.open(BytesIO(variants[320])).size == (320, 640)
+
+
+def test_thumbnails_are_downscaled_to_each_width():
+    content = jpeg_bytes((2000, 1000))
+    variants = app.make_thumbnails(content, widths=(320, 640))
+    assert [Image.open(BytesIO(variants[w])).size for w in (320, 640)] == [(320, 160), (640, 320)]
+
+
+def test_inline_image_migration_runs_until_it_has_completed(db, monkeypatch):
+    recipe_id = db["recipes"].insert_one({"title": "Soup",
+                                          "image_data_b64": base64.b64encode(png_bytes()).decode()}).inserted_id
+    app.ensure_inline_images_migrated.clear()
+    assert app.ensure_inline_images_migrated() == 1
+    assert "image_data_b64" not in db["recipes"].find_one({"_id": recipe_id})
+    assert db["recipe_images"].find_one({"_id": recipe_id}) is not None
+    assert db["app_meta"].find_one({"_id": app.INLINE_IMAGES_MIGRATION_ID})["moved"] == 1
+
+    # A later process start finds the marker and skips the collection scan
+    monkeypatch.setattr(app, "migrate_inline_images", lambda: pytest.fail("migration ran again"))
+    app.ensure_inline_images_migrated.clear()
+    assert app.ensure_inline_images_migrated() == 0
@@ -0,0 +1,81 @@
+import threading
+import time
+from datetime import timedelta
+
+import streamlit_app as app
+
+
+def test_job_result_is_stored(queue, wait_for):
+    job_id = queue.submit("url", "https://example.com", lambda: {"title": "Soup", "ingredients": ["salt"]})
+    job = wait_for(queue, job_id, ("done", "failed"))
+    assert job["status"] == "done" and job["result"]["title"] == "Soup"
+    assert job["missing_fields"] == ["instructions"]
+
+
+def test_job_error_is_reported(queue, wait_for):
+    def fail():
+        raise RuntimeError("boom")
+
+    job = wait_for(queue, queue.submit("url", "https://example.com", fail), ("done", "failed"))
+    assert job["status"] == "failed" and job["error"] == "boom"
+
+
+def test_slow_job_with_a_live_worker_is_not_interrupted(queue, wait_for):
+    release = threading.Event()
+    job_id = queue.submit("url", "https://example.com", lambda: release.wait(5) and {"title": "Soup"})
+    wait_for(queue, job_id, ("running",))
+    time.sleep(1.0)  # Twice the stale threshold; the heartbeat keeps it alive
+    assert queue.get(job_id)["status"] == "running"
+    release.set()
+    assert wait_for(queue, job_id, ("done", "failed"))["status"] == "done"
+
+
+def test_job_without_heartbeat_is_interrupted_when_polled(queue, db):
+    # Left running by a process that died a moment ago
+    job_id = db["jobs"].insert_one({
+        "kind": "url", "source": "https://example.com", "status": "running",
+        "created_at": app.utc_now() - timedelta(seconds=5), "updated_at": app.utc_now() - timedelta(seconds=1),
+    }).inserted_id
+    job = queue.get(str(job_id))
+    assert job["status"] == "failed" and job["error"] == "Interrupted"
+    assert db["jobs"].find_one({"_id": job_id})["status"] == "failed"
+
+
+def test_a_new_queue_leaves_other_processes_jobs_alone(db, resources):
+    job_id = db["jobs"].insert_one({
+        "kind": "url", "source": "https://example.com", "status": "running",
+        "created_at": app.utc_now() - timedelta(hours=1), "updated_at": app.utc_now(),
+    }).inserted_id
+    app.ExtractionJobQueue(db["jobs"], resources, max_workers=1)._stop.set()
+    assert db["jobs"].find_one({"_id": job_id})["status"] == "running"
+
+
+def test_unknown_job_id(queue):
+    assert queue.get("not-an-id") is None
+    assert queue.get(str(app.bson.ObjectId())) is None
+
+
+def test_result_that_cannot_be_stored_fails_the_job(queue, wait_for):
+    job_id = queue.submit("url", "https://example.com", lambda: {"title": "Soup", "servings": 10 ** 20})
+    job = wait_for(queue, job_id, ("done", "failed"))
+    assert job["status"] == "failed" and job["error"].startswith("Could not store the result")
+    assert queue.stats()["active"] == 0 and queue.stats()["failed"] == 1
+    assert not queue._owned
+
+
+def test_batch_photo_group_runs_as_one_job(queue, monkeypatch, wait_for):
+    from PIL import Image
+
+    seen = []
+
+    def extract(images, settings=None, resources=None):
+        seen.append(len(images))
+        return {"title": "Cake", "ingredients": ["flour"], "instructions": ["Bake"]}
+
+    monkeypatch.setattr(app, "run_image_extraction", extract)
+    pages = [("p1.jpg", Image.new("RGB", (4, 4))), ("p2.jpg", Image.new("RGB", (4, 4)))]
+    job = wait_for(queue, queue.submit_image_group(pages), ("done", "failed"))
+    assert seen == [2]
+    assert app.batch_result_row(job) == {"pages": "p1.jpg, p2.jpg", "recipe": job["result"], "error": None,
+                                         "seconds": job["seconds"]}
+    assert job["missing_fields"] == []
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+import pytest
+
+import streamlit_app as app
+
+
+def index_keys(collection) -> list[list[tuple]]:
+    return [list(info["key"]) for info in collection.index_information().values()]
+
+
+def supports_sort(keys: list[tuple], equality: list[str], sort: list[tuple]) -> bool:
+    """True if an index can serve an equality match on equality plus sort, in either direction."""
+    prefix = [field for field, _ in keys[:len(equality)]]
+    rest = keys[len(equality):len(equality) + len(sort)]
+    if sorted(prefix) != sorted(equality) or [field for field, _ in rest] != [field for field, _ in sort]:
+        return False
+    same = [direction == wanted for (_, direction), (_, wanted) in zip(rest, sort)]
+    return all(same) or not any(same)
+
+
+# Every filter/sort the recipe list offers (a filtered title sort only orders the filtered subset)
+@pytest.mark.parametrize("filter_field, sort_option", [
+    (None, "newest"), (None, "oldest"), (None, "title"),
+    ("cuisine", "newest"), ("cuisine", "oldest"),
+    ("meal_type", "newest"), ("meal_type", "oldest"),
+])
+def test_list_sorts_are_index_backed(db, filter_field, sort_option):
+    app.ensure_indexes(db["recipes"])
+    field, direction = app.SORT_OPTIONS[sort_option]
+    equality = [filter_field] if filter_field else []
+    assert any(supports_sort(keys, equality, [(field, direction), ("_id", direction)])
+               for keys in index_keys(db["recipes"]))
+
+
+def test_superseded_indexes_are_dropped(db):
+    db["recipes"].create_index([("title", 1)], name="title")
+    db["recipes"].create_index([("cuisine", 1), ("added_on", -1)], name="cuisine_added_on")
+    app.ensure_indexes(db["recipes"])
+    names = set(db["recipes"].index_information())
+    assert not names & {"title", "cuisine_added_on"} and {"title_id", "cuisine_added_on_id"} <= names
+
+
+def test_session_recipe_details_reload_only_when_that_recipe_changes(db, monkeypatch):
+    monkeypatch.setattr(app.st, "session_state", {})
+    query_cache = app.QueryCache()
+    monkeypatch.setattr(app, "get_query_cache", lambda: query_cache)
+    soup = {"title": "Soup", "ingredients": ["salt"], "instructions": ["Boil"]}
+    recipe_id = db["recipes"].insert_one(soup).inserted_id
+
+    assert app.get_session_recipe_details(recipe_id)["ingredients"] == ["salt"]
+    db["recipes"].update_one({"_id": recipe_id}, {"$set": {"ingredients": ["pepper"]}})
+    assert app.get_session_recipe_details(recipe_id)["ingredients"] == ["salt"]  # Unchanged: from the session
+    query_cache.invalidate_recipe("another-recipe", [{"cuisine": "Thai"}])
+    assert app.get_session_recipe_details(recipe_id)["ingredients"] == ["salt"]
+    query_cache.invalidate_recipe(recipe_id, [{}])
+    assert app.get_session_recipe_details(recipe_id)["ingredients"] == ["pepper"]
+
+
+def test_session_recipe_details_are_bounded(db, monkeypatch):
+    monkeypatch.setattr(app.st, "session_state", {})
+    monkeypatch.setattr(app, "RECIPE_DETAILS_SESSION_MAX", 3)
+    ids = db["recipes"].insert_many([{"title": str(i), "ingredients": [], "instructions": []}
+                                     for i in range(5)]).inserted_ids
+    for recipe_id in ids:
+        app.get_session_recipe_details(recipe_id)
+    assert list(app.st.session_state["recipe_details"]) == [str(i) for i in ids[2:]]
+
+
+def test_saving_a_recipe_keeps_lists_it_cannot_appear_in(db, monkeypatch):
+    query_cache = app.QueryCache()
+    monkeypatch.setattr(app, "get_query_cache", lambda: query_cache)
+    db["recipes"].insert_many([
+        {"title": "Pho", "cuisine": "Vietnamese", "meal_type": "Dinner", "added_on": datetime(2024, 1, 1)},
+        {"title": "Crepes", "cuisine": "French", "meal_type": "Breakfast", "added_on": datetime(2024, 1, 2)},
+    ])
+    views = {
+        "vietnamese": {"cuisine": "Vietnamese"},
+        "french": {"cuisine": "French"},
+        "dinner": {"meal_type": "Dinner"},
+        "all": None,
+    }
+    for filters in views.values():
+        app.get_all_recipes(filters=filters)
+    stamps = {name: query_cache.stamp(app.list_scopes(filters)) for name, filters in views.items()}
+
+    app.store_recipe({"title": "Banh mi", "ingredients": ["bread"], "instructions": ["Fill"],
+                      "cuisine": "Vietnamese", "meal_type": "Lunch"}, store_thumbnail=False)
+    changed = {name for name, filters in views.items()
+               if query_cache.stamp(app.list_scopes(filters)) != stamps[name]}
+    assert changed == {"vietnamese", "all"}
+    misses = query_cache.misses
+    app.get_all_recipes(filters={"cuisine": "French"})
+    assert query_cache.misses == misses  # Still served from the cache
+    assert [r["title"] for r in app.get_all_recipes(filters={"cuisine": "Vietnamese"})] == ["Banh mi", "Pho"]
+
+
+def test_deleting_a_recipe_invalidates_its_filtered_lists(db, monkeypatch):
+    query_cache = app.QueryCache()
+    monkeypatch.setattr(app, "get_query_cache", lambda: query_cache)
+    recipe_id = db["recipes"].insert_one({"title": "Pho", "cuisine": "Vietnamese", "meal_type": "Dinner"}).inserted_id
+    french = query_cache.stamp(app.list_scopes({"cuisine": "French"}))
+    dinner = query_cache.stamp(app.list_scopes({"meal_type": "Dinner"}))
+
+    assert app.delete_recipe_from_db(str(recipe_id))
+    assert query_cache.stamp(app.list_scopes({"cuisine": "French"})) == french
+    assert query_cache.stamp(app.list_scopes({"meal_type": "Dinner"})) != dinner
+    [change] = db["app_meta"].find_one({"_id": app.RECIPES_VERSION_ID})["changes"]
+    assert change["recipe_id"] == str(recipe_id) and change["docs"] == [{"cuisine": "Vietnamese", "meal_type": "Dinner"}]
+    assert not app.delete_recipe_from_db(str(recipe_id))
+
+
+def test_cached_lists_are_not_shared_between_callers(db, monkeypatch):
+    query_cache = app.QueryCache()
+    monkeypatch.setattr(app, "get_query_cache", lambda: query_cache)
+    db["recipes"].insert_one({"title": "Soup", "ingredients": ["salt"], "tags": ["warm"], "added_on": datetime.now()})
+
+    [first] = app.get_all_recipes()
+    first["ingredients"].append("sugar")
+    first["tags"].clear()
+    [second] = app.get_all_recipes()
+    assert query_cache.hits == 1
+    assert second["ingredients"] == ["salt"] and second["tags"] == ["warm"]
+    second["title"] = "Changed"
+    assert app.get_all_recipes()[0]["title"] == "Soup"
@@ -0,0 +1,126 @@
+import json
+import time
+
+import pytest
+
+import streamlit_app as app
+
+COMPLETE = {"title": "Soup", "ingredients": ["water", "salt"], "instructions": ["Boil"]}
+PARTIAL = {"title": "Soup", "ingredients": ["water", "salt"]}
+URL = "https://example.com/soup"
+PAGE_HTML = "<html><head><title>Soup</title></head><body><p>Water, salt. Boil.</p></body></html>"
+
+
+class FakeModels:
+    """Stands in for genai.GenerativeModel; outcomes maps model name to a recipe dict or an exception."""
+
+    def __init__(self, outcomes: dict):
+        self.outcomes = outcomes
+        self.calls = []
+
+    def __call__(self, model_name):
+        fake = self
+
+        class Model:
+            def generate_content(self, contents, generation_config=None, request_options=None):
+                fake.calls.append(model_name)
+                outcome = fake.outcomes[model_name]
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return type("Response", (), {"text": json.dumps(outcome)})()
+
+        return Model()
+
+
+@pytest.fixture
+def models(monkeypatch):
+    def install(**outcomes):
+        fake = FakeModels(outcomes)
+        monkeypatch.setattr(app.genai, "GenerativeModel", fake)
+        return fake
+    return install
+
+
+@pytest.fixture
+def page_resources(resources, monkeypatch):
+    # Serve the page from the page cache and skip image discovery, so nothing touches the network
+    resources.page_cache.put(app.FetchedPage(URL, URL, PAGE_HTML))
+    monkeypatch.setattr(app, "get_recipe_image", lambda url, recipe_data, resources=None: None)
+    return resources
+
+
+def test_complete_result_from_the_first_tier_stops_escalation(models, resources):
+    fake = models(flash=COMPLETE, pro=COMPLETE)
+    assert app.generate_recipe_json("prompt", ("flash", "pro"), resources=resources) == COMPLETE
+    assert fake.calls == ["flash"]
+    assert resources.model_stats.stats()["flash"]["ok"] == 1
+
+
+def test_incomplete_result_escalates(models, resources):
+    fake = models(flash=PARTIAL, pro=COMPLETE)
+    assert app.generate_recipe_json("prompt", ("flash", "pro"), resources=resources) == COMPLETE
+    assert fake.calls == ["flash", "pro"]
+    assert resources.model_stats.stats()["flash"]["incomplete"] == 1
+
+
+def test_best_partial_result_when_no_tier_completes(models, resources):
+    models(flash=PARTIAL, pro=app.google_exceptions.DeadlineExceeded("slow"))
+    assert app.generate_recipe_json("prompt", ("flash", "pro"), resources=resources) == PARTIAL
+    assert resources.model_stats.stats()["pro"]["timeout"] == 1
+
+
+def test_last_error_is_raised_when_every_tier_fails(models, resources):
+    models(flash=RuntimeError("quota"), pro=ValueError("bad key"))
+    with pytest.raises(ValueError, match="bad key"):
+        app.generate_recipe_json("prompt", ("flash", "pro"), resources=resources)
+
+
+def test_rate_limit_wait_is_bounded_by_the_deadline(models, resources):
+    fake = models(flash=COMPLETE)
+    resources.rate_limiter = app.RateLimiter(1)
+    resources.rate_limiter._next_slot = time.monotonic() + 3600  # Next slot an hour away
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        app.generate_recipe_json("prompt", ("flash",), deadline_seconds=10, resources=resources)
+    assert time.monotonic() - start < 1
+    assert fake.calls == [] and resources.rate_limiter.stats()["timeouts"] == 1
+
+
+def test_no_call_starts_too_close_to_the_deadline(models, resources):
+    fake = models(flash=COMPLETE)
+    with pytest.raises(TimeoutError):
+        app.generate_recipe_json("prompt", ("flash",), deadline_seconds=app.MIN_CALL_SECONDS / 2,
+                                 resources=resources)
+    assert fake.calls == []
+    assert app.is_transient_error(TimeoutError())  # Bulk import retries it
+
+
+def test_complete_url_extraction_is_cached(models, page_resources, monkeypatch):
+    monkeypatch.setattr(app, "URL_EXTRACTION_MODELS", ("flash", "pro"))
+    fake = models(flash=COMPLETE, pro=COMPLETE)
+    first = app.run_url_extraction(URL, page_resources)
+    second = app.run_url_extraction(URL + "?utm_source=newsletter", page_resources)
+    assert first["title"] == second["title"] == "Soup"
+    assert fake.calls == ["flash"]
+
+
+def test_partial_url_extraction_is_not_cached(models, page_resources, monkeypatch):
+    monkeypatch.setattr(app, "URL_EXTRACTION_MODELS", ("flash", "pro"))
+    fake = models(flash=PARTIAL, pro=app.google_exceptions.DeadlineExceeded("slow"))
+    assert app.missing_recipe_fields(app.run_url_extraction(URL, page_resources)) == ["instructions"]
+    app.run_url_extraction(URL, page_resources)
+    assert fake.calls == ["flash", "pro", "flash", "pro"]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("a, b,,", ("a", "b")),
+    (" solo ", ("solo",)),
+    (" , ", ("x", "y")),
+    (None, ("x", "y")),
+])
+def test_model_list_from_env(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("TEST_MODELS", raising=False)
+    else:
+        monkeypatch.setenv("TEST_MODELS", value)
+    assert app.model_list_from_env("TEST_MODELS", default="x,y") == expected
@@ -0,0 +1,93 @@
+import io
+import json
+
+import pytest
+import requests
+
+import streamlit_app as app
+
+RECIPE = {
+    "@context": "https://schema.org", "@type": "Recipe", "name": "עוגת שוקולד",
+    "recipeIngredient": ["קמח", "שוקולד"], "recipeInstructions": ["לערבב", "לאפות"],
+}
+
+
+def html_response(body: bytes, content_type: str, url="https://example.com/recipe") -> requests.Response:
+    """A streamed response as requests builds it (including its ISO-8859-1 default for text/*)."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers["Content-Type"] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def recipe_page(meta: str = '<meta charset="utf-8">') -> bytes:
+    script = json.dumps(RECIPE, ensure_ascii=False)
+    return (f'<html><head>{meta}<title>מתכון</title>'
+            f'<script type="application/ld+json">{script}</script></head><body></body></html>').encode()
+
+
+def fetched(response: requests.Response) -> app.FetchedPage:
+    streamed = app.StreamedPage(response)
+    return app.FetchedPage(response.url, streamed.url, streamed.read_full())
+
+
+def test_meta_charset_is_used_when_the_header_has_none():
+    page = fetched(html_response(recipe_page(), "text/html"))
+    assert app.extract_structured_recipe(page)["title"] == "עוגת שוקולד"
+
+
+def test_missing_charset_everywhere_defaults_to_utf8():
+    page = fetched(html_response(recipe_page(meta=""), "text/html"))
+    assert app.extract_structured_recipe(page)["title"] == "עוגת שוקולד"
+
+
+def test_header_charset_wins_over_meta():
+    body = recipe_page(meta='<meta charset="utf-8">').decode().encode("cp1255")
+    page = fetched(html_response(body, "text/html; charset=windows-1255"))
+    assert app.extract_structured_recipe(page)["title"] == "עוגת שוקולד"
+
+
+def test_head_and_full_reads_use_the_same_encoding():
+    streamed = app.StreamedPage(html_response(recipe_page(), "text/html"))
+    assert "מתכון" in streamed.read_head()
+    assert "עוגת שוקולד" in streamed.read_full()
+
+
+@pytest.mark.parametrize("content_type, expected", [
+    ("text/html; charset=UTF-8", "utf-8"),
+    ('text/html; charset="windows-1255"', "cp1255"),
+    ("text/html", None),
+    ("text/html; charset=no-such-codec", None),
+])
+def test_header_charset(content_type, expected):
+    assert app.header_charset(content_type) == expected
+
+
+class FailingSession:
+    """Records every GET; the recipe page fails, noembed has nothing."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        if self.error:
+            raise self.error
+        response = html_response(b"not found", "text/html", url=url)
+        response.status_code = 404
+        return response
+
+
+@pytest.mark.parametrize("error", [None, requests.ConnectionError("refused")])
+def test_failed_page_fetch_is_not_repeated_by_image_discovery(resources, error):
+    resources.http_session = FailingSession(error)
+    url = "https://example.com/recipe"
+    assert app.fetch_page(url, resources=resources) is None
+    assert app.fetch_page(url, resources=resources) is None
+    image_url, timings = app.discover_image(url, resources)
+    assert image_url is None and list(timings) == ["noembed"]
+    assert resources.http_session.urls.count(url) == 1
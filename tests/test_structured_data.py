@@ -0,0 +1,148 @@
+import json
+
+import pytest
+
+import streamlit_app as app
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("PT1H30M", "1 hour 30 minutes"),
+    ("PT1M", "1 minute"),
+    ("PT2H", "2 hours"),
+    ("PT30S", "30 seconds"),
+    ("PT1M30S", "1 minute 30 seconds"),
+    ("PT90M", "1 hour 30 minutes"),
+    ("P1DT2H", "26 hours"),
+    ("pt45m", "45 minutes"),
+])
+def test_format_iso_duration(value, expected):
+    assert app.format_iso_duration(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "PT0S", "P0D"])
+def test_format_iso_duration_empty(value):
+    assert app.format_iso_duration(value) is None
+
+
+def test_format_iso_duration_passes_plain_text_through():
+    assert app.format_iso_duration(" 20  min ") == "20 min"
+
+
+def soup(html: str):
+    return app.bs4.BeautifulSoup(html, "html.parser")
+
+
+def jsonld(*objects) -> str:
+    return "".join(f'<script type="application/ld+json">{json.dumps(obj)}</script>' for obj in objects)
+
+
+COMPLETE = {
+    "@type": "Recipe", "name": "Lentil Soup", "recipeIngredient": ["1 cup lentils", "1 onion"],
+    "recipeInstructions": [{"@type": "HowToStep", "text": "Chop the onion."},
+                           {"@type": "HowToStep", "text": "Simmer with the lentils."}],
+    "prepTime": "PT10M", "cookTime": "PT40M", "recipeYield": ["4", "4 servings"],
+    "recipeCuisine": "Middle Eastern", "recipeCategory": ["Soup", "Main"], "keywords": "lentils, vegan",
+    "image": {"@type": "ImageObject", "url": "/img/soup.jpg"},
+}
+
+
+def test_jsonld_recipes_in_graph_lists_and_nested_objects():
+    html = jsonld(
+        {"@context": "https://schema.org", "@graph": [{"@type": "WebPage"}, {"@type": "Recipe", "name": "A"}]},
+        [{"@type": "Recipe", "name": "B"}, {"@type": "Person"}],
+        {"@type": "WebPage", "mainEntity": {"@type": ["Recipe", "NewsArticle"], "name": "C"}},
+        {"@type": "http://schema.org/Recipe", "name": "D"},
+    ) + '<script type="application/ld+json">{not json</script>'
+    assert [r["name"] for r in app.find_jsonld_recipes(soup(html))] == ["A", "B", "C", "D"]
+
+
+def test_microdata_recipe():
+    html = """
+    <div itemscope itemtype="https://schema.org/Recipe">
+      <h1 itemprop="name">Pancakes</h1>
+      <meta itemprop="prepTime" content="PT5M">
+      <img itemprop="image" src="/p.jpg">
+      <li itemprop="recipeIngredient">2 eggs</li>
+      <li itemprop="recipeIngredient">1 cup milk</li>
+      <div itemprop="recipeInstructions" itemscope itemtype="https://schema.org/HowToStep">
+        <span itemprop="text">Whisk everything.</span>
+      </div>
+    </div>"""
+    [recipe] = app.find_microdata_recipes(soup(html))
+    assert recipe["name"] == "Pancakes" and recipe["prepTime"] == "PT5M"
+    assert recipe["image"] == ["/p.jpg"]
+    assert recipe["recipeIngredient"] == ["2 eggs", "1 cup milk"]
+    assert recipe["recipeInstructions"] == ["Whisk everything."]
+    assert "text" not in recipe  # The step's own property stays with the step
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Mix.\nBake.", ["Mix.", "Bake."]),
+    ("<ol><li>Mix.</li><li>Bake &amp; cool.</li></ol>", ["Mix.", "Bake & cool."]),
+    (["Mix.", " ", "Bake."], ["Mix.", "Bake."]),
+    ([{"@type": "HowToStep", "text": "Mix."}, {"@type": "HowToStep", "name": "Bake."}], ["Mix.", "Bake."]),
+    ([{"@type": "HowToSection", "name": "Dough", "itemListElement": [
+        {"@type": "HowToStep", "text": "Knead."}, {"@type": "HowToStep", "text": "Rest."}]},
+      {"@type": "HowToSection", "name": "Filling", "itemListElement": [{"@type": "HowToStep", "text": "Fill."}]}],
+     ["Knead.", "Rest.", "Fill."]),
+    (None, []),
+])
+def test_instruction_steps(value, expected):
+    assert app._instruction_steps(value) == expected
+
+
+def test_map_schema_recipe():
+    recipe = app.map_schema_recipe(COMPLETE, "https://example.com/recipes/soup")
+    assert recipe == {
+        "title": "Lentil Soup",
+        "description": None,
+        "prep_time": "10 minutes",
+        "cook_time": "40 minutes",
+        "total_time": None,
+        "servings": "4",
+        "ingredients": ["1 cup lentils", "1 onion"],
+        "instructions": ["Chop the onion.", "Simmer with the lentils."],
+        "cuisine": "Middle Eastern",
+        "meal_type": "Soup, Main",
+        "keywords": ["lentils", "vegan"],
+        "image_url": "https://example.com/img/soup.jpg",
+    }
+
+
+def test_most_complete_recipe_is_chosen():
+    related = {"@type": "Recipe", "name": "Related", "recipeIngredient": ["a", "b", "c", "d", "e", "f"]}
+    html = f"<html><head>{jsonld(related, COMPLETE)}</head></html>"
+    page = app.FetchedPage("https://example.com/r", "https://example.com/r", html)
+    assert app.extract_structured_recipe(page)["title"] == "Lentil Soup"
+
+
+def test_page_without_recipe_markup():
+    page = app.FetchedPage("https://example.com/r", "https://example.com/r", "<html><body><p>Hi</p></body></html>")
+    assert app.extract_structured_recipe(page) is None
+
+
+def test_complete_jsonld_page_skips_the_model(resources, monkeypatch):
+    url = "https://example.com/recipes/soup"
+    resources.page_cache.put(app.FetchedPage(url, url, f"<html><head>{jsonld(COMPLETE)}</head><body></body></html>"))
+
+    def no_model(*args, **kwargs):
+        raise AssertionError("the model should not be called")
+
+    monkeypatch.setattr(app, "extract_recipe_with_gemini", no_model)
+    monkeypatch.setattr(app, "generate_recipe_json", no_model)
+    monkeypatch.setattr(app, "get_recipe_image", lambda url, recipe, resources=None: recipe.get("image_url"))
+    monkeypatch.setattr(app, "cache_image", lambda *args, **kwargs: None)
+    recipe = app.run_url_extraction(url, resources)
+    assert recipe["title"] == "Lentil Soup" and recipe["source_url"] == url
+
+
+def test_incomplete_jsonld_is_completed_by_the_model(resources, monkeypatch):
+    url = "https://example.com/recipes/soup"
+    partial = {"@type": "Recipe", "name": "Lentil Soup", "recipeIngredient": ["1 cup lentils"], "prepTime": "PT10M"}
+    resources.page_cache.put(app.FetchedPage(url, url, f"<html><head>{jsonld(partial)}</head><body></body></html>"))
+    monkeypatch.setattr(app, "extract_recipe_with_gemini", lambda url, page, resources=None: {
+        "title": "Lentil soup", "ingredients": ["lentils"], "instructions": ["Simmer."]})
+    monkeypatch.setattr(app, "get_recipe_image", lambda url, recipe, resources=None: None)
+    recipe = app.run_url_extraction(url, resources)
+    assert recipe["instructions"] == ["Simmer."] and recipe["title"] == "Lentil soup"
+    assert recipe["prep_time"] == "10 minutes"  # Filled in from the structured data